@@ -12,6 +12,12 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-temp-deploy-key-2026'
 
 DEBUG = config('DEBUG', default=False, cast=bool)
 
+# Async verzije read-heavy API view-ova - uključiti samo pod ASGI serverom (Procfile: web-asgi)
+ASYNC_API_VIEWS = config('ASYNC_API_VIEWS', default=False, cast=bool)
+
+# Debug hook-ovi iz core/instrumentation.py (allauth OAuth logovanje) - podrazumevano samo uz DEBUG
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=DEBUG, cast=bool)
+
 # Zameni Csv() sa ovim (radi 100% sa Railway):
 ALLOWED_HOSTS = ['web-production-07975.up.railway.app', '*.railway.app', 'localhost', '127.0.0.1']
 
@@ -68,13 +74,32 @@ TEMPLATES = [
 ]
 
 # DATABASE
+# DATABASE_POOL=True - psycopg3 pool (samo PostgreSQL); pool zamenjuje persistent konekcije
+DATABASE_POOL = config('DATABASE_POOL', default=False, cast=bool)
+DATABASE_POOL_MIN_SIZE = config('DATABASE_POOL_MIN_SIZE', default=2, cast=int)
+DATABASE_POOL_MAX_SIZE = config('DATABASE_POOL_MAX_SIZE', default=10, cast=int)
+DATABASE_POOL_TIMEOUT = config('DATABASE_POOL_TIMEOUT', default=10, cast=int)
+
+
+def database_config(url):
+    """dj_database_url + opcioni psycopg pool"""
+    db = dj_database_url.parse(
+        url,
+        conn_max_age=0 if DATABASE_POOL else 600,
+        conn_health_checks=not DATABASE_POOL,
+    )
+    if DATABASE_POOL and db['ENGINE'] == 'django.db.backends.postgresql':
+        db.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': DATABASE_POOL_TIMEOUT,
+        }
+    return db
+
+
 if os.getenv('DATABASE_URL'):
     DATABASES = {
-        'default': dj_database_url.config(
-            default=os.getenv('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': database_config(os.getenv('DATABASE_URL')),
     }
 else:
     DATABASES = {
@@ -84,6 +109,75 @@ else:
         }
     }
 
+# READ REPLIKE - čitanja idu na replike, upisi i sve posle POST-a na primarnu
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=Csv())
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = database_config(replica_url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+# Koliko sekundi posle upisa korisnik čita sa primarne (read-your-writes)
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=15, cast=int)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+    MIDDLEWARE.insert(1, 'core.db_routers.read_your_writes_middleware')
+
+# CACHE - deljen između worker-a (redis://... ili "db"); bez CACHE_URL lokalni LocMem (dev/testovi)
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'barter',
+        }
+    }
+elif CACHE_URL == 'db':
+    # Tabela se pravi sa: python manage.py createcachetable
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'barter_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'barter-local',
+        }
+    }
+
+# Lokalni LRU sloj ispred deljenog keša (core/cache.py)
+TIERED_CACHE_LOCAL_SIZE = config('TIERED_CACHE_LOCAL_SIZE', default=256, cast=int)
+TIERED_CACHE_LOCAL_TTL = config('TIERED_CACHE_LOCAL_TTL', default=5, cast=int)
+
+# Kurs za cene navedene u evrima (core/pricing.py)
+EUR_TO_RSD = config('EUR_TO_RSD', default=117, cast=float)
+
+# Popularnost ponuda (core/ranking.py) - na koliko sati interakcije vrede upola manje
+RANKING_HALF_LIFE_HOURS = config('RANKING_HALF_LIFE_HOURS', default=36, cast=float)
+
+# Životni vek ponuda (core/lifecycle.py): ističu posle N dana, podsetnik X dana ranije,
+# a neaktivne duže od ARCHIVE_AFTER dana se premeštaju u arhivu (archive_offers)
+OFFER_LIFETIME_DAYS = config('OFFER_LIFETIME_DAYS', default=60, cast=int)
+OFFER_EXPIRY_REMINDER_DAYS = config('OFFER_EXPIRY_REMINDER_DAYS', default=3, cast=int)
+OFFER_ARCHIVE_AFTER_DAYS = config('OFFER_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+
+# Mesečne particije poruka i notifikacija - samo PostgreSQL, posle "partition_tables convert"
+# (core/partitioning.py). Retencija u mesecima; 0 = particije se ne uklanjaju.
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+MESSAGE_RETENTION_MONTHS = config('MESSAGE_RETENTION_MONTHS', default=0, cast=int)
+NOTIFICATION_RETENTION_MONTHS = config('NOTIFICATION_RETENTION_MONTHS', default=0, cast=int)
+
+# Delta sync (core/changes.py): koliko dana se čuva dnevnik promena (stariji kursor = ponovno
+# učitavanje lista) i koliko sekundi se čeka da upis "legne" pre nego što ode klijentu
+SYNC_CHANGELOG_DAYS = config('SYNC_CHANGELOG_DAYS', default=30, cast=int)
+SYNC_SETTLE_SECONDS = config('SYNC_SETTLE_SECONDS', default=2, cast=float)
+
 # MEDIA & STATIC
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+"""ASGI config."""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'barter.settings')
+application = get_asgi_application()
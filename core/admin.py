@@ -1,21 +1,79 @@
 from django.contrib import admin
-from .models import Category, Offer, Message, Trade, UserProfile, Review, Notification
+from django.db.models import Count, Q
+from .models import ArchivedOffer, Category, City, CityAlias, Favorite, Offer, Message, Trade, UserProfile, Review, Notification
+from .exports import queryset_export_rows, streaming_export_response
+from .paginators import EstimatedCountPaginator
+
+
+class ExportMixin:
+    """Admin akcije za streaming izvoz filtriranog changelist-a (CSV/JSONL, gzip)"""
+    actions = ['export_as_csv', 'export_as_jsonl']
+    export_compress = True
+
+    def _export(self, queryset, fmt):
+        header, rows = queryset_export_rows(queryset)
+        filename = f'{self.model._meta.model_name}.{fmt}'
+        return streaming_export_response(header, rows, fmt, filename, compress=self.export_compress)
+
+    @admin.action(description='Izvezi odabrano kao CSV (gzip)')
+    def export_as_csv(self, request, queryset):
+        return self._export(queryset, 'csv')
+
+    @admin.action(description='Izvezi odabrano kao JSONL (gzip)')
+    def export_as_jsonl(self, request, queryset):
+        return self._export(queryset, 'jsonl')
+
+
+class LargeTableMixin:
+    """Velike tabele - procenjen broj redova i bez dodatnog COUNT(*) za ukupan broj"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug', 'offer_count')
+class CategoryAdmin(ExportMixin, admin.ModelAdmin):
+    list_display = ('tree_name', 'slug', 'active_offer_count')
+    list_filter = ('depth',)
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
-    ordering = ('name',)
+    ordering = ('path',)
+
+    @admin.display(description='Naziv', ordering='path')
+    def tree_name(self, obj):
+        return obj.indented_name
+
+
+class CityAliasInline(admin.TabularInline):
+    model = CityAlias
+    extra = 1
+
+
+@admin.register(City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'active_offers')
+    search_fields = ('name', 'aliases__alias')
+    inlines = [CityAliasInline]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _active_offers=Count('offers', filter=Q(offers__is_active=True))
+        )
+
+    @admin.display(description='Aktivne ponude', ordering='_active_offers')
+    def active_offers(self, obj):
+        return obj._active_offers
 
 
 @admin.register(Offer)
-class OfferAdmin(admin.ModelAdmin):
+class OfferAdmin(ExportMixin, LargeTableMixin, admin.ModelAdmin):
     list_display = ('title', 'owner', 'category', 'is_active', 'is_premium', 'created_at')
-    list_filter = ('is_active', 'is_premium', 'category', 'created_at')
+    list_select_related = ('owner', 'category')
+    autocomplete_fields = ('owner', 'category')
+    list_filter = ('is_active', 'is_premium', 'category', 'city_ref', 'created_at')
     search_fields = ('title', 'description', 'owner__username')
-    readonly_fields = ('slug', 'views_count', 'likes_count', 'created_at', 'updated_at')
+    readonly_fields = (
+        'slug', 'views_count', 'likes_count', 'popularity_score', 'expires_at', 'expired_at', 'created_at', 'updated_at',
+    )
     fieldsets = (
         ('Osnovne informacije', {
             'fields': ('title', 'slug', 'description', 'category', 'owner')
@@ -30,19 +88,50 @@ class OfferAdmin(admin.ModelAdmin):
             'fields': ('image',)
         }),
         ('Status', {
-            'fields': ('is_active', 'is_premium')
+            'fields': ('is_active', 'is_premium', 'expires_at', 'expired_at')
         }),
         ('Statistika', {
-            'fields': ('views_count', 'likes_count', 'created_at', 'updated_at'),
+            'fields': ('views_count', 'likes_count', 'popularity_score', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     ordering = ('-created_at',)
 
 
+@admin.register(Favorite)
+class FavoriteAdmin(LargeTableMixin, admin.ModelAdmin):
+    list_display = ('user', 'offer', 'notified', 'created_at')
+    list_select_related = ('user', 'offer')
+    autocomplete_fields = ('user', 'offer')
+    list_filter = ('notified', 'created_at')
+    search_fields = ('user__username', 'offer__title')
+    readonly_fields = ('created_at',)
+    ordering = ('-created_at',)
+
+    # Dodavanje i brisanje idu samo kroz core/favorites.py - inače likes_count ne prati promenu
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOffer)
+class ArchivedOfferAdmin(LargeTableMixin, admin.ModelAdmin):
+    list_display = ('title', 'owner', 'original_id', 'deactivated_at', 'archived_at')
+    list_select_related = ('owner',)
+    search_fields = ('title', 'owner__username')
+    readonly_fields = [field.name for field in ArchivedOffer._meta.fields]
+    ordering = ('-archived_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(ExportMixin, LargeTableMixin, admin.ModelAdmin):
     list_display = ('sender', 'recipient', 'subject', 'is_read', 'timestamp')
+    list_select_related = ('sender', 'recipient')
     list_filter = ('is_read', 'timestamp')
     search_fields = ('sender__username', 'recipient__username', 'subject', 'body')
     readonly_fields = ('timestamp', 'sender', 'recipient')
@@ -50,8 +139,11 @@ class MessageAdmin(admin.ModelAdmin):
 
 
 @admin.register(Trade)
-class TradeAdmin(admin.ModelAdmin):
+class TradeAdmin(ExportMixin, LargeTableMixin, admin.ModelAdmin):
     list_display = ('offer1', 'offer2', 'user1', 'user2', 'status', 'created_at')
+    # Offer.__str__ koristi owner.username - zato i owner ide u JOIN
+    list_select_related = ('offer1__owner', 'offer2__owner', 'user1', 'user2')
+    autocomplete_fields = ('offer1', 'offer2', 'user1', 'user2')
     list_filter = ('status', 'created_at')
     search_fields = ('offer1__title', 'offer2__title', 'user1__username', 'user2__username')
     readonly_fields = ('created_at', 'updated_at')
@@ -77,10 +169,12 @@ class TradeAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ('user', 'location', 'rating', 'is_verified', 'trades_completed', 'total_reviews')
     list_filter = ('is_verified', 'rating')
     search_fields = ('user__username', 'user__email', 'location')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     readonly_fields = ('created_at', 'average_rating', 'total_reviews')
     fieldsets = (
         ('Korisnik', {
@@ -99,10 +193,21 @@ class UserProfileAdmin(admin.ModelAdmin):
     )
     ordering = ('user__username',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_total_reviews=Count('user__reviews_received'))
+
+    @admin.display(description='Ukupno recenzija', ordering='_total_reviews')
+    def total_reviews(self, obj):
+        if hasattr(obj, '_total_reviews'):
+            return obj._total_reviews
+        return obj.total_reviews
+
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ExportMixin, LargeTableMixin, admin.ModelAdmin):
     list_display = ('reviewer', 'reviewed_user', 'rating', 'offer', 'is_verified_purchase', 'created_at')
+    list_select_related = ('reviewer', 'reviewed_user', 'offer__owner')
+    autocomplete_fields = ('reviewer', 'reviewed_user', 'offer', 'trade')
     list_filter = ('rating', 'is_verified_purchase', 'created_at', 'is_positive')
     search_fields = ('reviewer__username', 'reviewed_user__username', 'offer__title', 'comment')
     readonly_fields = ('created_at', 'updated_at')
@@ -128,13 +233,15 @@ class ReviewAdmin(admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         """Zabrani editovanje reviewer-a i reviewed_user-a nakon kreiranja"""
         if obj:  # Ako se edituje postojeći objekat
-            return self.readonly_fields + ['reviewer', 'reviewed_user', 'offer']
+            return self.readonly_fields + ('reviewer', 'reviewed_user', 'offer')
         return self.readonly_fields
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ExportMixin, LargeTableMixin, admin.ModelAdmin):
     list_display = ('recipient', 'notification_type', 'title', 'is_read', 'created_at')
+    list_select_related = ('recipient',)
+    autocomplete_fields = ('recipient', 'actor', 'offer', 'trade')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('recipient__username', 'actor__username', 'title', 'message')
     readonly_fields = ('created_at', 'updated_at')
@@ -164,6 +271,6 @@ class NotificationAdmin(admin.ModelAdmin):
     def get_readonly_fields(self, request, obj=None):
         """Čini sve polje read-only nakon kreiranja"""
         if obj:
-            return self.readonly_fields + ['recipient', 'actor', 'notification_type', 'title', 'message', 'offer',
-                                           'trade', 'is_read']
+            return self.readonly_fields + ('recipient', 'actor', 'notification_type', 'title', 'message', 'offer',
+                                           'trade', 'is_read')
         return self.readonly_fields
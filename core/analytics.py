@@ -0,0 +1,157 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Offer, OfferEvent, OfferStatBucket
+
+
+# ============================================
+# ANALITIKA PONUDA - događaji -> satni/dnevni zbirovi
+# Pregled/kontakt je jedan INSERT u OfferEvent (bez UPDATE-a reda ponude).
+# rollup_offer_stats periodično sabira događaje u OfferStatBucket i u
+# Offer.views_count; dashboard vlasnika čita samo zbirove.
+# ============================================
+
+ROLLUP_BATCH = 10000
+COUNTERS = {OfferEvent.VIEW: 'views', OfferEvent.CONTACT: 'contacts'}
+
+
+def record_event(offer, event_type):
+    OfferEvent.objects.create(offer_id=offer.pk, event_type=event_type)
+
+
+def bucket_starts(moment):
+    """Početak satnog i dnevnog bucketa; dan je po lokalnom vremenu (TIME_ZONE)"""
+    hour = moment.replace(minute=0, second=0, microsecond=0)
+    day = timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+    return ((OfferStatBucket.HOUR, hour), (OfferStatBucket.DAY, day))
+
+
+def rollup_events(batch_size=ROLLUP_BATCH):
+    """Saberi događaje u buckete i views_count; vraća broj obrađenih događaja"""
+    processed = 0
+    while True:
+        rows = list(
+            OfferEvent.objects.order_by('id')
+            .values_list('id', 'offer_id', 'offer__owner_id', 'event_type', 'created_at')[:batch_size]
+        )
+        if not rows:
+            return processed
+
+        totals = defaultdict(lambda: {'views': 0, 'contacts': 0})
+        for _, offer_id, owner_id, event_type, created_at in rows:
+            counter = COUNTERS.get(event_type)
+            if counter is None:
+                continue
+            for period, start in bucket_starts(created_at):
+                totals[(offer_id, owner_id, period, start)][counter] += 1
+
+        with transaction.atomic():
+            # Paralelni rollup koji je već uzeo deo serije - odustaje se da se ništa ne sabere dvaput
+            deleted, _ = OfferEvent.objects.filter(id__in=[row[0] for row in rows]).delete()
+            if deleted != len(rows):
+                transaction.set_rollback(True)
+                continue
+            _merge_buckets(totals)
+            _add_views(totals)
+        processed += len(rows)
+
+
+def _merge_buckets(totals):
+    """Postojeći bucketi se uvećavaju (zaključani), novi se ubacuju jednim bulk_create-om"""
+    offer_ids = {key[0] for key in totals}
+    starts = {key[3] for key in totals}
+    existing = {
+        (bucket.offer_id, bucket.owner_id, bucket.period, bucket.bucket_start): bucket
+        for bucket in OfferStatBucket.objects.select_for_update().filter(
+            offer_id__in=offer_ids, bucket_start__in=starts
+        )
+    }
+    changed, created = [], []
+    for key, counts in totals.items():
+        bucket = existing.get(key)
+        if bucket is None:
+            offer_id, owner_id, period, start = key
+            created.append(OfferStatBucket(
+                offer_id=offer_id, owner_id=owner_id, period=period, bucket_start=start, **counts
+            ))
+        else:
+            bucket.views += counts['views']
+            bucket.contacts += counts['contacts']
+            changed.append(bucket)
+    if changed:
+        OfferStatBucket.objects.bulk_update(changed, ['views', 'contacts'], batch_size=500)
+    OfferStatBucket.objects.bulk_create(created, batch_size=1000)
+
+
+def _add_views(totals):
+    """Offer.views_count += pregledi iz serije - jedan UPDATE po različitom zbiru"""
+    per_offer = defaultdict(int)
+    for (offer_id, _, period, _), counts in totals.items():
+        if period == OfferStatBucket.DAY:
+            per_offer[offer_id] += counts['views']
+    groups = defaultdict(list)
+    for offer_id, views in per_offer.items():
+        if views:
+            groups[views].append(offer_id)
+    for views, offer_ids in groups.items():
+        Offer.objects.filter(pk__in=sorted(offer_ids)).update(views_count=F('views_count') + views)
+
+
+def prune_hourly(keep_days):
+    """Satni bucketi starijih dana nisu potrebni grafikonima - dnevni ostaju"""
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    deleted, _ = OfferStatBucket.objects.filter(period=OfferStatBucket.HOUR, bucket_start__lt=cutoff).delete()
+    return deleted
+
+
+def owner_series(owner, period, since):
+    """[(bucket_start, views, contacts)] zbirno za sve ponude vlasnika - čita bucket_owner_period_idx"""
+    return list(
+        OfferStatBucket.objects.filter(owner=owner, period=period, bucket_start__gte=since)
+        .order_by().values('bucket_start')
+        .annotate(views_total=Sum('views'), contacts_total=Sum('contacts'))
+        .order_by('bucket_start').values_list('bucket_start', 'views_total', 'contacts_total')
+    )
+
+
+def owner_top_offers(owner, since, limit=10):
+    """Najgledanije ponude vlasnika u periodu (iz dnevnih bucketa)"""
+    return list(
+        OfferStatBucket.objects.filter(owner=owner, period=OfferStatBucket.DAY, bucket_start__gte=since)
+        .order_by().values('offer_id', 'offer__title')
+        .annotate(views_total=Sum('views'), contacts_total=Sum('contacts'))
+        .order_by('-views_total')[:limit]
+    )
+
+
+def hour_starts(hours):
+    """Počeci poslednjih `hours` satnih bucketa, od najstarijeg"""
+    current = bucket_starts(timezone.now())[0][1]
+    return [current - timedelta(hours=offset) for offset in range(hours - 1, -1, -1)]
+
+
+def day_starts(days):
+    """Počeci poslednjih `days` dana po lokalnom vremenu (ponoć se ne računa kao +24h zbog DST-a)"""
+    today = timezone.localdate()
+    current_tz = timezone.get_current_timezone()
+    return [
+        timezone.make_aware(datetime.combine(today - timedelta(days=offset), time.min), current_tz)
+        for offset in range(days - 1, -1, -1)
+    ]
+
+
+def fill_series(rows, starts):
+    """Niz bucketa za zadate početke - prazni periodi dobijaju nule, height je % od najvećeg"""
+    found = {bucket_start: (views, contacts) for bucket_start, views, contacts in rows}
+    series = []
+    for start in starts:
+        views, contacts = found.get(start, (0, 0))
+        series.append({'start': start, 'views': views, 'contacts': contacts})
+    peak = max((point['views'] for point in series), default=0) or 1
+    for point in series:
+        point['height'] = round(100 * point['views'] / peak)
+    return series
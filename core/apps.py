@@ -7,3 +7,17 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.templatetags.form_tags  # ← OBAVEZNO!
+        from django.conf import settings
+        if settings.INSTRUMENTATION_ENABLED:
+            # Hook-ovi se instaliraju tek na prvom zahtevu - ne usporavaju start ni management komande
+            from django.core.signals import request_started
+            from core import instrumentation
+            request_started.connect(instrumentation.install_on_first_request,
+                                    dispatch_uid='core.instrumentation')
+
+        from core import changes
+        changes.install()
+
+        from core.cache import tiered_cache
+        from core.models import Category
+        tiered_cache.track_models(Category)
@@ -0,0 +1,121 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from .changes import update_and_record
+from .conditional import conditional_api
+from .models import Offer, Message, Review, Notification
+from .serializers import MESSAGE, OFFER_CARD, json_response
+from .views import (
+    MESSAGES_PAGE_SIZE, SEARCH_PAGE_SIZE,
+    _city_facets, _conversation_queryset, _messages_list_validators, _offer_detail_payload,
+    _offer_detail_validators, _search_facets_queryset, _search_offers_queryset,
+)
+
+
+# ============================================
+# ASYNC API VIEWS (ASGI)
+# Iste putanje i isti JSON kao u views.py - aktiviraju se sa ASYNC_API_VIEWS=True.
+# Pod ASGI-jem worker ne blokira dok čeka bazu, pa drži mnogo više
+# istovremenih konekcija (polling broja nepročitanih, spori klijenti).
+# ============================================
+
+async def _aget_page(queryset, number, per_page):
+    """Paginator bez sync upita - COUNT(*) i stranica idu kroz async ORM"""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    page_obj = paginator.get_page(number)
+    rows = [row async for row in page_obj.object_list]
+    return paginator, page_obj, rows
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+async def get_unread_count(request):
+    """API endpoint - broj nepročitanih poruka i notifikacija"""
+    user = await request.auser()
+    unread_messages = await Message.objects.filter(recipient=user, is_read=False).acount()
+    unread_notifications = await Notification.objects.filter(recipient=user, is_read=False).acount()
+
+    return json_response({
+        'unread_count': unread_notifications,
+        'unread_messages': unread_messages,
+        'success': True,
+    })
+
+
+@require_http_methods(["GET"])
+async def search_offers(request):
+    """API endpoint - pretraga ponuda"""
+    paginator, page_obj, rows = await _aget_page(
+        _search_offers_queryset(request.GET), request.GET.get('page', 1), SEARCH_PAGE_SIZE
+    )
+
+    data = {
+        'offers': OFFER_CARD.serialize(rows),
+        'total_count': paginator.count,
+        'page': page_obj.number,
+        'total_pages': paginator.num_pages,
+        'success': True,
+    }
+    facets = _search_facets_queryset(request.GET)
+    if facets is not None:
+        data['city_facets'] = [row async for row in _city_facets(facets)]
+    return json_response(data)
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+@conditional_api(_messages_list_validators, private=True, no_cache=True)
+async def get_messages_list(request):
+    """API endpoint - lista poruka kao JSON"""
+    username = request.GET.get('username')
+
+    if not username:
+        return JsonResponse({
+            'success': False,
+            'error': 'Nedostaje username'
+        }, status=400)
+
+    user = await request.auser()
+    other_user = await aget_object_or_404(User, username=username)
+
+    # Dnevnik za sync traži id-jeve izmenjenih redova u istoj transakciji - nema async varijante
+    await sync_to_async(update_and_record)(
+        Message.objects.filter(sender=other_user, recipient=user, is_read=False), is_read=True
+    )
+
+    paginator, page_obj, rows = await _aget_page(
+        MESSAGE.rows(_conversation_queryset(user, other_user)), request.GET.get('page', 1), MESSAGES_PAGE_SIZE
+    )
+
+    return json_response({
+        'messages': MESSAGE.serialize(rows),
+        'other_user': {
+            'username': other_user.username,
+            'id': other_user.id,
+        },
+        'page': page_obj.number,
+        'total_pages': paginator.num_pages,
+        'success': True,
+    })
+
+
+@require_http_methods(["GET"])
+@conditional_api(_offer_detail_validators, public=True, max_age=60)
+async def get_offer_detail_api(request, pk):
+    """API endpoint - detalj ponude kao JSON"""
+    offer = await aget_object_or_404(Offer.objects.select_related('owner', 'category'), pk=pk)
+    rating = await Review.objects.filter(reviewed_user_id=offer.owner_id).aaggregate(
+        avg=Avg('rating'), count=Count('id')
+    )
+
+    return json_response({
+        'offer': _offer_detail_payload(offer, (rating['avg'], rating['count'])),
+        'success': True,
+    })
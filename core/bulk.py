@@ -0,0 +1,364 @@
+import csv
+import io
+import json
+import os
+import posixpath
+from collections import Counter
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db import transaction, DatabaseError
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat, Left, Lower, Replace
+from django.utils import timezone
+
+from .changes import record_objects
+from .cities import city_key
+from .models import Category, CityAlias, Offer, default_expiry
+from .pricing import parse_price_range
+from .ranking import popularity_score
+
+
+# ============================================
+# MASOVNI UVOZ PONUDA (CSV / JSONL)
+# ============================================
+
+IMPORT_FIELDS = ('title', 'description', 'category', 'price_range', 'location', 'city', 'image', 'is_active')
+REQUIRED_FIELDS = ('title', 'description', 'category', 'city')
+MAX_LENGTHS = {
+    'title': 200,
+    'price_range': 50,
+    'location': 100,
+    'city': 100,
+}
+IMPORT_FORMATS = ('csv', 'jsonl')
+# Uvoz sme da poveže samo već otpremljene slike ponuda (Offer.image upload_to)
+IMAGE_PREFIX = 'offers/'
+ENCODING_ERROR = 'Fajl nije u UTF-8 kodiranju (sačuvaj CSV kao "CSV UTF-8")'
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 500
+
+TRUE_VALUES = {'1', 'true', 'da', 'yes', 'y'}
+
+# Isto kao update_offer_slug signal: "<naslov>-<id>", mala slova, razmaci -> crtice
+SLUG_EXPRESSION = Left(
+    Lower(Replace(Concat('title', Value('-'), Cast('id', CharField())), Value(' '), Value('-'))),
+    200,
+)
+
+
+class ImportResult:
+    """Rezultat uvoza - broj kreiranih ponuda i greške po redovima"""
+
+    def __init__(self):
+        self.created = 0
+        self.processed = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    @property
+    def truncated_errors(self):
+        return self.error_count - len(self.errors)
+
+
+def detect_format(filename):
+    """Odredi format na osnovu ekstenzije fajla"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_rows(stream, fmt):
+    """Čitaj redove jedan po jedan - vraća (broj_linije, red, greška)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Neispravan JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'Red mora biti JSON objekat'
+            continue
+        yield line_number, row, None
+
+
+def build_category_lookup():
+    """
+    Mapa naziv/slug -> id kategorije (kategorija ima malo, učitaj jednom).
+    Pun naziv ("Odeća | Muška") uvek radi; kratak naziv samo ako je jedinstven.
+    """
+    lookup, full_names, short_names = {}, {}, Counter()
+    rows = Category.objects.order_by('path').values_list('id', 'name', 'slug', 'parent_id')
+    for category_id, name, slug, parent_id in rows:
+        name = name.strip()
+        full_names[category_id] = f'{full_names[parent_id]} | {name}' if parent_id in full_names else name
+        short_names[name.lower()] += 1
+        lookup[full_names[category_id].lower()] = category_id
+        if slug:
+            lookup[slug.lower()] = category_id
+    for category_id, name, _, _ in rows:
+        if short_names[name.strip().lower()] == 1:
+            lookup.setdefault(name.strip().lower(), category_id)
+    return lookup
+
+
+class ImageChecker:
+    """Proverava postojanje slika u MEDIA_ROOT - jedan listdir po direktorijumu"""
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+        self._listings = {}
+
+    def missing(self, paths):
+        """Vrati skup putanja koje ne postoje"""
+        by_directory = {}
+        for path in paths:
+            by_directory.setdefault(os.path.dirname(path), set()).add(path)
+
+        missing = set()
+        for directory, directory_paths in by_directory.items():
+            if directory not in self._listings:
+                try:
+                    _, files = self.storage.listdir(directory)
+                except (FileNotFoundError, NotImplementedError, OSError, SuspiciousFileOperation):
+                    files = None
+                self._listings[directory] = set(files) if files is not None else None
+
+            files = self._listings[directory]
+            for path in directory_paths:
+                if files is None:
+                    if not self.storage.exists(path):
+                        missing.add(path)
+                elif os.path.basename(path) not in files:
+                    missing.add(path)
+        return missing
+
+
+def clean_image_path(raw):
+    """Relativna putanja u MEDIA_ROOT pod IMAGE_PREFIX, ili None (apsolutna, "..", van offers/)"""
+    path = raw.strip().replace('\\', '/')
+    if not path or path.startswith('/') or '..' in path.split('/'):
+        return None
+    path = posixpath.normpath(path)
+    if not path.startswith(IMAGE_PREFIX) or path == IMAGE_PREFIX.rstrip('/'):
+        return None
+    return path
+
+
+def _check_encoding(stream):
+    """
+    Fajl sa diska/upload se proveri liniju po liniju pre prvog upisa - loše
+    kodiranje (npr. CP1250 iz Excel-a) prekida uvoz pre nego što se išta sačuva.
+    Vraća (broj_linije, greška) ili None.
+    """
+    buffer = getattr(stream, 'buffer', None)
+    if buffer is None or not buffer.seekable():
+        return None
+    position = buffer.tell()
+    try:
+        for line_number, line in enumerate(buffer, start=1):
+            try:
+                line.decode(stream.encoding)
+            except UnicodeDecodeError:
+                return line_number, ENCODING_ERROR
+    finally:
+        buffer.seek(position)
+    return None
+
+
+def _clean_row(row, category_lookup):
+    """Validiraj red i vrati (podaci, greška)"""
+    data = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is None:
+            value = ''
+        if not isinstance(value, (str, bool, int)):
+            return None, f'Polje "{field}" ima neispravan tip'
+        data[field] = value.strip() if isinstance(value, str) else value
+
+    missing = [field for field in REQUIRED_FIELDS if not data[field]]
+    if missing:
+        return None, f'Nedostaju obavezna polja: {", ".join(missing)}'
+
+    for field, max_length in MAX_LENGTHS.items():
+        if len(str(data[field])) > max_length:
+            return None, f'Polje "{field}" je duže od {max_length} karaktera'
+
+    if data['image']:
+        image = clean_image_path(str(data['image']))
+        if image is None:
+            return None, f'Neispravna putanja slike (mora biti unutar {IMAGE_PREFIX}): {data["image"]}'
+        data['image'] = image
+
+    category_id = category_lookup.get(str(data['category']).lower())
+    if category_id is None:
+        return None, f'Nepoznata kategorija: {data["category"]}'
+    data['category'] = category_id
+
+    is_active = data['is_active']
+    if isinstance(is_active, str):
+        data['is_active'] = is_active.lower() in TRUE_VALUES if is_active else True
+    else:
+        data['is_active'] = bool(is_active)
+
+    return data, None
+
+
+def _build_offer(data, owner):
+    # bulk_create ne poziva save() - cena i početni skor popularnosti se računaju ovde
+    price_min, price_max = parse_price_range(data['price_range'])
+    return Offer(
+        title=data['title'],
+        description=data['description'],
+        offered='Vidi u opisu',
+        wanted='Vidi u opisu',
+        category_id=data['category'],
+        owner=owner,
+        image=data['image'] or None,
+        price_range=data['price_range'],
+        price_min=price_min,
+        price_max=price_max,
+        popularity_score=popularity_score(0, 0, False, timezone.now()),
+        location=data['location'] or 'Srbija',
+        city=data['city'],
+        is_active=data['is_active'],
+        expires_at=default_expiry(),
+    )
+
+
+def _resolve_cities(offers):
+    """
+    bulk_create ne poziva save() - city_ref i kanonski naziv kao Offer._normalize_city,
+    ali za ceo chunk jednim upitom nad aliasima
+    """
+    keys = [[key for key in (city_key(offer.city), city_key(offer.location)) if key] for offer in offers]
+    aliases = {
+        alias: (city_id, name)
+        for alias, city_id, name in CityAlias.objects.filter(
+            alias__in={key for offer_keys in keys for key in offer_keys}
+        ).values_list('alias', 'city_id', 'city__name')
+    }
+    for offer, offer_keys in zip(offers, keys):
+        match = next((aliases[key] for key in offer_keys if key in aliases), None)
+        if match is not None:
+            offer.city_ref_id, offer.city = match
+
+
+def _insert_chunk(chunk, result):
+    """Ubaci jedan chunk u transakciji; ako padne, ponovi red po red radi izveštaja"""
+    offers = [offer for _, offer in chunk]
+    _resolve_cities(offers)
+    try:
+        with transaction.atomic():
+            Offer.objects.bulk_create(offers)
+            # bulk_create ne poziva save() ni signale - slug postavljamo jednim UPDATE-om
+            ids = [offer.pk for offer in offers if offer.pk]
+            if ids:
+                Offer.objects.filter(pk__in=ids).update(slug=SLUG_EXPRESSION)
+            record_objects([offer for offer in offers if offer.pk])
+            Category.adjust_active_counts(Counter(offer.category_id for offer in offers if offer.is_active))
+        result.created += len(offers)
+        return
+    except DatabaseError:
+        pass
+
+    for line, offer in chunk:
+        offer.pk = None
+        try:
+            with transaction.atomic():
+                offer.save()
+            result.created += 1
+        except DatabaseError as e:
+            result.add_error(line, f'Greška baze: {e}')
+
+
+def _flush(pending, result, image_checker, dry_run):
+    images = {offer.image.name for _, offer in pending if offer.image}
+    missing_images = image_checker.missing(images) if images else set()
+    # Slika tuđe ponude se ne preuzima - jedan upit po chunk-u
+    foreign_images = set(
+        Offer.objects.filter(image__in=images).exclude(owner_id=pending[0][1].owner_id)
+        .values_list('image', flat=True)
+    ) if images else set()
+
+    chunk = []
+    for line, offer in pending:
+        if offer.image and offer.image.name in missing_images:
+            result.add_error(line, f'Slika ne postoji: {offer.image.name}')
+            continue
+        if offer.image and offer.image.name in foreign_images:
+            result.add_error(line, f'Slika pripada ponudi drugog korisnika: {offer.image.name}')
+            continue
+        chunk.append((line, offer))
+
+    if chunk and not dry_run:
+        _insert_chunk(chunk, result)
+    elif dry_run:
+        result.created += len(chunk)
+
+
+def import_offers(stream, owner, fmt='csv', chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Uvezi ponude iz tekstualnog stream-a za datog korisnika.
+    Redovi se čitaju jedan po jedan i ubacuju u chunk-ovima,
+    tako da memorija ne raste sa veličinom fajla.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f'Nepodržan format: {fmt}')
+
+    result = ImportResult()
+    encoding_error = _check_encoding(stream)
+    if encoding_error:
+        result.add_error(*encoding_error)
+        return result
+
+    category_lookup = build_category_lookup()
+    image_checker = ImageChecker()
+    pending = []
+
+    try:
+        for line, row, error in iter_rows(stream, fmt):
+            result.processed += 1
+            if error:
+                result.add_error(line, error)
+                continue
+
+            data, error = _clean_row(row, category_lookup)
+            if error:
+                result.add_error(line, error)
+                continue
+
+            pending.append((line, _build_offer(data, owner)))
+            if len(pending) >= chunk_size:
+                _flush(pending, result, image_checker, dry_run)
+                pending = []
+    except UnicodeDecodeError:
+        # Stream bez seek-a (npr. stdin) - prekid; ranije ubačeni chunk-ovi ostaju
+        result.add_error(result.processed + 1, ENCODING_ERROR)
+        return result
+
+    if pending:
+        _flush(pending, result, image_checker, dry_run)
+
+    return result
+
+
+def open_upload(uploaded_file):
+    """Otvori upload kao tekstualni stream bez učitavanja celog fajla u memoriju"""
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+
+# ============================================
+# TIERED CACHE - lokalni LRU (po procesu) ispred deljenog keša (CACHES)
+# ============================================
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Mali LRU u memoriji procesa sa kratkim TTL-om - ograničava koliko lokalna kopija može da kasni"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        ttl = self.ttl if timeout is None else min(self.ttl, timeout)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheMetrics:
+    """
+    Brojači po procesu; na svakih `flush_every` događaja delte se upisuju
+    u deljeni keš, pa `manage.py cache_stats` vidi zbir svih worker-a.
+    """
+    COUNTERS = ('local_hits', 'shared_hits', 'misses', 'recomputes', 'lock_waits')
+    KEY_PREFIX = 'tiered-cache:metrics:'
+
+    def __init__(self, flush_every=100):
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._totals = dict.fromkeys(self.COUNTERS, 0)
+        self._pending = dict.fromkeys(self.COUNTERS, 0)
+        self._events = 0
+
+    def incr(self, name, shared=None):
+        with self._lock:
+            self._totals[name] += 1
+            self._pending[name] += 1
+            self._events += 1
+            should_flush = self._events >= self.flush_every
+        if should_flush and shared is not None:
+            self.flush(shared)
+
+    def flush(self, shared):
+        with self._lock:
+            pending, self._pending = self._pending, dict.fromkeys(self.COUNTERS, 0)
+            self._events = 0
+        for name, delta in pending.items():
+            if not delta:
+                continue
+            key = self.KEY_PREFIX + name
+            shared.add(key, 0, timeout=None)
+            try:
+                shared.incr(key, delta)
+            except ValueError:
+                # Ključ je istekao/izbačen između add i incr
+                shared.set(key, delta, timeout=None)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._totals)
+
+    @classmethod
+    def shared_snapshot(cls, shared):
+        values = shared.get_many([cls.KEY_PREFIX + name for name in cls.COUNTERS])
+        return {name: values.get(cls.KEY_PREFIX + name, 0) for name in cls.COUNTERS}
+
+
+class TieredCache:
+    """
+    get_or_set sa:
+    - lokalnim LRU-om ispred deljenog keša (manje mrežnih poziva za vruće ključeve)
+    - single-flight zaštitom: isti ključ računa samo jedan thread/proces, ostali čekaju rezultat
+    - verzionisanim namespace-ovima: bump(namespace) poništava sve ključeve namespace-a odjednom
+    """
+
+    def __init__(self, alias='default', local_size=256, local_ttl=5, lock_timeout=10):
+        self.alias = alias
+        self.local = LocalLRU(local_size, local_ttl)
+        self.lock_timeout = lock_timeout
+        self.metrics = CacheMetrics()
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # ---------- namespace-ovi ----------
+
+    def _version_key(self, namespace):
+        return f'tiered-cache:ns:{namespace}'
+
+    def version(self, namespace):
+        version_key = self._version_key(namespace)
+        version = self.local.get(version_key)
+        if version is _MISSING:
+            version = self.shared.get(version_key)
+            if version is None:
+                self.shared.add(version_key, 1, timeout=None)
+                version = self.shared.get(version_key, 1)
+            self.local.set(version_key, version)
+        return version
+
+    def key(self, namespace, *parts):
+        return ':'.join([namespace, f'v{self.version(namespace)}', *map(str, parts)])
+
+    def bump(self, namespace):
+        """Nova verzija namespace-a - stari ključevi se više ne čitaju i sami ističu"""
+        version_key = self._version_key(namespace)
+        self.shared.add(version_key, 1, timeout=None)
+        try:
+            self.shared.incr(version_key)
+        except ValueError:
+            self.shared.set(version_key, 2, timeout=None)
+        self.local.delete(version_key)
+
+    def track_models(self, *models):
+        """Bump namespace-a modela na post_save/post_delete (queryset.update() zaobilazi signale!)"""
+        for model in models:
+            namespace = model_namespace(model)
+
+            def _invalidate(sender, namespace=namespace, **kwargs):
+                self.bump(namespace)
+
+            dispatch_uid = f'tiered-cache:{namespace}'
+            post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+    # ---------- čitanje / upis ----------
+
+    def get(self, key, default=None):
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.metrics.incr('local_hits', self.shared)
+            return value
+        value = self.shared.get(key, _MISSING)
+        if value is not _MISSING:
+            self.metrics.incr('shared_hits', self.shared)
+            self.local.set(key, value)
+            return value
+        self.metrics.incr('misses', self.shared)
+        return default
+
+    def set(self, key, value, timeout=300):
+        self.shared.set(key, value, timeout)
+        self.local.set(key, value, timeout)
+
+    def delete(self, key):
+        self.shared.delete(key)
+        self.local.delete(key)
+
+    def _key_lock(self, key):
+        with self._key_locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_set(self, key, compute, timeout=300):
+        """
+        Vrati vrednost iz keša ili je izračunaj - samo jednom, čak i kad
+        istovremeno stigne više zahteva (lokalni lock + cache.add lock u deljenom kešu).
+        Vrednost iz lokalnog sloja deli se između zahteva - ne menjati je.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        try:
+            with self._key_lock(key):
+                return self._single_flight(key, compute, timeout)
+        finally:
+            with self._key_locks_guard:
+                self._key_locks.pop(key, None)
+
+    def _single_flight(self, key, compute, timeout):
+        # Drugi thread je možda izračunao vrednost dok smo čekali lock
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.metrics.incr('lock_waits', self.shared)
+            return value
+
+        lock_key = f'tiered-cache:lock:{key}'
+        if self.shared.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self._recompute(key, compute, timeout)
+            finally:
+                self.shared.delete(lock_key)
+
+        # Drugi proces računa - sačekaj njegov rezultat umesto duplog rada
+        self.metrics.incr('lock_waits', self.shared)
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = self.shared.get(key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value, timeout)
+                return value
+            if self.shared.get(lock_key) is None:
+                break
+        return self._recompute(key, compute, timeout)
+
+    def _recompute(self, key, compute, timeout):
+        self.metrics.incr('recomputes', self.shared)
+        value = compute()
+        self.set(key, value, timeout)
+        return value
+
+
+def model_namespace(model):
+    return model._meta.label_lower
+
+
+tiered_cache = TieredCache(
+    local_size=getattr(settings, 'TIERED_CACHE_LOCAL_SIZE', 256),
+    local_ttl=getattr(settings, 'TIERED_CACHE_LOCAL_TTL', 5),
+)
@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import ChangeLog, Message, Notification, Offer, Trade
+from .serializers import MESSAGE_CHANGE, NOTIFICATION, OFFER_CHANGE, TRADE_CHANGE
+
+
+# ============================================
+# DELTA SYNC - dnevnik promena po korisniku
+# Svaki upis poruke, notifikacije, razmene ili ponude dodaje ChangeLog red
+# za korisnike koji objekat vide: save/delete preko signala, bulk_create i
+# queryset.update() putanje eksplicitno (record_objects / update_and_record).
+# /api/sync/ vraća trenutno stanje objekata promenjenih posle kursora -
+# klijent ih samo upisuje preko postojećih, ponovljena isporuka ne smeta.
+# ============================================
+
+SYNC_PAGE_SIZE = 500
+PRUNE_BATCH = 5000
+CURSOR_VERSION = 'v1'
+
+# entitet -> (model, ključ u odgovoru, polja korisnika koji vide objekat)
+AUDIENCE = {
+    ChangeLog.MESSAGE: (Message, 'messages', ('sender_id', 'recipient_id')),
+    ChangeLog.NOTIFICATION: (Notification, 'notifications', ('recipient_id',)),
+    ChangeLog.TRADE: (Trade, 'trades', ('user1_id', 'user2_id')),
+    ChangeLog.OFFER: (Offer, 'offers', ('owner_id',)),
+}
+ENTITY_OF = {model: entity for entity, (model, _, _) in AUDIENCE.items()}
+
+
+def record(entity, rows, deleted=False):
+    """rows: [(object_id, user_id, ...)] - jedan red dnevnika po (korisnik, objekat)"""
+    now = timezone.now()
+    entries = {(user_id, object_id) for object_id, *user_ids in rows for user_id in user_ids if user_id}
+    ChangeLog.objects.bulk_create([
+        ChangeLog(user_id=user_id, entity=entity, object_id=object_id, deleted=deleted, created_at=now)
+        for user_id, object_id in sorted(entries)
+    ], batch_size=1000)
+
+
+def record_objects(objects, deleted=False):
+    """Instance jednog modela - npr. posle bulk_create (ne šalje post_save)"""
+    objects = list(objects)
+    if not objects:
+        return
+    entity = ENTITY_OF[type(objects[0])]
+    fields = AUDIENCE[entity][2]
+    record(entity, [(obj.pk, *(getattr(obj, field) for field in fields)) for obj in objects], deleted)
+
+
+def update_and_record(queryset, **values):
+    """queryset.update() sa dnevnikom za tačno izmenjene redove; vraća broj izmenjenih"""
+    entity = ENTITY_OF[queryset.model]
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().order_by().values_list('pk', *AUDIENCE[entity][2]))
+        if not rows:
+            return 0
+        updated = queryset.model.objects.filter(pk__in=[row[0] for row in rows]).update(**values)
+        record(entity, rows)
+    return updated
+
+
+# ==================== SIGNALI ====================
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_objects([instance])
+
+
+def _on_delete(sender, instance, **kwargs):
+    record_objects([instance], deleted=True)
+
+
+def install():
+    """
+    Poziva se iz CoreConfig.ready(). post_delete za Message/Notification/Trade
+    znači da kaskadno brisanje (npr. arhiviranje ponude) učitava redove pre
+    brisanja - zato se i brisanja beleže bez posebnog koda.
+    """
+    for model in ENTITY_OF:
+        uid = f'changes:{model._meta.model_name}'
+        post_save.connect(_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=uid)
+
+
+# ==================== KURSOR ====================
+
+def encode_cursor(last_id, issued_at):
+    return urlsafe_base64_encode(f'{CURSOR_VERSION}|{last_id}|{issued_at.isoformat()}'.encode())
+
+
+def decode_cursor(cursor):
+    """(last_id, issued_at) ili None za neispravan kursor"""
+    try:
+        version, last_id, issued_at = urlsafe_base64_decode(cursor).decode().split('|')
+        if version != CURSOR_VERSION:
+            return None
+        issued_at = datetime.fromisoformat(issued_at)
+        if issued_at.tzinfo is None:
+            # encode_cursor uvek upisuje aware vreme - ovakav kursor nije naš
+            return None
+        return int(last_id), issued_at
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def cursor_expired(issued_at, now=None):
+    """Dnevnik posle kursora je možda već obrisan - klijent mora ponovo da učita liste"""
+    now = now or timezone.now()
+    return issued_at < now - timedelta(days=settings.SYNC_CHANGELOG_DAYS)
+
+
+def settle_horizon(now=None):
+    """Id se dodeljuje pre COMMIT-a - za redove mlađe od ovoga još može da stigne red sa manjim id-jem"""
+    now = now or timezone.now()
+    return now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+
+
+def current_cursor(user, now=None):
+    """Kursor "od sada" - za klijenta koji je upravo učitao cele liste"""
+    now = now or timezone.now()
+    horizon = settle_horizon(now)
+    last_id = 0
+    recent = ChangeLog.objects.filter(user=user).order_by('-id').values_list('id', 'created_at')
+    for pk, created_at in recent.iterator(chunk_size=100):
+        if created_at < horizon:
+            last_id = pk
+            break
+    return encode_cursor(last_id, now)
+
+
+# ==================== FEED ====================
+
+def changes_since(user, last_id, limit=SYNC_PAGE_SIZE, now=None):
+    """
+    Promene posle last_id: {'messages': [...], ..., 'deleted': {...}, 'cursor', 'has_more'}.
+    Svaki objekat se vraća jednom, u trenutnom stanju; objekat koji više ne
+    postoji ili ga korisnik više ne vidi ide u deleted.
+    """
+    now = now or timezone.now()
+    horizon = settle_horizon(now)
+    rows = list(
+        ChangeLog.objects.filter(user=user, id__gt=last_id).order_by('id')
+        .values_list('id', 'entity', 'object_id', 'deleted', 'created_at')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+
+    # Zaustavlja se na prvom "svežem" redu - pokupiće ga sledeći poziv, posle eventualnih starijih id-jeva
+    latest = {}
+    for pk, entity, object_id, deleted, created_at in rows[:limit]:
+        if created_at >= horizon:
+            has_more = False
+            break
+        latest[entity, object_id] = deleted
+        last_id = pk
+
+    feed = {key: [] for _, key, _ in AUDIENCE.values()}
+    feed['deleted'] = {key: [] for _, key, _ in AUDIENCE.values()}
+    for entity, (_, key, _) in AUDIENCE.items():
+        ids = sorted(object_id for (kind, object_id), deleted in latest.items() if kind == entity and not deleted)
+        found = _serialize(entity, user, ids) if ids else []
+        present = {item['id'] for item in found}
+        feed[key] = found
+        feed['deleted'][key] = sorted(
+            [object_id for (kind, object_id), deleted in latest.items() if kind == entity and deleted]
+            + [object_id for object_id in ids if object_id not in present]
+        )
+
+    feed['cursor'] = encode_cursor(last_id, now)
+    feed['has_more'] = has_more
+    return feed
+
+
+def _serialize(entity, user, ids):
+    if entity == ChangeLog.MESSAGE:
+        queryset = Message.objects.filter(Q(sender=user) | Q(recipient=user), pk__in=ids)
+        return MESSAGE_CHANGE.serialize(MESSAGE_CHANGE.rows(queryset.order_by('timestamp', 'pk')))
+    if entity == ChangeLog.NOTIFICATION:
+        queryset = Notification.objects.filter(recipient=user, pk__in=ids)
+        return NOTIFICATION.serialize(NOTIFICATION.rows(queryset.order_by('created_at', 'pk')))
+    if entity == ChangeLog.TRADE:
+        queryset = Trade.objects.filter(Q(user1=user) | Q(user2=user), pk__in=ids)
+        return TRADE_CHANGE.serialize(TRADE_CHANGE.rows(queryset.order_by('updated_at', 'pk')))
+    queryset = Offer.objects.filter(owner=user, pk__in=ids)
+    return OFFER_CHANGE.serialize(OFFER_CHANGE.rows(queryset.order_by('updated_at', 'pk')))
+
+
+def prune(days, batch_size=PRUNE_BATCH):
+    """Obriši redove dnevnika starije od `days` dana (serije od najmanjeg id-ja); vraća broj obrisanih"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        # Najstariji redovi su na početku pk indeksa - serija se seče na prvom mlađem redu
+        rows = list(ChangeLog.objects.order_by('id').values_list('id', 'created_at')[:batch_size])
+        ids = [pk for pk, _ in takewhile(lambda row: row[1] < cutoff, rows)]
+        if not ids:
+            return deleted
+        count, _ = ChangeLog.objects.filter(id__in=ids).delete()
+        deleted += count
+        if len(ids) < len(rows):
+            return deleted
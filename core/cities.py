@@ -0,0 +1,29 @@
+import re
+
+
+# ============================================
+# GRADOVI - ključ za poređenje naziva (ćirilica/latinica, dijakritici, razmaci)
+# ============================================
+
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'ђ': 'đ', 'е': 'e', 'ж': 'ž', 'з': 'z',
+    'и': 'i', 'ј': 'j', 'к': 'k', 'л': 'l', 'љ': 'lj', 'м': 'm', 'н': 'n', 'њ': 'nj', 'о': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'ћ': 'ć', 'у': 'u', 'ф': 'f', 'х': 'h', 'ц': 'c',
+    'ч': 'č', 'џ': 'dž', 'ш': 'š',
+}
+# "Nis", "Niš" i "Ниш" su isti ključ
+DIACRITICS = str.maketrans({'č': 'c', 'ć': 'c', 'š': 's', 'ž': 'z', 'đ': 'dj'})
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def transliterate(text):
+    """Srpska ćirilica -> latinica (ostali znakovi ostaju)"""
+    return ''.join(CYRILLIC_TO_LATIN.get(char, char) for char in text)
+
+
+def city_key(text):
+    """Normalizovan oblik naziva grada: mala latinica bez dijakritika, reči razdvojene jednim razmakom"""
+    if not text:
+        return ''
+    key = transliterate(text.strip().lower()).translate(DIACRITICS)
+    return NON_ALNUM_RE.sub(' ', key).strip()
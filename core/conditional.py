@@ -0,0 +1,76 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+# ============================================
+# CONDITIONAL GET (ETag / Last-Modified)
+# ============================================
+
+def make_etag(*parts):
+    """Kratak ETag iz delova validatora (brojevi, datumi, stringovi)"""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.md5(raw.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+def _conditional_response(request, validators_result):
+    """(response ili None, etag, last_modified) za rezultat validatora"""
+    etag, last_modified = validators_result
+    etag = quote_etag(etag) if etag else None
+    last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+
+def _patch_response(response, etag, last_modified, cache_control):
+    if response.status_code in (200, 304):
+        if etag and not response.has_header('ETag'):
+            response.headers['ETag'] = etag
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if cache_control:
+            patch_cache_control(response, **cache_control)
+    return response
+
+
+def conditional_api(validators, **cache_control):
+    """
+    Dekorator za JSON API: validators(request, *args, **kwargs) vraća
+    (etag, last_modified) iz jeftinog upita, bez pravljenja payload-a.
+    Ako se klijentov If-None-Match / If-Modified-Since poklapa, view se
+    uopšte ne poziva i vraća se 304.
+    Radi i sa async view-ovima - sync validatori se tada izvršavaju preko sync_to_async.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view_func(request, *args, **kwargs)
+
+                if iscoroutinefunction(validators):
+                    result = await validators(request, *args, **kwargs)
+                else:
+                    result = await sync_to_async(validators)(request, *args, **kwargs)
+                response, etag, last_modified = _conditional_response(request, result)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _patch_response(response, etag, last_modified, cache_control)
+            return _wrapped_async
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            response, etag, last_modified = _conditional_response(
+                request, validators(request, *args, **kwargs)
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _patch_response(response, etag, last_modified, cache_control)
+        return _wrapped
+    return decorator
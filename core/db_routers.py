@@ -0,0 +1,90 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+
+
+# ============================================
+# PRIMARNA / REPLIKE
+# Uključuje se kad je postavljen DATABASE_REPLICA_URLS (barter/settings.py).
+# ============================================
+
+STICKY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# True dok obrada zahteva mora da čita sa primarne baze
+_use_primary = ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def primary():
+    """Sva čitanja unutar bloka idu na primarnu bazu"""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Upisi na primarnu; čitanja na nasumičnu repliku osim ako je zahtev 'zalepljen' za primarnu"""
+
+    def db_for_read(self, model, **hints):
+        if _use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replike sadrže iste podatke kao primarna
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_for_request(request):
+    return request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES
+
+
+def _mark_write(request, response):
+    """Posle upisa korisnik još DATABASE_REPLICA_STICKY_SECONDS čita sa primarne (replike kasne)"""
+    if request.method not in SAFE_METHODS:
+        response.set_cookie(
+            STICKY_COOKIE, '1',
+            max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def read_your_writes_middleware(get_response):
+    """POST/PUT/DELETE i zahtevi sa sticky kolačićem čitaju sa primarne baze"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _use_primary.set(_pin_for_request(request))
+            try:
+                response = await get_response(request)
+            finally:
+                _use_primary.reset(token)
+            return _mark_write(request, response)
+    else:
+        def middleware(request):
+            token = _use_primary.set(_pin_for_request(request))
+            try:
+                response = get_response(request)
+            finally:
+                _use_primary.reset(token)
+            return _mark_write(request, response)
+    return middleware
@@ -0,0 +1,114 @@
+import csv
+import json
+import zlib
+
+from django.http import StreamingHttpResponse
+
+
+# ============================================
+# STREAMING IZVOZ (CSV / JSONL)
+# ============================================
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+GZIP_CONTENT_TYPE = 'application/gzip'
+
+OFFER_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('category', 'category__slug'),
+    ('price_range', 'price_range'),
+    ('location', 'location'),
+    ('city', 'city'),
+    ('image', 'image'),
+    ('is_active', 'is_active'),
+    ('created_at', 'created_at'),
+)
+
+
+class Echo:
+    """Pseudo-buffer za csv.writer - vraća liniju umesto da je upisuje"""
+
+    def write(self, value):
+        return value
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_to_text(value) for value in row])
+
+
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_jsonl(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), ensure_ascii=False, default=_json_default) + '\n'
+
+
+def iter_export(header, rows, fmt):
+    if fmt == 'jsonl':
+        return iter_jsonl(header, rows)
+    return iter_csv(header, rows)
+
+
+def iter_gzip(chunks, level=6):
+    """Kompresuj tekstualne chunk-ove u gzip u letu"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def streaming_export_response(header, rows, fmt, filename, compress=False):
+    """StreamingHttpResponse - redovi se šalju klijentu čim se pročitaju"""
+    content = iter_export(header, rows, fmt)
+    if compress:
+        response = StreamingHttpResponse(iter_gzip(content), content_type=GZIP_CONTENT_TYPE)
+        filename = f'{filename}.gz'
+    else:
+        response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def offer_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Redovi ponuda preko values_list().iterator() - bez instanciranja modela"""
+    header = [name for name, _ in OFFER_EXPORT_COLUMNS]
+    lookups = [lookup for _, lookup in OFFER_EXPORT_COLUMNS]
+    rows = queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=chunk_size)
+    return header, rows
+
+
+def model_export_fields(model):
+    """Kolone za izvoz - sva konkretna polja, FK kao id (owner_id, ...)"""
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def queryset_export_rows(queryset, fields=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Redovi bilo kog queryseta preko values_list().iterator() - memorija ostaje ravna"""
+    fields = list(fields or model_export_fields(queryset.model))
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    return fields, rows
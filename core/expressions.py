@@ -0,0 +1,15 @@
+from django.db.models import IntegerField, Subquery
+
+
+class SubqueryCount(Subquery):
+    """COUNT(*) kao korelisani podupit - anotacija bez JOIN-a i GROUP BY"""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+    def __init__(self, queryset, **extra):
+        super().__init__(queryset.order_by().values('pk'), **extra)
+
+
+def subquery_latest(queryset, field):
+    """Najnovija vrednost polja iz korelisanog podupita (koristi indeks, bez agregacije)"""
+    return Subquery(queryset.order_by(f'-{field}').values(field)[:1])
@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .changes import record_objects
+from .models import Favorite, LikeDelta, Notification, Offer
+
+
+# ============================================
+# OMILJENE PONUDE - lajk/unlajk i zbirni likes_count
+# Lajk ne menja red ponude: upisuje Favorite i +1 u LikeDelta dnevnik.
+# flush_likes periodično sabira dnevnik po ponudi (jedan UPDATE po
+# zbiru) i šalje vlasnicima po jednu notifikaciju za sve nove lajkove.
+# ============================================
+
+FLUSH_BATCH = 5000
+NOTIFY_BATCH = 5000
+
+
+def like(user, offer):
+    """Sačuvaj ponudu; False ako je već sačuvana (unique constraint, bez prethodnog SELECT-a)"""
+    try:
+        with transaction.atomic():
+            Favorite.objects.create(user=user, offer=offer)
+            LikeDelta.objects.create(offer=offer, delta=1)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unlike(user, offer):
+    """Ukloni ponudu iz omiljenih; False ako nije bila sačuvana"""
+    with transaction.atomic():
+        deleted, _ = Favorite.objects.filter(user=user, offer=offer).delete()
+        if deleted:
+            LikeDelta.objects.create(offer=offer, delta=-1)
+    return bool(deleted)
+
+
+def current_likes(offer):
+    """likes_count zajedno sa još nesabranim promenama iz dnevnika"""
+    pending = LikeDelta.objects.filter(offer=offer).aggregate(total=Sum('delta'))['total']
+    return offer.likes_count + (pending or 0)
+
+
+def flush_like_deltas(batch_size=FLUSH_BATCH):
+    """Saberi dnevnik u Offer.likes_count; vraća broj ažuriranih ponuda"""
+    updated = 0
+    while True:
+        # Brišu se tačno pročitani redovi - lajk upisan u međuvremenu čeka sledeću seriju
+        rows = list(LikeDelta.objects.order_by('id').values_list('id', 'offer_id', 'delta')[:batch_size])
+        if not rows:
+            return updated
+
+        totals = defaultdict(int)
+        for _, offer_id, delta in rows:
+            totals[offer_id] += delta
+
+        # Jedan UPDATE po različitom zbiru, ne po ponudi
+        groups = defaultdict(list)
+        for offer_id, total in totals.items():
+            if total:
+                groups[total].append(offer_id)
+
+        with transaction.atomic():
+            # Ako je paralelni flush već uzeo deo serije, odustaje se da se ništa ne sabere dvaput
+            deleted, _ = LikeDelta.objects.filter(id__in=[row[0] for row in rows]).delete()
+            if deleted != len(rows):
+                transaction.set_rollback(True)
+                continue
+            for total, offer_ids in groups.items():
+                Offer.objects.filter(pk__in=sorted(offer_ids)).update(likes_count=F('likes_count') + total)
+        updated += sum(len(offer_ids) for offer_ids in groups.values())
+
+
+def notify_new_favorites(limit=NOTIFY_BATCH):
+    """Jedna notifikacija po ponudi za sve lajkove od prošlog slanja; vraća broj notifikacija"""
+    rows = list(
+        Favorite.objects.filter(notified=False)
+        .order_by('offer_id', '-created_at')
+        .values_list('id', 'offer_id', 'offer__owner_id', 'offer__title', 'user_id', 'user__username')[:limit]
+    )
+    if not rows:
+        return 0
+
+    by_offer = defaultdict(list)
+    for row in rows:
+        by_offer[row[1]].append(row)
+
+    notifications = []
+    for offer_id, likes in by_offer.items():
+        # Vlasnik koji sačuva sopstvenu ponudu ne dobija notifikaciju
+        likes = [row for row in likes if row[4] != row[2]]
+        if not likes:
+            continue
+        _, _, owner_id, title, actor_id, actor_name = likes[0]
+        others = len(likes) - 1
+        who = f"{actor_name} i još {others}" if others else actor_name
+        verb = 'su sačuvali' if others else 'je sačuvao'
+        notifications.append(Notification(
+            recipient_id=owner_id,
+            actor_id=actor_id,
+            notification_type='offer_liked',
+            title=f"Vaša ponuda se dopala: {who}",
+            message=f"{who} {verb} vašu ponudu: {title}",
+            offer_id=offer_id,
+        ))
+
+    with transaction.atomic():
+        record_objects(Notification.objects.bulk_create(notifications))
+        Favorite.objects.filter(id__in=[row[0] for row in rows]).update(notified=True)
+    return len(notifications)
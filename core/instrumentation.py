@@ -0,0 +1,88 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger('allauth')
+
+
+# ============================================
+# INSTRUMENTATION - debug hook-ovi nad tuđim kodom
+# Svaki hook se instalira tačno jednom, na prvom zahtevu (CoreConfig.ready
+# povezuje request_started samo kad je INSTRUMENTATION_ENABLED, podrazumevano = DEBUG).
+# ============================================
+
+_registry = {}
+_installed = set()
+
+
+def hook(name):
+    """Registruj funkciju koja instalira hook - importi idu unutar nje, ne na vrh modula"""
+    def decorator(installer):
+        _registry[name] = installer
+        return installer
+    return decorator
+
+
+def install():
+    """Instaliraj sve registrovane hook-ove koji još nisu instalirani. Vraća imena instaliranih."""
+    if not getattr(settings, 'INSTRUMENTATION_ENABLED', settings.DEBUG):
+        return []
+
+    installed = []
+    for name, installer in _registry.items():
+        if name in _installed:
+            continue
+        installer()
+        _installed.add(name)
+        installed.append(name)
+    return installed
+
+
+def install_on_first_request(sender, **kwargs):
+    """request_started receiver - instalira hook-ove i odmah se isključuje"""
+    from django.core.signals import request_started
+    request_started.disconnect(dispatch_uid='core.instrumentation')
+    install()
+
+
+# ==================== HOOK-OVI ====================
+
+def _wrap_complete_login(adapter_class):
+    original = adapter_class.__dict__['complete_login']
+    if getattr(original, '_instrumented', False):
+        return
+
+    @wraps(original)
+    def complete_login(self, request, app, *args, **kwargs):
+        logger.debug('🔵 ALLAUTH complete_login START (%s)', adapter_class.__name__)
+        logger.debug('🔵 App: %s', app)
+        try:
+            result = original(self, request, app, *args, **kwargs)
+        except Exception as e:
+            logger.error('🔴 ALLAUTH ERROR: %s', e, exc_info=True)
+            raise
+        logger.debug('🟢 ALLAUTH complete_login SUCCESS')
+        return result
+
+    complete_login._instrumented = True
+    adapter_class.complete_login = complete_login
+
+
+@hook('allauth.oauth2.complete_login')
+def _instrument_oauth2_complete_login():
+    """
+    Loguj complete_login svih OAuth2 adaptera. Provajderi (npr. Google)
+    override-uju complete_login, pa se patch-uje svaka klasa koja ga definiše,
+    a ne samo bazni OAuth2Adapter.
+    """
+    from allauth.socialaccount.providers import registry
+    from allauth.socialaccount.providers.oauth2.views import OAuth2Adapter
+
+    registry.load()
+    pending = [OAuth2Adapter]
+    while pending:
+        adapter_class = pending.pop()
+        pending.extend(adapter_class.__subclasses__())
+        if 'complete_login' in adapter_class.__dict__:
+            _wrap_complete_login(adapter_class)
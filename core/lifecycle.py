@@ -0,0 +1,195 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .changes import record, record_objects
+from .models import (
+    ArchivedOffer, Category, ChangeLog, Notification, Offer, OfferStatBucket, Review, Trade, default_expiry,
+)
+from .trade_workflow import cancel_competing_trades
+
+
+# ============================================
+# ŽIVOTNI VEK PONUDE - isticanje, obnova, arhiva
+# Aktivna ponuda ističe posle OFFER_LIFETIME_DAYS (podsetnik stiže ranije);
+# vlasnik je može obnoviti. Ponude neaktivne duže od OFFER_ARCHIVE_AFTER_DAYS
+# se premeštaju u ArchivedOffer da liste i indeksi ne nose mrtve redove.
+# ============================================
+
+LIFECYCLE_BATCH = 500
+
+
+class OfferLifecycleError(Exception):
+    """Ponuda nije u stanju koje dozvoljava traženu akciju"""
+
+
+def can_renew(offer):
+    return offer.is_active or offer.expired_at is not None
+
+
+def renew(offer):
+    """Produži rok aktivne ili ponovo aktiviraj isteklu ponudu (ne i ponudu iz završene razmene)"""
+    with transaction.atomic():
+        locked = Offer.objects.select_for_update().get(pk=offer.pk)
+        if not can_renew(locked):
+            raise OfferLifecycleError('Ova ponuda nije istekla i ne može se obnoviti.')
+        locked.expires_at = default_expiry()
+        locked.expiry_reminded = False
+        locked.expired_at = None
+        locked.is_active = True
+        locked.save(update_fields=['expires_at', 'expiry_reminded', 'expired_at', 'is_active', 'updated_at'])
+
+    offer.expires_at, offer.expiry_reminded = locked.expires_at, False
+    offer.expired_at, offer.is_active = None, True
+    return offer
+
+
+def send_expiry_reminders(now=None, batch_size=LIFECYCLE_BATCH):
+    """Jedna notifikacija po ponudi kojoj rok ističe u narednih OFFER_EXPIRY_REMINDER_DAYS dana"""
+    now = now or timezone.now()
+    due = Offer.objects.filter(
+        is_active=True, expiry_reminded=False,
+        expires_at__lte=now + timedelta(days=settings.OFFER_EXPIRY_REMINDER_DAYS),
+    )
+    sent = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            due.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'owner_id', 'title', 'expires_at')[:batch_size]
+        )
+        if not rows:
+            return sent
+        last_pk = rows[-1][0]
+
+        with transaction.atomic():
+            record_objects(Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=owner_id,
+                    offer_id=pk,
+                    notification_type='offer_expiring',
+                    title='Ponuda uskoro ističe',
+                    message=f'Ponuda "{title}" ističe {timezone.localtime(expires_at):%d.%m.%Y.} - obnovite je da ostane vidljiva.',
+                )
+                for pk, owner_id, title, expires_at in rows
+            ]))
+            Offer.objects.filter(pk__in=[row[0] for row in rows]).update(expiry_reminded=True)
+        sent += len(rows)
+
+
+def expire_offers(now=None, batch_size=LIFECYCLE_BATCH):
+    """Deaktiviraj ponude kojima je prošao rok; vraća broj isteklih"""
+    now = now or timezone.now()
+    expired = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            Offer.objects.filter(is_active=True, expires_at__lte=now, pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return expired
+        last_pk = ids[-1]
+
+        with transaction.atomic():
+            # update() zaobilazi Offer.save() - brojači kategorija prate zaključane, zaista deaktivirane ponude
+            rows = list(
+                Offer.objects.select_for_update()
+                .filter(pk__in=ids, is_active=True, expires_at__lte=now)
+                .values_list('pk', 'category_id', 'owner_id', 'title')
+            )
+            deactivated = [row[0] for row in rows]
+            Offer.objects.filter(pk__in=deactivated).update(is_active=False, expired_at=now, updated_at=now)
+            record(ChangeLog.OFFER, [(pk, owner_id) for pk, _, owner_id, _ in rows])
+            Category.adjust_active_counts({
+                category_id: -count for category_id, count in Counter(row[1] for row in rows).items()
+            })
+            cancel_competing_trades(deactivated, now=now)
+            record_objects(Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=owner_id,
+                    offer_id=pk,
+                    notification_type='offer_expired',
+                    title='Ponuda je istekla',
+                    message=f'Ponuda "{title}" je istekla i više nije vidljiva. Možete je obnoviti iz "Moje ponude".',
+                )
+                for pk, _, owner_id, title in rows
+            ]))
+        expired += len(rows)
+
+
+# ==================== ARHIVA ====================
+
+def archive_candidates(cutoff):
+    """
+    Neaktivne ponude nepromenjene od `cutoff`. Ponude sa razmenama ostaju - brisanje
+    ponude kaskadno briše razmenu i iz istorije druge strane; ponude sa recenzijama
+    takođe (recenzije su deo ocene korisnika).
+    """
+    offer_trades = Trade.objects.filter(Q(offer1_id=OuterRef('pk')) | Q(offer2_id=OuterRef('pk')))
+    return (
+        Offer.objects.filter(is_active=False, updated_at__lt=cutoff)
+        .filter(~Exists(Review.objects.filter(offer_id=OuterRef('pk'))))
+        .filter(~Exists(offer_trades))
+    )
+
+
+def archive_offers(cutoff, batch_size=LIFECYCLE_BATCH, dry_run=False):
+    """Premesti kandidate u ArchivedOffer (serije po pk); vraća broj arhiviranih"""
+    candidates = archive_candidates(cutoff)
+    archived = 0
+    last_pk = 0
+    while True:
+        ids = list(candidates.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return archived
+        last_pk = ids[-1]
+        if dry_run:
+            archived += len(ids)
+            continue
+
+        with transaction.atomic():
+            # Ponovna provera pod ključem - ponuda je možda u međuvremenu obnovljena ili dobila razmenu
+            offers = list(candidates.select_for_update().filter(pk__in=ids).values())
+            if not offers:
+                continue
+            moved = [offer['id'] for offer in offers]
+            ArchivedOffer.objects.bulk_create([
+                _archived_offer(offer, related) for offer, related in zip(offers, _related_rows(moved))
+            ])
+            # Kaskadno briše notifikacije, omiljene i statistiku ponude (dnevna ostaje u `data`)
+            Offer.objects.filter(pk__in=moved).delete()
+        archived += len(offers)
+
+
+def _related_rows(offer_ids):
+    """Notifikacije i dnevna statistika svake ponude, istim redom kao offer_ids"""
+    notifications = defaultdict(list)
+    for row in Notification.objects.filter(offer_id__in=offer_ids).values():
+        notifications[row['offer_id']].append(row)
+    stats = defaultdict(list)
+    for offer_id, bucket_start, views, contacts in (
+        OfferStatBucket.objects.filter(offer_id__in=offer_ids, period=OfferStatBucket.DAY)
+        .order_by('offer_id', 'bucket_start').values_list('offer_id', 'bucket_start', 'views', 'contacts')
+    ):
+        stats[offer_id].append({'day': bucket_start, 'views': views, 'contacts': contacts})
+    for offer_id in offer_ids:
+        yield {'notifications': notifications[offer_id], 'stats': stats[offer_id]}
+
+
+def _archived_offer(offer, related):
+    return ArchivedOffer(
+        original_id=offer['id'],
+        owner_id=offer['owner_id'],
+        category_id=offer['category_id'],
+        title=offer['title'],
+        price_range=offer['price_range'],
+        city=offer['city'],
+        views_count=offer['views_count'],
+        created_at=offer['created_at'],
+        deactivated_at=offer['expired_at'] or offer['updated_at'],
+        data={'offer': offer, **related},
+    )
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.lifecycle import LIFECYCLE_BATCH, archive_offers
+
+
+class Command(BaseCommand):
+    help = 'Premesti dugo neaktivne ponude (bez razmena, sa notifikacijama) u arhivu (serije po pk)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.OFFER_ARCHIVE_AFTER_DAYS,
+                            help='Arhiviraj ponude neaktivne i nepromenjene duže od N dana')
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH)
+        parser.add_argument('--dry-run', action='store_true', help='Samo izveštaj, bez upisa')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        archived = archive_offers(
+            cutoff,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        label = 'Bilo bi arhivirano' if options['dry_run'] else 'Arhivirano'
+        self.stdout.write(self.style.SUCCESS(f'✅ {label}: {archived} ponuda'))
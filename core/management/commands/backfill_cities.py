@@ -0,0 +1,91 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from core.cities import city_key, transliterate
+from core.models import City, CityAlias, Offer, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Poveži postojeće ponude i profile sa kanonskim gradom (city_ref) i ujednači nazive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--all', action='store_true', help='Ponovo razreši i već povezane redove')
+        parser.add_argument('--create-missing', type=int, default=0, metavar='N',
+                            help='Napravi grad za svaki nepoznat naziv koji se javlja bar N puta')
+        parser.add_argument('--dry-run', action='store_true', help='Samo izveštaj, bez upisa')
+        parser.add_argument('--show-unresolved', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if options['create_missing'] and not options['dry_run']:
+            self._create_missing(options['create_missing'])
+
+        aliases = {
+            alias: (city_id, name)
+            for alias, city_id, name in CityAlias.objects.values_list('alias', 'city_id', 'city__name')
+        }
+
+        offers = Offer.objects.all() if options['all'] else Offer.objects.filter(city_ref__isnull=True)
+        self._backfill(offers, ('city', 'location'), 'city', aliases, options, 'ponuda')
+
+        profiles = UserProfile.objects.all() if options['all'] else UserProfile.objects.filter(city_ref__isnull=True)
+        self._backfill(profiles, ('location',), 'location', aliases, options, 'profila')
+
+    def _backfill(self, queryset, source_fields, name_field, aliases, options, label):
+        model = queryset.model
+        unresolved = Counter()
+        updated = scanned = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', *source_fields)[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            scanned += len(rows)
+
+            # Jedan UPDATE po gradu za celu seriju
+            groups = defaultdict(list)
+            for pk, *texts in rows:
+                match = next((aliases[key] for key in map(city_key, texts) if key in aliases), None)
+                if match is None:
+                    unresolved[(texts[0] or '').strip()] += 1
+                else:
+                    groups[match].append(pk)
+
+            if not options['dry_run']:
+                with transaction.atomic():
+                    for (city_id, name), ids in groups.items():
+                        model.objects.filter(pk__in=ids).update(city_ref_id=city_id, **{name_field: name})
+            updated += sum(len(ids) for ids in groups.values())
+
+        verb = 'bi bilo povezano' if options['dry_run'] else 'povezano'
+        self.stdout.write(self.style.SUCCESS(f'✅ {label.capitalize()}: {verb} {updated} od {scanned}'))
+        if unresolved:
+            self.stdout.write(self.style.WARNING(f'⚠️ Nepoznat grad ({label}): {sum(unresolved.values())}'))
+            for text, count in unresolved.most_common(options['show_unresolved']):
+                self.stdout.write(f'  {count:>7}  {text or "(prazno)"}')
+
+    def _create_missing(self, threshold):
+        """Česti nepoznati nazivi postaju gradovi (GROUP BY u bazi, ne kroz Python)"""
+        known = set(CityAlias.objects.values_list('alias', flat=True))
+        candidates = Counter()
+        names = {}
+        rows = (
+            Offer.objects.filter(city_ref__isnull=True).exclude(city__isnull=True).exclude(city='')
+            .order_by().values('city').annotate(n=Count('id')).values_list('city', 'n')
+        )
+        for text, count in rows:
+            key = city_key(text)
+            if key and key not in known:
+                candidates[key] += count
+                names.setdefault(key, transliterate(text.strip()))
+        for key, count in candidates.items():
+            if count >= threshold:
+                City.objects.create(name=names[key][:100])
+                self.stdout.write(f'  + {names[key]} ({count})')
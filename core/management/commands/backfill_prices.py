@@ -0,0 +1,63 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Offer
+from core.pricing import parse_price_range
+
+
+class Command(BaseCommand):
+    help = 'Popuni price_min/price_max iz teksta price_range za postojeće ponude (serije po pk)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--all', action='store_true',
+                            help='Ponovo pročitaj sve cene (npr. posle promene parsera ili kursa evra)')
+        parser.add_argument('--dry-run', action='store_true', help='Samo izveštaj, bez upisa')
+        parser.add_argument('--show-unparsed', type=int, default=10,
+                            help='Koliko najčešćih nepročitanih vrednosti prikazati')
+
+    def handle(self, *args, **options):
+        offers = Offer.objects.exclude(price_range__isnull=True).exclude(price_range='')
+        if not options['all']:
+            offers = offers.filter(price_min__isnull=True)
+
+        parsed_cache = {}
+        unparsed = Counter()
+        updated = scanned = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                offers.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'price_range')[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            scanned += len(rows)
+
+            # Isti tekst ("1000 RSD") se ponavlja hiljadama puta - jedan UPDATE po pročitanoj vrednosti
+            groups = defaultdict(list)
+            for pk, text in rows:
+                if text not in parsed_cache:
+                    parsed_cache[text] = parse_price_range(text)
+                prices = parsed_cache[text]
+                if prices == (None, None):
+                    unparsed[text.strip()] += 1
+                    if not options['all']:
+                        continue
+                groups[prices].append(pk)
+
+            if not options['dry_run']:
+                with transaction.atomic():
+                    for (price_min, price_max), ids in groups.items():
+                        Offer.objects.filter(pk__in=ids).update(price_min=price_min, price_max=price_max)
+            updated += sum(len(ids) for ids in groups.values())
+            self.stdout.write(f'  ... {scanned} pregledano, {updated} upisano')
+
+        label = 'Bilo bi upisano' if options['dry_run'] else 'Upisano'
+        self.stdout.write(self.style.SUCCESS(f'✅ {label}: {updated} od {scanned} ponuda'))
+        if unparsed:
+            self.stdout.write(self.style.WARNING(f'⚠️ Nepročitane cene: {sum(unparsed.values())}'))
+            for text, count in unparsed.most_common(options['show_unparsed']):
+                self.stdout.write(f'  {count:>7}  {text}')
@@ -0,0 +1,202 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import Category, Offer, Message, Trade, Review, Notification
+from core.profiling import explain
+
+BENCH_PREFIX = 'bench_user_'
+INDEXED_MODELS = (Offer, Message, Trade, Review, Notification)
+
+
+class Command(BaseCommand):
+    help = (
+        'Uporedi planove i vremena upita za glavne obrasce pristupa: indeksi iz --baseline '
+        'migracije naspram trenutnih. Samo nad snapshot bazom - indeksi se privremeno menjaju i zatim vraćaju.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Prvo napuni bazu sintetičkim podacima')
+        parser.add_argument('--scale', type=float, default=1.0, help='Faktor veličine seed-a (1 = ~300k redova)')
+        parser.add_argument('--baseline', default='0002_userprofile_updated_at',
+                            help='core migracija čiji indeksi su "pre" stanje')
+        parser.add_argument('--repeat', type=int, default=7, help='Broj ponavljanja po upitu (medijana)')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self._seed(options['scale'])
+
+        users = list(
+            User.objects.filter(username__startswith=BENCH_PREFIX)
+            .annotate(n=Count('received_messages')).order_by('-n').values_list('pk', flat=True)[:2]
+        )
+        if len(users) < 2:
+            raise CommandError('Nema benchmark podataka - pokreni sa --seed.')
+        context = {
+            'user': users[0],
+            'other': users[1],
+            'category': Offer.objects.values_list('category_id', flat=True).first(),
+        }
+
+        swap = self._index_swap(options['baseline'])
+        self._swap_indexes(swap, reverse=False)
+        try:
+            self._analyze()
+            before = self._measure(context, options['repeat'])
+        finally:
+            self._swap_indexes(swap, reverse=True)
+        self._analyze()
+        after = self._measure(context, options['repeat'])
+
+        for name, _ in self._patterns():
+            old, new = before[name], after[name]
+            speedup = old['ms'] / new['ms'] if new['ms'] else float('inf')
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {old["ms"]:.2f} ms → {new["ms"]:.2f} ms (x{speedup:.1f})'
+            ))
+            self.stdout.write(f'  pre:   {" / ".join(old["plan"].splitlines())}  {old["flags"] or ""}')
+            self.stdout.write(f'  posle: {" / ".join(new["plan"].splitlines())}  {new["flags"] or ""}')
+
+    # ==================== OBRASCI PRISTUPA ====================
+
+    def _patterns(self):
+        return [
+            ('offer_list', lambda c: Offer.objects.filter(is_active=True).order_by('-created_at')[:12]),
+            ('offer_list_category', lambda c: Offer.objects.filter(
+                is_active=True, category_id=c['category']).order_by('-created_at')[:12]),
+            ('my_offers', lambda c: Offer.objects.filter(owner_id=c['user']).order_by('-created_at')),
+            ('conversation', lambda c: Message.objects.filter(
+                Q(sender_id=c['user'], recipient_id=c['other']) | Q(sender_id=c['other'], recipient_id=c['user'])
+            ).order_by('-timestamp')[:20]),
+            ('unread_messages', lambda c: Message.objects.filter(
+                recipient_id=c['user'], is_read=False).order_by().values('pk')),
+            ('trades_sent_pending', lambda c: Trade.objects.filter(
+                user1_id=c['user'], status='pending').order_by('-created_at')[:12]),
+            ('trades_received_pending', lambda c: Trade.objects.filter(
+                user2_id=c['user'], status='pending').order_by('-created_at')[:12]),
+            ('profile_reviews', lambda c: Review.objects.filter(reviewed_user_id=c['user']).order_by('-created_at')[:10]),
+            ('notifications', lambda c: Notification.objects.filter(recipient_id=c['user']).order_by('-created_at')[:20]),
+            ('unread_notifications', lambda c: Notification.objects.filter(
+                recipient_id=c['user'], is_read=False).order_by().values('pk')),
+        ]
+
+    def _measure(self, context, repeat):
+        results = {}
+        for name, build in self._patterns():
+            plan, flags = explain(connection, *build(context).query.sql_with_params())
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(build(context))
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {'ms': statistics.median(timings), 'plan': plan, 'flags': flags}
+        return results
+
+    # ==================== INDEKSI ====================
+
+    def _index_swap(self, baseline):
+        """(model, indeksi samo u trenutnom stanju, indeksi samo u baseline migraciji)"""
+        state = MigrationLoader(connection).project_state(('core', baseline))
+        swap = []
+        for model in INDEXED_MODELS:
+            old = {index.name: index for index in state.models['core', model._meta.model_name].options['indexes']}
+            new = {index.name: index for index in model._meta.indexes}
+            swap.append((
+                model,
+                [new[name] for name in sorted(new.keys() - old.keys())],
+                [old[name] for name in sorted(old.keys() - new.keys())],
+            ))
+        return swap
+
+    def _swap_indexes(self, swap, reverse):
+        """Pređi na baseline indekse ili (reverse) vrati trenutne"""
+        with connection.schema_editor() as editor:
+            for model, current, baseline in swap:
+                drop, create = (baseline, current) if reverse else (current, baseline)
+                for index in create:
+                    editor.add_index(model, index)
+                for index in drop:
+                    editor.remove_index(model, index)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    # ==================== SEED ====================
+
+    def _seed(self, scale):
+        now = timezone.now()
+        rng = random.Random(42)
+        sizes = {name: max(int(count * scale), 10) for name, count in (
+            ('users', 500), ('offers', 50000), ('messages', 100000),
+            ('trades', 20000), ('reviews', 20000), ('notifications', 100000),
+        )}
+
+        categories = list(Category.objects.values_list('pk', flat=True)) or [
+            Category.objects.create(name='Benchmark', slug='benchmark').pk
+        ]
+        start = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        User.objects.bulk_create(
+            [User(username=f'{BENCH_PREFIX}{start + i}') for i in range(sizes['users'])], batch_size=1000
+        )
+        users = list(User.objects.filter(username__startswith=BENCH_PREFIX).values_list('pk', flat=True))
+        # Nekoliko "vrućih" korisnika sa mnogo podataka - realna raspodela
+        hot = users[:5]
+
+        def pick_user():
+            return rng.choice(hot) if rng.random() < 0.2 else rng.choice(users)
+
+        def moment():
+            return now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+
+        self._bulk(Offer, [Offer(
+            title=f'Bench ponuda {i}', slug=f'bench-{i}', description='-', offered='-', wanted='-',
+            category_id=rng.choice(categories), owner_id=pick_user(),
+            is_active=rng.random() < 0.7, created_at=moment(),
+        ) for i in range(sizes['offers'])])
+        offers = list(Offer.objects.filter(slug__startswith='bench-').values_list('pk', 'owner_id'))
+
+        self._bulk(Message, [Message(
+            sender_id=pick_user(), recipient_id=pick_user(), body='-',
+            is_read=rng.random() < 0.9, timestamp=moment(),
+        ) for _ in range(sizes['messages'])])
+
+        statuses = [status for status, _ in Trade.STATUS_CHOICES]
+        self._bulk(Trade, [Trade(
+            offer2_id=offer_id, user1_id=pick_user(), user2_id=owner_id,
+            status=rng.choice(statuses), created_at=moment(),
+        ) for offer_id, owner_id in rng.choices(offers, k=sizes['trades'])])
+
+        self._bulk(Review, [Review(
+            reviewer_id=pick_user(), reviewed_user_id=owner_id, offer_id=offer_id,
+            rating=rng.randint(1, 5), created_at=moment(),
+        ) for offer_id, owner_id in rng.sample(offers, k=min(sizes['reviews'], len(offers)))],
+            ignore_conflicts=True)
+
+        self._bulk(Notification, [Notification(
+            recipient_id=pick_user(), notification_type='message', title='-', message='-',
+            is_read=rng.random() < 0.85, created_at=moment(),
+        ) for _ in range(sizes['notifications'])])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Seed: {sizes}'))
+
+    def _bulk(self, model, objects, **kwargs):
+        # auto_now_add bi pregazio sintetička vremena - privremeno isključen za seed
+        date_fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+        for field in date_fields:
+            field.auto_now_add = False
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=2000, **kwargs)
+        finally:
+            for field in date_fields:
+                field.auto_now_add = True
+
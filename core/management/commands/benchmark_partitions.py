@@ -0,0 +1,183 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.template.defaultfilters import filesizeformat
+
+from core.partitioning import add_months, is_supported, month_start, partition_name
+from core.profiling import explain
+
+PLAIN = 'bench_part_plain'
+MONTHLY = 'bench_part_monthly'
+HOT_USERS = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Uporedi neparticionisanu i mesečno particionisanu tabelu oblika core_message: veličinu indeksa, '
+        'vreme tipičnih upita i retenciju (DELETE naspram DROP particije). Radi nad zasebnim bench_part_* tabelama.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help='Broj sintetičkih poruka')
+        parser.add_argument('--months', type=int, default=24, help='Raspon poruka unazad (meseci)')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=7, help='Broj ponavljanja po upitu (medijana)')
+        parser.add_argument('--keep', action='store_true', help='Ne briši bench_part_* tabele na kraju')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Benchmark particija radi samo na PostgreSQL-u.')
+
+        self._create_tables(options['months'])
+        try:
+            self._seed(options['rows'], options['months'], options['users'])
+            self._report_sizes()
+            self._report_queries(options['repeat'])
+            self._report_retention(options['months'])
+        finally:
+            if not options['keep']:
+                self._drop_tables()
+
+    # ==================== TABELE ====================
+
+    def _create_tables(self, months):
+        self._drop_tables()
+        columns = (
+            'id bigint NOT NULL, sender_id integer NOT NULL, recipient_id integer NOT NULL, '
+            'body text NOT NULL, is_read boolean NOT NULL, "timestamp" timestamptz NOT NULL'
+        )
+        current = month_start()
+        first = add_months(current, -months)
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE {PLAIN} ({columns}, PRIMARY KEY (id))')
+            cursor.execute(f'CREATE TABLE {MONTHLY} ({columns}) PARTITION BY RANGE ("timestamp")')
+            for offset in range(months + 2):
+                start = add_months(first, offset)
+                cursor.execute(
+                    f'CREATE TABLE {partition_name(MONTHLY, start)} PARTITION OF {MONTHLY} '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+                )
+
+    def _drop_tables(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {PLAIN}, {MONTHLY}')
+
+    def _seed(self, rows, months, users):
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            # Nekoliko "vrućih" korisnika sa mnogo poruka, starije poruke su uglavnom pročitane
+            cursor.execute(
+                f"""
+                INSERT INTO {PLAIN}
+                SELECT id, sender_id, recipient_id, '-',
+                       random() < CASE WHEN ts < now() - interval '30 days' THEN 0.99 ELSE 0.6 END,
+                       ts
+                FROM (
+                    SELECT g AS id,
+                           CASE WHEN random() < 0.2 THEN 1 + (random() * {HOT_USERS - 1})::int
+                                ELSE 1 + (random() * {users - 1})::int END AS sender_id,
+                           CASE WHEN random() < 0.2 THEN 1 + (random() * {HOT_USERS - 1})::int
+                                ELSE 1 + (random() * {users - 1})::int END AS recipient_id,
+                           now() - random() * interval '{months} months' AS ts
+                    FROM generate_series(1, %s) AS g
+                ) AS seed
+                """,
+                [rows],
+            )
+            cursor.execute(f'INSERT INTO {MONTHLY} SELECT * FROM {PLAIN}')
+            # Isti indeksi kao Message; na particionisanoj tabeli se prave po particiji
+            for table in (PLAIN, MONTHLY):
+                if table == MONTHLY:
+                    cursor.execute(f'CREATE INDEX {table}_id_idx ON {table} (id)')
+                cursor.execute(f'CREATE INDEX {table}_time_idx ON {table} ("timestamp")')
+                cursor.execute(f'CREATE INDEX {table}_pair_idx ON {table} (sender_id, recipient_id, "timestamp" DESC)')
+                cursor.execute(f'CREATE INDEX {table}_unread_idx ON {table} (recipient_id) WHERE NOT is_read')
+                cursor.execute(f'ANALYZE {table}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Seed: {rows} poruka u {months} meseci ({time.perf_counter() - started:.1f} s)'
+        ))
+
+    # ==================== MERENJA ====================
+
+    def _index_size(self, cursor, table):
+        cursor.execute(
+            """
+            SELECT COALESCE(sum(pg_indexes_size(c.oid)), 0)
+            FROM pg_class c
+            WHERE c.oid = to_regclass(%s)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+            """,
+            [table, table],
+        )
+        return cursor.fetchone()[0]
+
+    def _report_sizes(self):
+        current = partition_name(MONTHLY, month_start())
+        with connection.cursor() as cursor:
+            plain = self._index_size(cursor, PLAIN)
+            monthly = self._index_size(cursor, MONTHLY)
+            hot = self._index_size(cursor, current)
+        self.stdout.write(self.style.MIGRATE_HEADING('Indeksi:'))
+        self.stdout.write(f'  bez particija: {filesizeformat(plain)}')
+        self.stdout.write(f'  mesečne:       {filesizeformat(monthly)} ukupno, tekući mesec {filesizeformat(hot)}')
+
+    def _patterns(self):
+        return [
+            ('conversation', """
+                SELECT * FROM {table}
+                WHERE (sender_id = 1 AND recipient_id = 2) OR (sender_id = 2 AND recipient_id = 1)
+                ORDER BY "timestamp" DESC LIMIT 20"""),
+            ('unread_count', 'SELECT count(*) FROM {table} WHERE recipient_id = 1 AND NOT is_read'),
+            ('recent_30_days', """
+                SELECT * FROM {table}
+                WHERE recipient_id = 1 AND "timestamp" >= now() - interval '30 days'
+                ORDER BY "timestamp" DESC LIMIT 20"""),
+            ('latest_page', 'SELECT * FROM {table} ORDER BY "timestamp" DESC LIMIT 50'),
+            ('by_id', 'SELECT * FROM {table} WHERE id = 12345'),
+        ]
+
+    def _time(self, sql, repeat):
+        timings = []
+        with connection.cursor() as cursor:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                cursor.execute(sql)
+                cursor.fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def _report_queries(self, repeat):
+        for name, template in self._patterns():
+            plain_sql, monthly_sql = template.format(table=PLAIN), template.format(table=MONTHLY)
+            plain_ms, monthly_ms = self._time(plain_sql, repeat), self._time(monthly_sql, repeat)
+            speedup = plain_ms / monthly_ms if monthly_ms else float('inf')
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name}: {plain_ms:.2f} ms → {monthly_ms:.2f} ms (x{speedup:.1f})'
+            ))
+            self.stdout.write(f'  bez particija: {" / ".join(explain(connection, plain_sql)[0].splitlines())}')
+            self.stdout.write(f'  mesečne:       {" / ".join(explain(connection, monthly_sql)[0].splitlines())}')
+
+    def _report_retention(self, months):
+        """Uklanjanje najstarijeg meseca: DELETE naspram DETACH + DROP (obe u transakciji koja se poništava)"""
+        oldest = add_months(month_start(), -months)
+        cutoff = add_months(oldest, 1)
+        timings = {}
+        for label, statements in (
+            ('DELETE', [f'DELETE FROM {PLAIN} WHERE "timestamp" < %s']),
+            ('DETACH + DROP', [
+                f'ALTER TABLE {MONTHLY} DETACH PARTITION {partition_name(MONTHLY, oldest)}',
+                f'DROP TABLE {partition_name(MONTHLY, oldest)}',
+            ]),
+        ):
+            with transaction.atomic(), connection.cursor() as cursor:
+                started = time.perf_counter()
+                for statement in statements:
+                    cursor.execute(statement, [cutoff] if '%s' in statement else None)
+                timings[label] = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'retencija ({oldest:%Y-%m}): DELETE {timings["DELETE"]:.0f} ms → '
+            f'DETACH + DROP {timings["DETACH + DROP"]:.0f} ms'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import CacheMetrics, tiered_cache
+
+
+class Command(BaseCommand):
+    help = 'Prikaži hit/miss brojače tiered keša (zbir svih worker-a iz deljenog keša)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Obriši brojače posle prikaza')
+
+    def handle(self, *args, **options):
+        shared = tiered_cache.shared
+        stats = CacheMetrics.shared_snapshot(shared)
+
+        hits = stats['local_hits'] + stats['shared_hits']
+        lookups = hits + stats['misses']
+        for name, value in stats.items():
+            self.stdout.write(f'{name:>12}: {value}')
+        if lookups:
+            self.stdout.write(f'{"hit rate":>12}: {hits / lookups:.1%}')
+
+        if options['reset']:
+            shared.delete_many([CacheMetrics.KEY_PREFIX + name for name in CacheMetrics.COUNTERS])
+            self.stdout.write(self.style.SUCCESS('✅ Brojači obrisani'))
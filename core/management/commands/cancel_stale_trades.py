@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import Offer, Trade
+from core.trade_workflow import cancel_competing_trades
+
+
+class Command(BaseCommand):
+    help = 'Otkaži zahteve na čekanju koji uključuju neaktivne ponude (jednokratno čišćenje)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = Trade.objects.filter(status='pending')
+        offer_ids = list(
+            Offer.objects
+            .filter(is_active=False)
+            .filter(Q(pk__in=pending.values('offer1_id')) | Q(pk__in=pending.values('offer2_id')))
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+        total = 0
+        chunk_size = options['chunk_size']
+        for start in range(0, len(offer_ids), chunk_size):
+            with transaction.atomic():
+                total += cancel_competing_trades(offer_ids[start:start + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Otkazano razmena: {total}'))
@@ -1,6 +1,10 @@
 from django.core.management.base import BaseCommand
 from core.models import Category
 
+# Skraćeni nazivi roditelja u listi ispod
+PARENT_ALIASES = {'Mobilni tel.': 'Mobilni telefoni'}
+
+
 class Command(BaseCommand):
     help = 'Create all categories from kupujemprodajem.com'
 
@@ -61,7 +65,14 @@ class Command(BaseCommand):
 
         created_count = 0
         for category_name in categories:
-            category, created = Category.objects.get_or_create(name=category_name)
+            # "Roditelj | Dete" - roditelj se pravi po potrebi
+            *parents, name = [part.strip() for part in category_name.split('|')]
+            parent = None
+            for parent_name in parents:
+                parent, _ = Category.objects.get_or_create(
+                    name=PARENT_ALIASES.get(parent_name, parent_name), parent=parent,
+                )
+            category, created = Category.objects.get_or_create(name=name, parent=parent)
             if created:
                 created_count += 1
                 self.stdout.write(self.style.SUCCESS(f'✓ Kreirano: {category_name}'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.lifecycle import LIFECYCLE_BATCH, expire_offers, send_expiry_reminders
+
+
+class Command(BaseCommand):
+    help = 'Pošalji podsetnike za ponude kojima ističe rok i deaktiviraj istekle (cron, npr. na sat)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LIFECYCLE_BATCH)
+        parser.add_argument('--no-reminders', action='store_true', help='Samo isticanje, bez podsetnika')
+
+    def handle(self, *args, **options):
+        if not options['no_reminders']:
+            sent = send_expiry_reminders(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Poslato podsetnika: {sent}'))
+
+        expired = expire_offers(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Isteklo ponuda: {expired}'))
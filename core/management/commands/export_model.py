@@ -0,0 +1,61 @@
+import sys
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export, iter_gzip, queryset_export_rows
+
+
+class Command(BaseCommand):
+    help = 'Streaming izvoz core modela u CSV/JSONL (opciono gzip)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Naziv modela, npr. Offer ili core.Offer')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Kompresuj izlaz u letu')
+        parser.add_argument('--output', '-o', help='Izlazni fajl (podrazumevano stdout)')
+        parser.add_argument('--filter', action='append', default=[], metavar='POLJE=VREDNOST',
+                            help='Filter za queryset, npr. --filter is_active=True')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        model_name = options['model'].split('.')[-1]
+        try:
+            model = apps.get_model('core', model_name)
+        except LookupError:
+            raise CommandError(f'Nepoznat model: {options["model"]}')
+
+        queryset = model.objects.filter(**self._parse_filters(options['filter']))
+        header, rows = queryset_export_rows(queryset, chunk_size=options['chunk_size'])
+        chunks = iter_export(header, rows, options['format'])
+
+        if options['gzip']:
+            self._write(iter_gzip(chunks), options['output'], binary=True)
+        else:
+            self._write(chunks, options['output'], binary=False)
+
+    def _parse_filters(self, raw_filters):
+        filters = {}
+        for raw in raw_filters:
+            if '=' not in raw:
+                raise CommandError(f'Neispravan filter: {raw}')
+            key, value = raw.split('=', 1)
+            if value in ('True', 'False'):
+                value = value == 'True'
+            filters[key] = value
+        return filters
+
+    def _write(self, chunks, output, binary):
+        if output:
+            mode = 'wb' if binary else 'w'
+            encoding = None if binary else 'utf-8'
+            with open(output, mode, encoding=encoding, newline=None if binary else '') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'✅ Izvezeno u {output}'))
+            return
+
+        stream = sys.stdout.buffer if binary else sys.stdout
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.favorites import FLUSH_BATCH, NOTIFY_BATCH, flush_like_deltas, notify_new_favorites
+
+
+class Command(BaseCommand):
+    help = 'Saberi dnevnik lajkova u Offer.likes_count i pošalji grupne notifikacije (cron, npr. svakog minuta)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=FLUSH_BATCH)
+        parser.add_argument('--notify-limit', type=int, default=NOTIFY_BATCH,
+                            help='Najviše novih lajkova obrađenih u jednom pokretanju')
+        parser.add_argument('--no-notify', action='store_true', help='Samo brojači, bez notifikacija')
+
+    def handle(self, *args, **options):
+        updated = flush_like_deltas(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ likes_count ažuriran za {updated} ponuda'))
+
+        if not options['no_notify']:
+            sent = notify_new_favorites(options['notify_limit'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Poslato notifikacija: {sent}'))
@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk import DEFAULT_CHUNK_SIZE, IMPORT_FORMATS, detect_format, import_offers
+
+
+class Command(BaseCommand):
+    help = 'Masovni uvoz ponuda iz CSV/JSONL fajla za jednog korisnika'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Putanja do CSV ili JSONL fajla')
+        parser.add_argument('--user', required=True, help='Username vlasnika ponuda')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Format fajla (podrazumevano po ekstenziji)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Samo validacija, bez upisa')
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Korisnik ne postoji: {options["user"]}')
+
+        fmt = options['format'] or detect_format(options['path'])
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = import_offers(
+                    stream,
+                    owner=owner,
+                    fmt=fmt,
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                )
+        except OSError as e:
+            raise CommandError(f'Ne mogu da otvorim fajl: {e}')
+
+        for line, error in result.errors:
+            self.stdout.write(self.style.WARNING(f'- Red {line}: {error}'))
+        if result.truncated_errors:
+            self.stdout.write(self.style.WARNING(f'... i još {result.truncated_errors} grešaka'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Obrađeno: {result.processed}, uvezeno: {result.created}, greške: {result.error_count}'
+        ))
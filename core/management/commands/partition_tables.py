@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from core.partitioning import (
+    PARTITIONED, PartitioningError, convert, create_partitions, default_rows, detach_partitions,
+    expired_partitions, is_partitioned, is_supported, partitions, plan_conversion,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mesečne particije za Message i Notification (PostgreSQL): status, convert (jednokratni prelazak), '
+        'create (nove particije - cron) i retention (DETACH/DROP starih meseci)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('status', 'convert', 'create', 'retention'))
+        parser.add_argument('--table', action='append', choices=sorted(PARTITIONED),
+                            help='Samo navedene tabele (podrazumevano sve)')
+        parser.add_argument('--months-ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD,
+                            help='Koliko meseci unapred moraju postojati particije')
+        parser.add_argument('--keep-months', type=int,
+                            help='retention: zadrži poslednjih N meseci (podrazumevano *_RETENTION_MONTHS)')
+        parser.add_argument('--drop', action='store_true',
+                            help='retention: obriši odvojene particije (inače ostaju kao zasebne tabele)')
+        parser.add_argument('--dry-run', action='store_true', help='convert/retention: samo prikaži šta bi se uradilo')
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            raise CommandError('Particionisanje je podržano samo na PostgreSQL-u - ova baza radi bez particija.')
+
+        for key in options['table'] or sorted(PARTITIONED):
+            spec = PARTITIONED[key]
+            try:
+                getattr(self, f'_{options["action"]}')(spec, options)
+            except PartitioningError as exc:
+                raise CommandError(str(exc))
+
+    def _status(self, spec, options):
+        table = spec.model._meta.db_table
+        if not is_partitioned(table):
+            self.stdout.write(f'{table}: nije particionisana')
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(table))
+        for partition in partitions(table):
+            start = f'{partition.start:%Y-%m-%d}' if partition.start else '-'
+            end = f'{partition.end:%Y-%m-%d}' if partition.end else '-'
+            self.stdout.write(
+                f'  {partition.name:<40} {start:>10} → {end:<10} ~{partition.rows} redova, '
+                f'{filesizeformat(partition.size)}'
+            )
+        stray = default_rows(spec)
+        if stray:
+            self.stdout.write(self.style.WARNING(f'  ⚠️ {stray} redova u default particiji - "create" je propušten'))
+
+    def _convert(self, spec, options):
+        if options['dry_run']:
+            plan = plan_conversion(spec, options['months_ahead'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f'-- {spec.model._meta.db_table}: priprema (bez transakcije)'))
+            self.stdout.write(';\n'.join(plan.prepare) + ';')
+            self.stdout.write(self.style.MIGRATE_HEADING('-- zamena (jedna transakcija)'))
+            self.stdout.write(';\n'.join(plan.swap) + ';')
+            return
+        plan = convert(spec, options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {spec.model._meta.db_table}: particionisana, legacy particija do {plan.boundary:%Y-%m-%d}'
+        ))
+
+    def _create(self, spec, options):
+        created = create_partitions(spec, options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {spec.model._meta.db_table}: napravljeno {len(created)} particija {", ".join(created)}'.rstrip()
+        ))
+
+    def _retention(self, spec, options):
+        table = spec.model._meta.db_table
+        keep = options['keep_months']
+        if keep is None:
+            keep = getattr(settings, spec.retention_setting)
+        if keep <= 0:
+            self.stdout.write(self.style.WARNING(f'⚠️ {table}: retencija isključena ({spec.retention_setting}=0)'))
+            return
+
+        if options['dry_run']:
+            expired = expired_partitions(spec, keep)
+            self.stdout.write(f'{table}: bilo bi uklonjeno {len(expired)} particija {" ".join(p.name for p in expired)}')
+            return
+        removed = detach_partitions(spec, keep, drop=options['drop'])
+        label = 'obrisano' if options['drop'] else 'odvojeno'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {table}: {label} {len(removed)} particija (~{sum(p.rows for p in removed)} redova)'
+        ))
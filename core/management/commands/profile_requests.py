@@ -0,0 +1,170 @@
+import json
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+
+from core.profiling import explain, filtered_columns, is_explainable, normalize_sql, parse_request_log
+
+DEFAULT_EXCLUDES = ('/accounts/', '/admin/', '/static/', '/media/')
+
+
+class _Rollback(Exception):
+    """Replay ne sme da menja snapshot bazu"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Ponovi snimljene zahteve (JSONL ili runserver log) nad snapshot bazom, '
+        'uradi EXPLAIN za svaki upit i napravi rangirani izveštaj'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('logs', nargs='+', help='Fajlovi sa zahtevima (JSONL ili access log)')
+        parser.add_argument('--user', help='Podrazumevani korisnik za zahteve bez korisnika')
+        parser.add_argument('--include-writes', action='store_true',
+                            help='Ponovi i POST/PUT/DELETE (uvek u transakciji koja se poništava)')
+        parser.add_argument('--exclude', action='append',
+                            help='Prefiks putanje koji se preskače (može više puta; zamenjuje podrazumevane '
+                                 f'{" ".join(DEFAULT_EXCLUDES)})')
+        parser.add_argument('--limit', type=int, default=0, help='Najviše ovoliko zahteva (0 = svi)')
+        parser.add_argument('--top', type=int, default=20, help='Koliko upita prikazati u izveštaju')
+        parser.add_argument('-o', '--output', help='Upiši izveštaj u fajl umesto na stdout')
+        parser.add_argument('--json', action='store_true', help='Izveštaj kao JSON')
+
+    def handle(self, *args, **options):
+        options['exclude'] = tuple(options['exclude'] or DEFAULT_EXCLUDES)
+        requests = self._load(options)
+        if not requests:
+            raise CommandError('U logovima nema zahteva za ponavljanje.')
+
+        users = {}
+        stats = defaultdict(lambda: {
+            'count': 0, 'time': 0.0, 'endpoints': set(), 'sql': None,
+        })
+        endpoint_stats = defaultdict(lambda: {'requests': 0, 'queries': 0, 'time': 0.0})
+
+        for recorded in requests:
+            endpoint = self._endpoint(recorded.path)
+            queries = self._replay(recorded, options['user'], users)
+            endpoint_stats[endpoint]['requests'] += 1
+            for query in queries:
+                seconds = float(query['time'] or 0)
+                endpoint_stats[endpoint]['queries'] += 1
+                endpoint_stats[endpoint]['time'] += seconds
+                if not is_explainable(query['sql']):
+                    continue
+                entry = stats[normalize_sql(query['sql'])]
+                entry['count'] += 1
+                entry['time'] += seconds
+                entry['endpoints'].add(endpoint)
+                entry['sql'] = entry['sql'] or query['sql']
+
+        report = self._rank(stats, options['top'])
+        self._write(report, endpoint_stats, len(requests), options)
+
+    def _load(self, options):
+        requests = []
+        for path in options['logs']:
+            with open(path, encoding='utf-8', errors='replace') as stream:
+                for recorded in parse_request_log(stream):
+                    if recorded.path.startswith(options['exclude']):
+                        continue
+                    if recorded.method not in ('GET', 'HEAD') and not options['include_writes']:
+                        continue
+                    requests.append(recorded)
+        if options['limit']:
+            requests = requests[:options['limit']]
+        return requests
+
+    def _endpoint(self, path):
+        try:
+            return resolve(path).view_name
+        except Resolver404:
+            return path
+
+    def _replay(self, recorded, default_user, users):
+        client = Client(HTTP_HOST='localhost')
+        username = recorded.user or default_user
+        if username:
+            if username not in users:
+                users[username] = User.objects.filter(username=username).first()
+            if users[username] is not None:
+                client.force_login(users[username])
+
+        url = recorded.path + (f'?{recorded.query}' if recorded.query else '')
+        method = getattr(client, recorded.method.lower(), client.get)
+        with CaptureQueriesContext(connection) as captured:
+            try:
+                with transaction.atomic():
+                    response = method(url)
+                    if getattr(response, 'streaming', False):
+                        b''.join(response.streaming_content)
+                    raise _Rollback
+            except _Rollback:
+                pass
+        return captured.captured_queries
+
+    def _rank(self, stats, top):
+        report = []
+        for normalized, entry in stats.items():
+            plan, flags = explain(connection, entry['sql'])
+            suggestions = []
+            for flag in flags:
+                if flag.startswith('seq_scan:'):
+                    table = flag.split(':', 1)[1]
+                    columns = filtered_columns(entry['sql'], table)
+                    if columns:
+                        suggestions.append(f'{table}({", ".join(columns)})')
+            report.append({
+                'sql': normalized,
+                'count': entry['count'],
+                'total_ms': round(entry['time'] * 1000, 2),
+                'endpoints': sorted(entry['endpoints']),
+                'flags': sorted(set(flags)),
+                'index_candidates': suggestions,
+                'plan': plan,
+            })
+        # Prvo upiti sa punim skeniranjem core tabela, pa po ukupnom vremenu
+        report.sort(key=lambda row: (
+            not any(flag.startswith('seq_scan:') for flag in row['flags']),
+            -row['total_ms'],
+            -row['count'],
+        ))
+        return report[:top]
+
+    def _write(self, report, endpoint_stats, replayed, options):
+        if options['json']:
+            content = json.dumps({
+                'replayed': replayed,
+                'endpoints': endpoint_stats,
+                'queries': report,
+            }, indent=2, ensure_ascii=False)
+        else:
+            lines = [f'Ponovljeno zahteva: {replayed}', '', 'ENDPOINTI (po ukupnom vremenu upita)']
+            for endpoint, row in sorted(endpoint_stats.items(), key=lambda item: -item[1]['time']):
+                lines.append(
+                    f'  {endpoint:<40} zahteva {row["requests"]:>5}  upita {row["queries"]:>6}  '
+                    f'{row["time"] * 1000:>9.1f} ms'
+                )
+            lines += ['', 'UPITI (rangirano)']
+            for rank, row in enumerate(report, start=1):
+                flags = ', '.join(row['flags']) or '-'
+                lines.append(f'{rank:>3}. {row["total_ms"]:>9.1f} ms  x{row["count"]:<5} [{flags}]')
+                lines.append(f'     endpointi: {", ".join(row["endpoints"])}')
+                if row['index_candidates']:
+                    lines.append(f'     kandidati za indeks: {"; ".join(row["index_candidates"])}')
+                lines.append(f'     {row["sql"][:300]}')
+                lines.extend(f'       | {plan_line}' for plan_line in row['plan'].splitlines())
+            content = '\n'.join(lines)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(content + '\n')
+            self.stdout.write(self.style.SUCCESS(f'✅ Izveštaj upisan u {options["output"]}'))
+        else:
+            self.stdout.write(content)
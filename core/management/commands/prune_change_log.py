@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.changes import PRUNE_BATCH, prune
+
+
+class Command(BaseCommand):
+    help = 'Obriši redove dnevnika promena (delta sync) starije od SYNC_CHANGELOG_DAYS (cron, npr. jednom dnevno)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SYNC_CHANGELOG_DAYS,
+                            help='Zadrži promene iz poslednjih N dana')
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH)
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Obrisano redova dnevnika: {deleted}'))
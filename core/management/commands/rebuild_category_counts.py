@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Preračunaj brojače aktivnih ponuda po podstablu kategorija (popravka posle ručnih izmena u bazi)'
+
+    def handle(self, *args, **options):
+        changed = Category.rebuild_active_counts()
+        if changed:
+            self.stdout.write(self.style.WARNING(f'⚠️ Ispravljeno brojača: {changed}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Svi brojači su tačni'))
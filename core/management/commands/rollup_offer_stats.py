@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import ROLLUP_BATCH, prune_hourly, rollup_events
+
+
+class Command(BaseCommand):
+    help = 'Saberi događaje ponuda (pregledi, kontakti) u satne/dnevne buckete i views_count (cron, npr. na 5 minuta)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=ROLLUP_BATCH)
+        parser.add_argument('--keep-hourly-days', type=int, default=14,
+                            help='Satni bucketi stariji od N dana se brišu (dnevni ostaju)')
+
+    def handle(self, *args, **options):
+        processed = rollup_events(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Obrađeno događaja: {processed}'))
+
+        pruned = prune_hourly(options['keep_hourly_days'])
+        if pruned:
+            self.stdout.write(f'  Obrisano starih satnih bucketa: {pruned}')
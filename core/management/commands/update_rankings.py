@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Offer
+from core.ranking import score_rows
+
+SCORE_FIELDS = ('pk', 'views_count', 'likes_count', 'is_premium', 'created_at')
+UPDATE_SQL = 'UPDATE {table} SET popularity_score = %s WHERE id = %s'.format(
+    table=connection.ops.quote_name(Offer._meta.db_table)
+)
+
+
+class Command(BaseCommand):
+    help = 'Preračunaj popularity_score aktivnih ponuda (serije po pk) - pokretati periodično (cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--all', action='store_true', help='Uključi i neaktivne ponude')
+        parser.add_argument('--dry-run', action='store_true', help='Samo izveštaj, bez upisa')
+        parser.add_argument('--top', type=int, default=0, metavar='N', help='Posle preračuna prikaži N najpopularnijih')
+
+    def handle(self, *args, **options):
+        offers = Offer.objects.all() if options['all'] else Offer.objects.filter(is_active=True)
+
+        updated = scanned = 0
+        last_pk = 0
+        while True:
+            rows = list(
+                offers.filter(pk__gt=last_pk).order_by('pk')
+                .values_list(*SCORE_FIELDS, 'popularity_score')[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            scanned += len(rows)
+
+            # Cela serija se boduje odjednom; upisuju se samo redovi čiji se skor promenio
+            scores = score_rows(row[:-1] for row in rows)
+            changed = [(scores[row[0]], row[0]) for row in rows if scores[row[0]] != row[-1]]
+            if changed and not options['dry_run']:
+                # executemany umesto bulk_update - CASE WHEN sa hiljadama grana je sporiji i za bazu i za Python
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(UPDATE_SQL, changed)
+            updated += len(changed)
+
+        label = 'Bilo bi upisano' if options['dry_run'] else 'Upisano'
+        self.stdout.write(self.style.SUCCESS(f'✅ {label}: {updated} od {scanned} ponuda'))
+
+        for title, score in (
+            Offer.objects.filter(is_active=True).order_by('-popularity_score', '-id')
+            .values_list('title', 'popularity_score')[:options['top']]
+        ):
+            self.stdout.write(f'  {score:>12.3f}  {title}')
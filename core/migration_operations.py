@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+# ============================================
+# MIGRACIONE OPERACIJE - indeksi bez zaključavanja tabele na PostgreSQL-u
+# Migracija koja ih koristi mora imati atomic = False.
+# Particionisane tabele (core/partitioning.py) ne podržavaju CONCURRENTLY
+# na roditelju - za njih se indeks pravi običnim putem.
+# Modul uvoze migracije - ne sme da zavisi od core.models (ni posredno).
+# ============================================
+
+
+def _is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _concurrent(schema_editor, model):
+    connection = schema_editor.connection
+    return connection.vendor == 'postgresql' and not _is_partitioned(connection, model._meta.db_table)
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """Na PostgreSQL-u CREATE INDEX CONCURRENTLY - tabela ostaje otvorena za upis dok se indeks gradi"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not _concurrent(schema_editor, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not _concurrent(schema_editor, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class RemoveIndexConcurrently(migrations.RemoveIndex):
+    """Na PostgreSQL-u DROP INDEX CONCURRENTLY"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not _concurrent(schema_editor, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = from_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            schema_editor.remove_index(model, index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not _concurrent(schema_editor, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            schema_editor.add_index(model, index, concurrently=True)
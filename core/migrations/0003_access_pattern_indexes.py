@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """Na PostgreSQL-u CREATE INDEX CONCURRENTLY - tabela ostaje otvorena za upis dok se indeks gradi"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class RemoveIndexConcurrently(migrations.RemoveIndex):
+    """Na PostgreSQL-u DROP INDEX CONCURRENTLY"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = from_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            schema_editor.remove_index(model, index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            schema_editor.add_index(model, index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY ne sme u transakciji
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_userprofile_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Novi indeksi se grade pre uklanjanja starih - nema trenutka bez indeksa
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['sender', 'recipient', '-timestamp'], name='message_pair_time_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient'], name='message_unread_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient'], name='notif_unread_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='offer_active_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at'], name='offer_active_category_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(fields=['owner', '-created_at'], name='offer_owner_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['reviewed_user', '-created_at'], name='review_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trade',
+            index=models.Index(fields=['user1', 'status', '-created_at'], name='trade_user1_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='trade',
+            index=models.Index(fields=['user2', 'status', '-created_at'], name='trade_user2_status_idx'),
+        ),
+        # Zamenjeni: FK indeks na recipient + parcijalni unread indeks pokrivaju (recipient, is_read)
+        RemoveIndexConcurrently(
+            model_name='message',
+            name='core_messag_recipie_ffa7b4_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='notification',
+            name='core_notifi_recipie_aeffaf_idx',
+        ),
+        # Zamenjen parcijalnim offer_active_created_idx
+        RemoveIndexConcurrently(
+            model_name='offer',
+            name='core_offer_is_acti_687304_idx',
+        ),
+    ]
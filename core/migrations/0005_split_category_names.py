@@ -0,0 +1,99 @@
+from collections import Counter
+
+from django.db import migrations
+
+SEPARATOR = '|'
+PATH_SEGMENT = 4
+# Skraćeni nazivi roditelja iz create_categories
+PARENT_ALIASES = {'mobilni tel.': 'mobilni telefoni'}
+
+
+def _unique_slug(Category, name):
+    base = name.lower().replace(' ', '-')
+    slug, number = base, 1
+    while Category.objects.filter(slug=slug).exists():
+        number += 1
+        slug = f'{base}-{number}'
+    return slug
+
+
+def split_names(apps, schema_editor):
+    """"Odeća | Muška" -> kategorija "Muška" pod roditeljem "Odeća" (roditelj se pravi ako ne postoji)"""
+    Category = apps.get_model('core', 'Category')
+    Offer = apps.get_model('core', 'Offer')
+
+    nodes = {(None, category.name.strip().lower()): category
+             for category in Category.objects.exclude(name__contains=SEPARATOR)}
+
+    for category in Category.objects.filter(name__contains=SEPARATOR).order_by('name'):
+        parts = [part.strip() for part in category.name.split(SEPARATOR) if part.strip()]
+        parent = None
+        for depth, part in enumerate(parts[:-1]):
+            key = part.lower()
+            if depth == 0:
+                key = PARENT_ALIASES.get(key, key)
+            node = nodes.get((parent and parent.pk, key))
+            if node is None:
+                node = Category.objects.create(name=part, slug=_unique_slug(Category, part), parent=parent)
+                nodes[(parent and parent.pk, key)] = node
+            parent = node
+        category.name = parts[-1]
+        category.parent = parent
+        category.save(update_fields=['name', 'parent'])
+        nodes[(parent and parent.pk, category.name.lower())] = category
+
+    # Putanje po nivoima, braća po nazivu
+    children = {}
+    for category in Category.objects.order_by('name'):
+        children.setdefault(category.parent_id, []).append(category)
+    paths = {}
+    queue = [(None, '', 0)]
+    while queue:
+        parent_id, prefix, depth = queue.pop()
+        for number, category in enumerate(children.get(parent_id, []), start=1):
+            category.path = prefix + str(number).zfill(PATH_SEGMENT)
+            category.depth = depth
+            paths[category.pk] = category.path
+            queue.append((category.pk, category.path, depth + 1))
+
+    # Brojači aktivnih ponuda po podstablu
+    direct = Counter(Offer.objects.filter(is_active=True).values_list('category_id', flat=True))
+    totals = Counter()
+    for pk, path in paths.items():
+        for end in range(PATH_SEGMENT, len(path) + 1, PATH_SEGMENT):
+            totals[path[:end]] += direct.get(pk, 0)
+
+    categories = [category for group in children.values() for category in group]
+    for category in categories:
+        category.active_offer_count = totals[category.path]
+    Category.objects.bulk_update(categories, ['path', 'depth', 'active_offer_count'])
+
+
+def join_names(apps, schema_editor):
+    """Nazad na ravne nazive "Roditelj | Dete" (napravljeni roditelji ostaju)"""
+    Category = apps.get_model('core', 'Category')
+    categories = {category.pk: category for category in Category.objects.all()}
+
+    def full_name(category):
+        if category.parent_id is None:
+            return category.name
+        return f'{full_name(categories[category.parent_id])} {SEPARATOR} {category.name}'
+
+    for category in categories.values():
+        category.name = full_name(category)
+    for category in categories.values():
+        category.parent = None
+        category.path = ''
+        category.depth = 0
+    Category.objects.bulk_update(list(categories.values()), ['name', 'parent', 'path', 'depth'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_category_tree'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_names, join_names),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY ne sme u transakciji; kolone se popunjavaju komandom backfill_prices
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_split_category_names'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='price_max',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='price_min',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True), ('price_min__isnull', False)), fields=['price_min', 'id'], name='offer_active_price_idx'),
+        ),
+    ]
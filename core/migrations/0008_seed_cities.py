@@ -0,0 +1,73 @@
+from django.db import migrations
+
+from core.cities import city_key
+
+# Veći gradovi Srbije i česti alternativni zapisi; ćirilica je pokrivena samim ključem
+CITIES = {
+    'Beograd': ['BG', 'Bgd', 'Belgrade', 'Novi Beograd', 'Zemun'],
+    'Novi Sad': ['NS', 'Petrovaradin'],
+    'Niš': ['Nish'],
+    'Kragujevac': ['KG'],
+    'Subotica': [],
+    'Zrenjanin': [],
+    'Pančevo': [],
+    'Čačak': [],
+    'Novi Pazar': [],
+    'Kraljevo': [],
+    'Smederevo': [],
+    'Leskovac': [],
+    'Valjevo': [],
+    'Kruševac': [],
+    'Vranje': [],
+    'Šabac': [],
+    'Užice': [],
+    'Sombor': [],
+    'Požarevac': [],
+    'Pirot': [],
+    'Zaječar': [],
+    'Kikinda': [],
+    'Sremska Mitrovica': [],
+    'Jagodina': [],
+    'Vršac': [],
+    'Bor': [],
+    'Prokuplje': [],
+    'Loznica': [],
+    'Inđija': [],
+    'Stara Pazova': [],
+    'Ruma': [],
+    'Bačka Palanka': [],
+    'Gornji Milanovac': [],
+    'Aranđelovac': [],
+    'Paraćin': [],
+    'Ćuprija': [],
+    'Negotin': [],
+    'Kula': [],
+    'Vrbas': [],
+    'Bečej': [],
+    'Zlatibor': [],
+    'Kopaonik': [],
+}
+
+
+def seed_cities(apps, schema_editor):
+    City = apps.get_model('core', 'City')
+    CityAlias = apps.get_model('core', 'CityAlias')
+    for name, aliases in CITIES.items():
+        city, _ = City.objects.get_or_create(name=name, defaults={'slug': city_key(name).replace(' ', '-')})
+        for alias in [name, *aliases]:
+            CityAlias.objects.get_or_create(alias=city_key(alias), defaults={'city': city})
+
+
+def remove_cities(apps, schema_editor):
+    apps.get_model('core', 'City').objects.filter(name__in=CITIES).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_city_reference'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_cities, remove_cities),
+    ]
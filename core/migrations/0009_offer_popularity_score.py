@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+from core.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY ne sme u transakciji; skor se popunjava komandom update_rankings
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_seed_cities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='popularity_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-popularity_score', '-id'], name='offer_active_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:10
+
+from datetime import timedelta
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+from core.migration_operations import AddIndexConcurrently
+
+# Postojeće ponude ističu po datumu objave, ali ne pre nego što vlasnik stigne da dobije podsetnik
+EXPIRY_GRACE_DAYS = 14
+
+
+def set_initial_expiry(apps, schema_editor):
+    Offer = apps.get_model('core', 'Offer')
+    lifetime = timedelta(days=settings.OFFER_LIFETIME_DAYS)
+    earliest = timezone.now() + timedelta(days=EXPIRY_GRACE_DAYS)
+    Offer.objects.filter(expires_at__isnull=True).update(expires_at=F('created_at') + lifetime)
+    Offer.objects.filter(expires_at__lt=earliest).update(expires_at=earliest)
+
+
+class Migration(migrations.Migration):
+    # CONCURRENTLY ne sme u transakciji
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_offer_analytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('price_range', models.CharField(blank=True, max_length=50, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('views_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('deactivated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'verbose_name': 'Arhivirana ponuda',
+                'verbose_name_plural': 'Arhivirane ponude',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='expired_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='expiry_reminded',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(set_initial_expiry, migrations.RunPython.noop, atomic=True),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('message', '💬 Nova poruka'), ('trade_request', '🤝 Zahtev za razmenu'), ('trade_accepted', '✅ Razmena prihvaćena'), ('trade_rejected', '❌ Razmena odbljena'), ('review', '⭐ Nova recenzija'), ('offer_liked', '❤️ Ponuda vam se dopala'), ('offer_viewed', '👁️ Neko pogledao vašu ponudu'), ('offer_expiring', '⏳ Ponuda uskoro ističe'), ('offer_expired', '⌛ Ponuda je istekla'), ('trade', '🤝 Razmena')], max_length=20),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_at'], name='offer_active_expires_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='offer',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='offer_inactive_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedoffer',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.category'),
+        ),
+        migrations.AddField(
+            model_name='archivedoffer',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_offers', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedoffer',
+            index=models.Index(fields=['owner', '-created_at'], name='archived_owner_created_idx'),
+        ),
+    ]
@@ -1,35 +1,233 @@
-from django.db import models
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.urls import reverse
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .cities import city_key
+from .pricing import parse_price_range
+from .ranking import popularity_score
+
+
+# Materijalizovana putanja: 4 cifre po nivou ("0007", "00070002", ...).
+# Potomci kategorije su tačno putanje u opsegu [path, path + PATH_END) - jedan range upit nad indeksom.
+PATH_SEGMENT = 4
+PATH_END = ':'  # prvi ASCII znak posle '9'
+
+
+def ancestor_paths(path):
+    """Putanje kategorije i svih njenih predaka"""
+    return [path[:end] for end in range(PATH_SEGMENT, len(path) + 1, PATH_SEGMENT)]
+
+
+def default_expiry(now=None):
+    """Rok nove ili obnovljene ponude - OFFER_LIFETIME_DAYS od sada"""
+    return (now or timezone.now()) + timedelta(days=settings.OFFER_LIFETIME_DAYS)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)
+    parent = models.ForeignKey(
+        'self', on_delete=models.PROTECT, related_name='children', blank=True, null=True,
+    )
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Aktivne ponude u celom podstablu - održava se inkrementalno (adjust_active_counts)
+    active_offer_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Kategorija"
         verbose_name_plural = "Kategorije"
-        ordering = ['name']
+        ordering = ['path']
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'parent_id' in instance.__dict__:
+            instance._loaded_parent_id = instance.parent_id
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = self.name.lower().replace(' ', '-')
-        super().save(*args, **kwargs)
+            slug = self.name.lower().replace(' ', '-')
+            # "Muška" postoji i pod Obućom i pod Odećom - slug nosi i roditelja
+            self.slug = f'{self.parent.slug}-{slug}' if self.parent_id else slug
+        with transaction.atomic():
+            if not self.path:
+                self.path, self.depth = self._next_path(self.parent)
+            elif self.parent_id != getattr(self, '_loaded_parent_id', self.parent_id):
+                self._move_subtree()
+            if not self._state.adding and not args and kwargs.get('update_fields') is None:
+                # Brojač menja samo adjust_active_counts - učitana (zastarela) vrednost ne sme da ga pregazi
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != 'active_offer_count'
+                ]
+            super().save(*args, **kwargs)
+        self._loaded_parent_id = self.parent_id
+
+    @classmethod
+    def _next_path(cls, parent):
+        """Sledeća slobodna putanja među decom roditelja (roditelj se zaključava zbog istovremenih upisa)"""
+        if parent is not None:
+            parent = cls.objects.select_for_update().only('path', 'depth').get(pk=parent.pk)
+        siblings = cls.objects.filter(parent=parent).aggregate(last=Max('path'))['last']
+        prefix = parent.path if parent is not None else ''
+        number = int(siblings[-PATH_SEGMENT:]) + 1 if siblings else 1
+        if number >= 10 ** PATH_SEGMENT:
+            raise ValueError(f'Kategorija "{parent}" ne može imati više od {10 ** PATH_SEGMENT - 1} potkategorija.')
+        return prefix + str(number).zfill(PATH_SEGMENT), (parent.depth + 1) if parent is not None else 0
+
+    def _move_subtree(self):
+        """Premesti kategoriju pod novog roditelja: putanje potomaka i brojači predaka"""
+        if self.parent is not None and self.parent.path.startswith(self.path):
+            raise ValueError('Kategorija ne može biti premeštena u sopstveno podstablo.')
+        old_path, old_depth = self.path, self.depth
+        new_path, new_depth = self._next_path(self.parent)
+
+        count = Category.objects.filter(pk=self.pk).values_list('active_offer_count', flat=True).get()
+        self._adjust_paths(ancestor_paths(old_path)[:-1], -count)
+        self._adjust_paths(ancestor_paths(new_path)[:-1], count)
+
+        Category.objects.filter(self.subtree_filter()).exclude(pk=self.pk).update(
+            path=Concat(models.Value(new_path), Substr('path', len(old_path) + 1)),
+            depth=F('depth') + (new_depth - old_depth),
+        )
+        self.path, self.depth = new_path, new_depth
+
+    # ---------- podstablo ----------
+
+    def subtree_filter(self, prefix=''):
+        """Q za ovu kategoriju i sve potomke; prefix npr. 'category__' za filtriranje ponuda"""
+        return Q(**{f'{prefix}path__gte': self.path, f'{prefix}path__lt': self.path + PATH_END})
+
+    @property
+    def indented_name(self):
+        return '— ' * self.depth + self.name
 
     @property
     def offer_count(self):
-        return self.offers.filter(is_active=True).count()
+        return self.active_offer_count
+
+    # ---------- brojači aktivnih ponuda ----------
+
+    @classmethod
+    def adjust_active_counts(cls, deltas):
+        """
+        deltas: {category_id: promena broja aktivnih ponuda}. Promena se primenjuje
+        na kategoriju i sve pretke - jedan UPDATE po različitoj vrednosti promene.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if pk and delta}
+        if not deltas:
+            return
+        per_path = Counter()
+        for pk, path in cls.objects.filter(pk__in=deltas).values_list('pk', 'path'):
+            for ancestor in ancestor_paths(path):
+                per_path[ancestor] += deltas[pk]
+        by_delta = defaultdict(list)
+        for path, delta in per_path.items():
+            if delta:
+                by_delta[delta].append(path)
+        for delta, paths in by_delta.items():
+            cls._adjust_paths(paths, delta)
+
+    @classmethod
+    def _adjust_paths(cls, paths, delta):
+        if paths and delta:
+            # updated_at ulazi u ETag /api/categories/ - brojači su deo odgovora
+            cls.objects.filter(path__in=paths).update(
+                active_offer_count=F('active_offer_count') + delta, updated_at=timezone.now(),
+            )
+
+    @classmethod
+    def rebuild_active_counts(cls):
+        """Preračunaj sve brojače iz ponuda (popravka ako su se brojači razišli)"""
+        direct = Counter(dict(
+            Offer.objects.filter(is_active=True).order_by().values('category_id')
+            .annotate(n=models.Count('id')).values_list('category_id', 'n')
+        ))
+        totals = Counter()
+        for pk, path in cls.objects.values_list('pk', 'path'):
+            for ancestor in ancestor_paths(path):
+                totals[ancestor] += direct.get(pk, 0)
+        changed = 0
+        with transaction.atomic():
+            for category in cls.objects.select_for_update().only('path', 'active_offer_count'):
+                if category.active_offer_count != totals[category.path]:
+                    cls.objects.filter(pk=category.pk).update(
+                        active_offer_count=totals[category.path], updated_at=timezone.now(),
+                    )
+                    changed += 1
+        return changed
+
+
+class City(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Grad"
+        verbose_name_plural = "Gradovi"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = city_key(self.name).replace(' ', '-')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Sopstveni naziv je uvek alias (pokriva i ćirilični zapis - isti ključ)
+            CityAlias.objects.get_or_create(alias=city_key(self.name), defaults={'city': self})
+
+    @classmethod
+    def resolve(cls, *texts):
+        """Prvi grad prepoznat iz datih tekstova (jedan upit po unique indeksu aliasa), ili None"""
+        keys = [key for key in map(city_key, texts) if key]
+        if not keys:
+            return None
+        aliases = {
+            alias.alias: alias.city
+            for alias in CityAlias.objects.select_related('city').filter(alias__in=keys)
+        }
+        return next((aliases[key] for key in keys if key in aliases), None)
+
+
+class CityAlias(models.Model):
+    """Alternativni zapisi grada ("BG", "Belgrade") - čuva se city_key oblik"""
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        verbose_name = "Alias grada"
+        verbose_name_plural = "Aliasi gradova"
+        ordering = ['alias']
+
+    def __str__(self):
+        return f'{self.alias} → {self.city}'
+
+    def save(self, *args, **kwargs):
+        self.alias = city_key(self.alias)
+        super().save(*args, **kwargs)
 
 
 class Offer(models.Model):
@@ -47,20 +245,46 @@ class Offer(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offers')
     image = models.ImageField(upload_to='offers/%Y/%m/%d/', blank=True, null=True)
     price_range = models.CharField(max_length=50, blank=True, null=True)
+    # price_range pročitan u dinare (core/pricing.py) - za filtere i sortiranje po ceni
+    price_min = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
+    price_max = models.PositiveBigIntegerField(blank=True, null=True, editable=False)
     location = models.CharField(max_length=100, blank=True, default="Srbija")
     city = models.CharField(max_length=100, blank=True, null=True)
+    # Kanonski grad (City.resolve iz city/location) - filteri i facete idu preko ovog FK
+    city_ref = models.ForeignKey(City, on_delete=models.SET_NULL, blank=True, null=True, related_name='offers')
     is_active = models.BooleanField(default=True)
     is_premium = models.BooleanField(default=False)
     views_count = models.PositiveIntegerField(default=0)
     likes_count = models.PositiveIntegerField(default=0)
+    # Popularnost sa vremenskim opadanjem (core/ranking.py) - "Popularno" i "U trendu"
+    popularity_score = models.FloatField(default=0, editable=False)
+    # Životni vek (core/lifecycle.py): posle expires_at ponuda ističe (expired_at), vlasnik je može obnoviti
+    expires_at = models.DateTimeField(blank=True, null=True, editable=False)
+    expiry_reminded = models.BooleanField(default=False, editable=False)
+    expired_at = models.DateTimeField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['is_active', 'created_at']),
             models.Index(fields=['category', 'is_active']),
+            # Liste aktivnih ponuda (home, offer_list, search) - parcijalni, samo aktivne
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='offer_active_created_idx'),
+            models.Index(fields=['category', '-created_at'], condition=Q(is_active=True),
+                         name='offer_active_category_idx'),
+            # Ponude korisnika (my_offers, izbor ponude u razmeni) - sve, i neaktivne
+            models.Index(fields=['owner', '-created_at'], name='offer_owner_created_idx'),
+            # Filter i sortiranje po ceni; id drži redosled stabilnim za paginaciju
+            models.Index(fields=['price_min', 'id'], condition=Q(is_active=True, price_min__isnull=False),
+                         name='offer_active_price_idx'),
+            models.Index(fields=['city_ref', '-created_at'], condition=Q(is_active=True),
+                         name='offer_active_city_idx'),
+            models.Index(fields=['-popularity_score', '-id'], condition=Q(is_active=True),
+                         name='offer_active_popular_idx'),
+            # expire_offers (podsetnici i isticanje) i archive_offers (dugo neaktivne)
+            models.Index(fields=['expires_at'], condition=Q(is_active=True), name='offer_active_expires_idx'),
+            models.Index(fields=['updated_at'], condition=Q(is_active=False), name='offer_inactive_updated_idx'),
         ]
 
     def __str__(self):
@@ -69,10 +293,66 @@ class Offer(models.Model):
     def get_absolute_url(self):
         return reverse('core:offer_detail', kwargs={'pk': self.pk})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'is_active' in instance.__dict__ and 'category_id' in instance.__dict__:
+            instance._counted_category = instance.category_id if instance.is_active else None
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = f"{self.title}-{self.id}".lower().replace(' ', '-')
-        super().save(*args, **kwargs)
+        if self._state.adding and self.expires_at is None:
+            self.expires_at = default_expiry()
+        self.price_min, self.price_max = parse_price_range(self.price_range)
+        self.popularity_score = popularity_score(
+            self.views_count, self.likes_count, self.is_premium, self.created_at
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'city', 'location'} & set(update_fields):
+            self._normalize_city()
+        if update_fields is not None:
+            derived = set()
+            if 'price_range' in update_fields:
+                derived |= {'price_min', 'price_max'}
+            if {'city', 'location'} & set(update_fields):
+                derived |= {'city', 'city_ref'}
+            if {'views_count', 'likes_count', 'is_premium'} & set(update_fields):
+                derived.add('popularity_score')
+            if derived:
+                kwargs['update_fields'] = update_fields = {*update_fields, *derived}
+        if update_fields is not None and not {'is_active', 'category', 'category_id'} & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+
+        # Brojači kategorija prate promenu (kategorija, aktivna) u istoj transakciji
+        with transaction.atomic():
+            before = self._counted_before_save()
+            after = self.category_id if self.is_active else None
+            self._counted_category = after
+            try:
+                super().save(*args, **kwargs)
+            except Exception:
+                self._counted_category = before
+                raise
+            if before != after:
+                Category.adjust_active_counts({before: -1, after: 1})
+
+    def _normalize_city(self):
+        """city_ref iz grada (ili lokacije); prepoznat grad dobija kanonski naziv"""
+        self.city_ref = City.resolve(self.city, self.location)
+        if self.city_ref is not None:
+            self.city = self.city_ref.name
+
+    def _counted_before_save(self):
+        """Kategorija u čijem je brojaču ponuda trenutno (None - nije aktivna ili je nova)"""
+        if self._state.adding:
+            return None
+        if hasattr(self, '_counted_category'):
+            return self._counted_category
+        row = Offer.objects.filter(pk=self.pk).values_list('category_id', 'is_active').first()
+        return row[0] if row and row[1] else None
 
     @property
     def main_image(self):
@@ -96,8 +376,11 @@ class Message(models.Model):
     class Meta:
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['timestamp']),
+            # Razgovor: (sender, recipient) par u oba smera, sortirano po vremenu
+            models.Index(fields=['sender', 'recipient', '-timestamp'], name='message_pair_time_idx'),
+            # Brojač nepročitanih - parcijalni, samo nepročitane
+            models.Index(fields=['recipient'], condition=Q(is_read=False), name='message_unread_idx'),
         ]
 
     def __str__(self):
@@ -142,6 +425,9 @@ class Trade(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['status', 'created_at']),
+            # Poslati / primljeni zahtevi po statusu (my_trades, inbox)
+            models.Index(fields=['user1', 'status', '-created_at'], name='trade_user1_status_idx'),
+            models.Index(fields=['user2', 'status', '-created_at'], name='trade_user2_status_idx'),
         ]
 
     def __str__(self):
@@ -168,12 +454,14 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='userprofile')
     phone = models.CharField(max_length=20, blank=True)
     location = models.CharField(max_length=100, blank=True, default="Srbija")
+    city_ref = models.ForeignKey(City, on_delete=models.SET_NULL, blank=True, null=True, related_name='profiles')
     bio = models.TextField(max_length=500, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
     rating = models.FloatField(default=5.0)
     trades_completed = models.PositiveIntegerField(default=0)
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Profil korisnika"
@@ -182,6 +470,16 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"Profil {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            self.city_ref = City.resolve(self.location)
+            if self.city_ref is not None:
+                self.location = self.city_ref.name
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'city_ref'}
+        super().save(*args, **kwargs)
+
     @property
     def average_rating(self):
         """Prosečna ocena korisnika"""
@@ -228,6 +526,8 @@ class Review(models.Model):
         indexes = [
             models.Index(fields=['reviewed_user', 'rating']),
             models.Index(fields=['created_at']),
+            # Recenzije korisnika na profilu, najnovije prve
+            models.Index(fields=['reviewed_user', '-created_at'], name='review_user_created_idx'),
         ]
         verbose_name = "Recenzija"
         verbose_name_plural = "Recenzije"
@@ -255,6 +555,8 @@ class Notification(models.Model):
         ('review', '⭐ Nova recenzija'),
         ('offer_liked', '❤️ Ponuda vam se dopala'),
         ('offer_viewed', '👁️ Neko pogledao vašu ponudu'),
+        ('offer_expiring', '⏳ Ponuda uskoro ističe'),
+        ('offer_expired', '⌛ Ponuda je istekla'),
         ('trade', '🤝 Razmena'),
     ]
 
@@ -275,8 +577,9 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['recipient', 'is_read']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+            models.Index(fields=['recipient'], condition=Q(is_read=False), name='notif_unread_idx'),
         ]
         verbose_name = "Notifikacija"
         verbose_name_plural = "Notifikacije"
@@ -292,6 +595,161 @@ class Notification(models.Model):
         return self.created_at >= timezone.now() - timedelta(hours=24)
 
 
+class Favorite(models.Model):
+    """Sačuvana (lajkovana) ponuda - jedan red po korisniku i ponudi"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='favorites')
+    # Vlasnik je obavešten grupnom notifikacijom (flush_likes)
+    notified = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'offer'], name='favorite_user_offer_uniq'),
+        ]
+        indexes = [
+            # Stranica "Omiljene" - najnovije sačuvane prve
+            models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx'),
+            models.Index(fields=['offer'], condition=Q(notified=False), name='favorite_unnotified_idx'),
+        ]
+        verbose_name = "Omiljena ponuda"
+        verbose_name_plural = "Omiljene ponude"
+
+    def __str__(self):
+        return f"{self.user.username} ❤️ {self.offer.title}"
+
+
+class LikeDelta(models.Model):
+    """
+    Dnevnik promena Offer.likes_count (+1 / -1). Lajk je INSERT u dnevnik
+    umesto UPDATE-a reda ponude, pa popularna ponuda ne zaključava jedan red
+    pri svakom lajku; flush_likes sabira dnevnik u brojač.
+    """
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='+')
+    delta = models.SmallIntegerField()
+
+    def __str__(self):
+        return f"{self.offer_id}: {self.delta:+d}"
+
+
+class OfferEvent(models.Model):
+    """
+    Sirov događaj nad ponudom (pregled, kontakt). Samo INSERT, bez dodatnih
+    indeksa - rollup_offer_stats ga čita redom po pk, sabira u OfferStatBucket
+    i briše.
+    """
+    VIEW = 'view'
+    CONTACT = 'contact'
+    EVENT_TYPES = [
+        (VIEW, 'Pregled'),
+        (CONTACT, 'Kontakt'),
+    ]
+
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='+', db_index=False)
+    event_type = models.CharField(max_length=10, choices=EVENT_TYPES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.offer_id}: {self.event_type} @ {self.created_at}"
+
+
+class OfferStatBucket(models.Model):
+    """Zbir događaja ponude po satu / danu - grafikoni vlasnika čitaju samo ovu tabelu"""
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIODS = [
+        (HOUR, 'Sat'),
+        (DAY, 'Dan'),
+    ]
+
+    # offer_bucket_uniq počinje sa offer - poseban indeks za FK nije potreban
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='stat_buckets', db_index=False)
+    # Kopija offer.owner_id - statistika vlasnika bez JOIN-a na ponude
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    period = models.CharField(max_length=4, choices=PERIODS)
+    bucket_start = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    contacts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['offer', 'period', 'bucket_start'], name='offer_bucket_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'period', 'bucket_start'], name='bucket_owner_period_idx'),
+        ]
+        verbose_name = "Statistika ponude"
+        verbose_name_plural = "Statistika ponuda"
+
+    def __str__(self):
+        return f"{self.offer_id} {self.period} {self.bucket_start}: {self.views}/{self.contacts}"
+
+
+class ArchivedOffer(models.Model):
+    """
+    Dugo neaktivna ponuda premeštena iz core_offer (archive_offers). Kolone su
+    one koje prikazuje istorija vlasnika (my_offers); ceo red ponude, njene
+    notifikacije i dnevna statistika su u `data`. Ponude sa razmenama se ne arhiviraju.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_offers', db_index=False)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    title = models.CharField(max_length=200)
+    price_range = models.CharField(max_length=50, blank=True, null=True)
+    city = models.CharField(max_length=100, blank=True, null=True)
+    views_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    deactivated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at'], name='archived_owner_created_idx'),
+        ]
+        verbose_name = "Arhivirana ponuda"
+        verbose_name_plural = "Arhivirane ponude"
+
+    def __str__(self):
+        return f"{self.title} (arhiva, #{self.original_id})"
+
+
+class ChangeLog(models.Model):
+    """
+    Dnevnik promena po korisniku za delta sync (core/changes.py). Red se samo
+    dodaje - jedan po (korisnik, objekat) za svaki upis; prune_change_log
+    briše redove starije od SYNC_CHANGELOG_DAYS.
+    """
+    MESSAGE = 'message'
+    NOTIFICATION = 'notification'
+    TRADE = 'trade'
+    OFFER = 'offer'
+    ENTITIES = [
+        (MESSAGE, 'Poruka'),
+        (NOTIFICATION, 'Notifikacija'),
+        (TRADE, 'Razmena'),
+        (OFFER, 'Ponuda'),
+    ]
+
+    # changelog_user_id_idx počinje sa user - poseban indeks za FK nije potreban
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', db_index=False)
+    entity = models.CharField(max_length=12, choices=ENTITIES)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Sync čita "promene korisnika posle id-ja X" - jedan range scan
+            models.Index(fields=['user', 'id'], name='changelog_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.entity} #{self.object_id}{' (obrisano)' if self.deleted else ''}"
+
+
 # ============================================
 # SIGNALI - Automatske akcije
 # ============================================
@@ -312,6 +770,14 @@ def update_offer_slug(sender, instance, created, **kwargs):
         instance.save(update_fields=['slug'])
 
 
+@receiver(post_delete, sender=Offer)
+def update_category_counts_on_delete(sender, instance, **kwargs):
+    """Obrisana aktivna ponuda više nije u brojačima kategorije i predaka"""
+    counted = getattr(instance, '_counted_category', instance.category_id if instance.is_active else None)
+    if counted:
+        Category.adjust_active_counts({counted: -1})
+
+
 @receiver(post_save, sender=Review)
 def update_user_rating(sender, instance, created, **kwargs):
     """Ažuriraj prosečnu ocenu korisnika kada se doda nova recenzija"""
@@ -0,0 +1,314 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Message, Notification
+
+
+# ============================================
+# MESEČNO PARTICIONISANJE - Message i Notification (samo PostgreSQL)
+# Opciono, kroz `partition_tables convert`: postojeća tabela postaje jedna
+# "legacy" particija za sve redove do početka sledećeg meseca (bez kopiranja
+# - CHECK se proveri unapred pa ATTACH ne skenira tabelu), a novi redovi idu
+# u mesečne particije <tabela>_pYYYYMM. Default particija hvata redove za
+# mesec kome particija još nije napravljena. Modeli se ne menjaju - SQLite
+# i neparticionisane baze rade kao i do sada.
+# ============================================
+
+PartitionSpec = namedtuple('PartitionSpec', 'model column retention_setting')
+Partition = namedtuple('Partition', 'name start end rows size')
+Conversion = namedtuple('Conversion', 'prepare swap boundary')
+
+PARTITIONED = {
+    'message': PartitionSpec(Message, 'timestamp', 'MESSAGE_RETENTION_MONTHS'),
+    'notification': PartitionSpec(Notification, 'created_at', 'NOTIFICATION_RETENTION_MONTHS'),
+}
+
+# Konverzija se odbija kad je do kraja meseca ostalo manje od ovoga - CHECK
+# legacy tabele bi inače odbio upise posle ponoći pre nego što se tabela zameni
+CONVERT_MARGIN = timedelta(hours=6)
+
+
+class PartitioningError(Exception):
+    """Baza ili tabela nisu u stanju za traženu operaciju nad particijama"""
+
+
+def is_supported(conn=connection):
+    return conn.vendor == 'postgresql'
+
+
+def is_partitioned(table, conn=connection):
+    """Da li je tabela particionisana (relkind 'p') - False za SQLite"""
+    if not is_supported(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def month_start(moment=None):
+    """Ponoć prvog dana meseca po lokalnom vremenu (TIME_ZONE)"""
+    local = timezone.localtime(moment or timezone.now())
+    return local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, start):
+    return f'{table}_p{start:%Y%m}'
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _literal(moment):
+    # Granice particija su DDL - bez parametara; vrednost je naša, ne korisnička
+    return f"'{moment.isoformat()}'"
+
+
+def _require_partitioned(table):
+    if not is_supported():
+        raise PartitioningError('Particionisanje je podržano samo na PostgreSQL-u.')
+    if not is_partitioned(table):
+        raise PartitioningError(f'Tabela {table} nije particionisana - prvo pokreni "partition_tables convert".')
+
+
+# ==================== PREGLED ====================
+
+def partitions(table):
+    """Particije tabele sa granicama (None = MINVALUE / DEFAULT), procenom redova i veličinom"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname,
+                   (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'FROM \\(''([^'']+)''\\)'))[1]::timestamptz,
+                   (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'TO \\(''([^'']+)''\\)'))[1]::timestamptz,
+                   GREATEST(c.reltuples, 0)::bigint,
+                   pg_total_relation_size(c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY 3 NULLS LAST, 2 NULLS FIRST
+            """,
+            [table],
+        )
+        return [Partition(*row) for row in cursor.fetchall()]
+
+
+def default_rows(spec):
+    """Broj redova u default particiji - >0 znači da je create propušten za neki mesec"""
+    table = spec.model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {_qn(table + "_default")}')
+        return cursor.fetchone()[0]
+
+
+# ==================== NOVE PARTICIJE ====================
+
+def create_partitions(spec, months_ahead, now=None):
+    """Particije od tekućeg meseca do `months_ahead` meseci unapred; vraća imena napravljenih"""
+    table = spec.model._meta.db_table
+    _require_partitioned(table)
+    existing = partitions(table)
+    names = {partition.name for partition in existing}
+    # Meseci koje već pokriva legacy particija se preskaču
+    covered = max((partition.end for partition in existing if partition.start is None and partition.end), default=None)
+
+    created = []
+    current = month_start(now)
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        end = add_months(current, offset + 1)
+        name = partition_name(table, start)
+        if name in names or (covered and start < covered):
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Redovi tog meseca u default particiji bi oborili CREATE - prijavljuje se umesto nejasne greške
+            cursor.execute(
+                f'SELECT count(*) FROM {_qn(table + "_default")} '
+                f'WHERE {_qn(spec.column)} >= %s AND {_qn(spec.column)} < %s',
+                [start, end],
+            )
+            stray = cursor.fetchone()[0]
+            if stray:
+                raise PartitioningError(
+                    f'{table}_default ima {stray} redova za {start:%Y-%m} - premesti ih pre pravljenja particije {name}.'
+                )
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {_qn(name)} PARTITION OF {_qn(table)} '
+                f'FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})'
+            )
+        created.append(name)
+    return created
+
+
+# ==================== RETENCIJA ====================
+
+def expired_partitions(spec, keep_months, now=None):
+    """Particije čiji su svi redovi stariji od poslednjih `keep_months` meseci (i legacy kad dođe na red)"""
+    table = spec.model._meta.db_table
+    _require_partitioned(table)
+    cutoff = add_months(month_start(now), -keep_months)
+    return [partition for partition in partitions(table) if partition.end is not None and partition.end <= cutoff]
+
+
+def detach_partitions(spec, keep_months, drop=False, now=None):
+    """
+    DETACH zastarelih particija (kratko zaključavanje roditelja, bez DELETE-a
+    reda po reda). Odvojena tabela ostaje za arhivu (pg_dump) osim uz drop.
+    """
+    table = spec.model._meta.db_table
+    removed = []
+    for partition in expired_partitions(spec, keep_months, now=now):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(partition.name)}')
+            if drop:
+                cursor.execute(f'DROP TABLE {_qn(partition.name)}')
+        removed.append(partition)
+    return removed
+
+
+# ==================== KONVERZIJA ====================
+
+def _catalog(table):
+    """(indeksi, strani ključevi, (sekvenca id kolone, identity?)) postojeće tabele iz kataloga"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(x.indexrelid), x.indisprimary, x.indisunique
+            FROM pg_index x
+            JOIN pg_class c ON c.oid = x.indexrelid
+            WHERE x.indrelid = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype = 'f'
+            ORDER BY conname
+            """,
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        # Identity (Django >= 4.1) ili serial (starije baze) - oba vezuju sekvencu za kolonu
+        cursor.execute(
+            """
+            SELECT pg_get_serial_sequence(%s, 'id'), a.attidentity <> ''
+            FROM pg_attribute a
+            WHERE a.attrelid = to_regclass(%s) AND a.attname = 'id'
+            """,
+            [table, table],
+        )
+        id_sequence = cursor.fetchone()
+    return indexes, foreign_keys, id_sequence
+
+
+def plan_conversion(spec, months_ahead, now=None):
+    """
+    SQL za prelazak na particionisanu tabelu. `prepare` ide bez transakcije
+    (CONCURRENTLY, VALIDATE ne blokira upise); `swap` u jednoj kratkoj
+    transakciji - samo katalog, redovi se ne kopiraju.
+    """
+    table = spec.model._meta.db_table
+    if not is_supported():
+        raise PartitioningError('Particionisanje je podržano samo na PostgreSQL-u.')
+    if is_partitioned(table):
+        raise PartitioningError(f'Tabela {table} je već particionisana.')
+
+    now = now or timezone.now()
+    boundary = add_months(month_start(now), 1)
+    if boundary - now < CONVERT_MARGIN:
+        raise PartitioningError(f'Do početka novog meseca je manje od {CONVERT_MARGIN} - pokreni konverziju posle ponoći.')
+
+    legacy = f'{table}_legacy'
+    legacy_id_index = f'{table}_legacy_id_idx'
+    check = f'{table}_legacy_range'
+    sequence = f'{table}_part_id_seq'
+    column = _qn(spec.column)
+
+    prepare = [
+        # Roditelj dobija običan indeks po id (PK mora sadržati ključ particije);
+        # legacy dobija isti unapred, da ga ATTACH samo prikači
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {_qn(legacy_id_index)} ON {_qn(table)} (id)',
+        f'ALTER TABLE {_qn(table)} DROP CONSTRAINT IF EXISTS {_qn(check)}',
+        f'ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(check)} '
+        f'CHECK ({column} IS NOT NULL AND {column} < {_literal(boundary)}) NOT VALID',
+        f'ALTER TABLE {_qn(table)} VALIDATE CONSTRAINT {_qn(check)}',
+    ]
+
+    indexes, foreign_keys, (legacy_sequence, is_identity) = _catalog(table)
+    swap = [
+        f'LOCK TABLE {_qn(table)} IN ACCESS EXCLUSIVE MODE',
+        f'ALTER TABLE {_qn(table)} RENAME TO {_qn(legacy)}',
+    ]
+    parent_indexes = [f'CREATE INDEX {_qn(table + "_part_id_idx")} ON {_qn(table)} (id)']
+    for name, definition, is_primary, is_unique in indexes:
+        if is_primary or name == legacy_id_index:
+            continue
+        if is_unique:
+            raise PartitioningError(f'Jedinstveni indeks {name} ne sadrži {spec.column} - particionisanje nije moguće.')
+        # Imena indeksa su globalna - legacy kopija se preimenuje, roditelj zadržava ime iz modela
+        swap.append(f'ALTER INDEX {_qn(name)} RENAME TO {_qn(name[:56] + "_legacy")}')
+        parent_indexes.append(f'CREATE INDEX {_qn(name)} ON {_qn(table)} USING {definition.split(" USING ", 1)[1]}')
+
+    swap += [
+        f'CREATE TABLE {_qn(table)} (LIKE {_qn(legacy)} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})',
+        # Sekvenca legacy tabele nestaje s njom pri retenciji - roditelj dobija svoju, nastavlja gde je stala stara
+        f'CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(table)}.id',
+        f"SELECT setval('{sequence}', GREATEST("
+        f"(SELECT COALESCE(max(id), 0) FROM {_qn(legacy)}), "
+        f"COALESCE(pg_sequence_last_value('{legacy_sequence}'::regclass), 0)) + 1, false)"
+        if legacy_sequence else
+        f"SELECT setval('{sequence}', (SELECT COALESCE(max(id), 0) FROM {_qn(legacy)}) + 1, false)",
+        f"ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}'::regclass)",
+    ]
+    # Legacy ostaje bez sopstvenog generatora id-ja - jedini izvor je sekvenca roditelja
+    # (ATTACH ne prima particiju sa identity kolonom koju roditelj nema)
+    if is_identity:
+        swap.append(f'ALTER TABLE {_qn(legacy)} ALTER COLUMN id DROP IDENTITY')
+    elif legacy_sequence:
+        swap += [
+            f'ALTER TABLE {_qn(legacy)} ALTER COLUMN id DROP DEFAULT',
+            f'DROP SEQUENCE {legacy_sequence}',
+        ]
+    swap += [
+        *parent_indexes,
+        # Strani ključevi pre ATTACH-a - legacy ekvivalenti se prikače bez ponovne provere
+        *(f'ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}' for name, definition in foreign_keys),
+        # Proveren CHECK pokriva granicu particije - ATTACH ne skenira redove
+        f'ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(legacy)} FOR VALUES FROM (MINVALUE) TO ({_literal(boundary)})',
+        f'ALTER TABLE {_qn(legacy)} DROP CONSTRAINT {_qn(check)}',
+        f'CREATE TABLE {_qn(table + "_default")} PARTITION OF {_qn(table)} DEFAULT',
+    ]
+    for offset in range(1, months_ahead + 1):
+        start = add_months(boundary, offset - 1)
+        swap.append(
+            f'CREATE TABLE {_qn(partition_name(table, start))} PARTITION OF {_qn(table)} '
+            f'FOR VALUES FROM ({_literal(start)}) TO ({_literal(add_months(start, 1))})'
+        )
+    return Conversion(prepare, swap, boundary)
+
+
+def convert(spec, months_ahead, now=None):
+    """Izvrši plan_conversion; vraća plan (za izveštaj)"""
+    plan = plan_conversion(spec, months_ahead, now=now)
+    with connection.cursor() as cursor:
+        for statement in plan.prepare:
+            cursor.execute(statement)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for statement in plan.swap:
+            cursor.execute(statement)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {_qn(spec.model._meta.db_table)}')
+    return plan
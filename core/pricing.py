@@ -0,0 +1,102 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import BigIntegerField
+
+
+# ============================================
+# CENE - slobodan tekst price_range -> (min, max) u dinarima
+# ============================================
+
+FREE_WORDS = ('besplatno', 'poklon', 'gratis', 'džabe', 'бесплатно', 'поклон')
+EURO_MARKERS = ('€', 'eur', 'evra', 'evro', 'евра', 'евро')
+MULTIPLIERS = (
+    (re.compile(r'^(?:mil|miliona|milion|мил)'), 1_000_000),
+    (re.compile(r'^(?:k\b|hilj|хиљ)'), 1_000),
+)
+# Broj: grupe hiljada (10 000, 10.000,00) ili obično 1500 / 1,5
+NUMBER_RE = re.compile(r'\d{1,3}(?:[ .,]\d{3})+(?:[.,]\d{1,2})?(?!\d)|\d+(?:[.,]\d+)?')
+RANGE_SEPARATORS = re.compile(r'\s*(?:-|–|—|do|до|to)\s*$')
+# Gornja granica kolona price_min/price_max (PositiveBigIntegerField)
+MAX_AMOUNT = BigIntegerField.MAX_BIGINT
+
+
+def _to_decimal(raw):
+    """Srpski zapis: tačka za hiljade, zarez za decimale; podržava i obrnuto kad je jednoznačno"""
+    raw = raw.replace(' ', '')
+    if '.' in raw and ',' in raw:
+        thousands, decimal = ('.', ',') if raw.rfind(',') > raw.rfind('.') else (',', '.')
+        raw = raw.replace(thousands, '').replace(decimal, '.')
+    else:
+        for separator in '.,':
+            if separator in raw:
+                groups = raw.split(separator)
+                # 1.000 / 10.000.000 su hiljade, 1.5 / 2,75 su decimale
+                if len(groups) > 2 or (len(groups[-1]) == 3 and groups[0] != '0'):
+                    raw = raw.replace(separator, '')
+                else:
+                    raw = raw.replace(separator, '.')
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        return None
+
+
+def _to_amount(value):
+    """Decimal -> ceo broj dinara u opsegu kolone; None za NaN/Infinity i negativne iznose"""
+    if value is None or not value.is_finite() or value < 0:
+        return None
+    return min(int(value.to_integral_value()), MAX_AMOUNT)
+
+
+def _multiplier(text_after):
+    text_after = text_after.lstrip()
+    for pattern, factor in MULTIPLIERS:
+        if pattern.match(text_after):
+            return factor
+    return 1
+
+
+def parse_price_range(text):
+    """
+    (price_min, price_max) u RSD kao celi brojevi, ili (None, None) kad cena nije navedena
+    ili se ne može pročitati ("dogovor", "zamena"). Primeri:
+    "1000 RSD" -> (1000, 1000), "10.000 - 15.000 din" -> (10000, 15000),
+    "od 5000" -> (5000, None), "do 20k" -> (0, 20000), "150 €" -> (150 * EUR_TO_RSD, ...), "poklon" -> (0, 0).
+    """
+    if not text:
+        return None, None
+    lowered = text.strip().lower()
+    if any(word in lowered for word in FREE_WORDS):
+        return 0, 0
+
+    values = []
+    for match in NUMBER_RE.finditer(lowered):
+        value = _to_decimal(match.group())
+        if value is None:
+            continue
+        values.append((value * _multiplier(lowered[match.end():]), match.start()))
+    if not values:
+        return None, None
+
+    rate = Decimal(str(getattr(settings, 'EUR_TO_RSD', 117)))
+    if any(marker in lowered for marker in EURO_MARKERS):
+        values = [(value * rate, start) for value, start in values]
+    amounts = [_to_amount(value) for value, _ in values[:2]]
+
+    if len(amounts) == 2 and RANGE_SEPARATORS.search(lowered[:values[1][1]]):
+        return min(amounts), max(amounts)
+    prefix = lowered[:values[0][1]]
+    if re.search(r'(?:^|\s)(?:od|од|from|preko)\s*$', prefix):
+        return amounts[0], None
+    if re.search(r'(?:^|\s)(?:do|до|max|maks|ispod)\.?\s*$', prefix):
+        return 0, amounts[0]
+    return amounts[0], amounts[0]
+
+
+def parse_amount(raw):
+    """Iznos iz GET filtera (price_min/price_max) - ceo broj dinara ili None"""
+    if raw in (None, ''):
+        return None
+    return _to_amount(_to_decimal(str(raw).strip()))
@@ -0,0 +1,125 @@
+import json
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+
+# ============================================
+# PROFILISANJE UPITA - parsiranje logova i EXPLAIN planovi
+# ============================================
+
+# Tabele za koje prijavljujemo sekvencijalna skeniranja
+CORE_TABLES = ('core_offer', 'core_message', 'core_trade', 'core_review', 'core_notification')
+
+RecordedRequest = namedtuple('RecordedRequest', 'method path query user')
+
+# runserver access log - oba formata iz repoa:
+#   [WARNING] 2026-01-27 01:14:28 - django.server - "GET /path?x=1 HTTP/1.1" 401 1875
+#   WARNING 2026-01-27 00:21:49,784 basehttp "GET /path HTTP/1.1" 401 1875
+ACCESS_LOG_RE = re.compile(r'"(?P<method>[A-Z]+) (?P<target>/\S*) HTTP/[\d.]+" (?P<status>\d{3})')
+
+
+def parse_request_log(lines):
+    """
+    Zahtevi iz loga - JSONL ({"method", "path", "query", "user"}) ili runserver access log.
+    Ostale linije (traceback-ovi, debug poruke) se preskaču.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('{'):
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            if 'path' not in data:
+                continue
+            path, _, query = data['path'].partition('?')
+            yield RecordedRequest(
+                data.get('method', 'GET').upper(),
+                path,
+                data.get('query') or query,
+                data.get('user') or None,
+            )
+            continue
+
+        match = ACCESS_LOG_RE.search(line)
+        if match:
+            target = urlsplit(match['target'])
+            yield RecordedRequest(match['method'], target.path, target.query, None)
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'IN \((?:\?, )*\?\)')
+
+
+def normalize_sql(sql):
+    """Upit bez literala - grupisanje istih upita sa različitim parametrima"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def is_explainable(sql):
+    return sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH'))
+
+
+def explain(connection, sql, params=None):
+    """
+    (plan_tekst, flagovi) za upit (sa literalima ili sa `params`). Flagovi:
+    seq_scan:<tabela> - puno skeniranje core tabele, temp_sort - sortiranje bez indeksa.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return _postgres_flags(plan[0]['Plan'])
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return _sqlite_flags([row[-1] for row in cursor.fetchall()])
+    return '', []
+
+
+def _sqlite_flags(details):
+    flags = []
+    for detail in details:
+        # "SCAN core_offer" bez indeksa; "SCAN core_offer USING INDEX ..." je OK
+        match = re.match(r'SCAN (\w+)(?: AS \w+)?$', detail)
+        if match and match[1] in CORE_TABLES:
+            flags.append(f'seq_scan:{match[1]}')
+        elif 'USE TEMP B-TREE' in detail:
+            flags.append('temp_sort')
+    return '\n'.join(details), flags
+
+
+def _postgres_flags(root):
+    flags, lines = [], []
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        relation = node.get('Relation Name')
+        lines.append('  ' * depth + node['Node Type'] + (f' on {relation}' if relation else ''))
+        if node['Node Type'] == 'Seq Scan' and relation in CORE_TABLES:
+            flags.append(f'seq_scan:{relation}')
+        elif node['Node Type'] in ('Sort', 'Incremental Sort'):
+            flags.append('temp_sort')
+        stack.extend((child, depth + 1) for child in reversed(node.get('Plans', [])))
+    return '\n'.join(lines), flags
+
+
+def filtered_columns(sql, table):
+    """Kolone tabele iz WHERE dela upita - kandidati za indeks"""
+    where = sql.upper().find(' WHERE ')
+    if where < 0:
+        return []
+    pattern = re.compile(rf'"{table}"\."(\w+)"')
+    columns = []
+    for column in pattern.findall(sql[where:]):
+        if column not in columns:
+            columns.append(column)
+    return columns
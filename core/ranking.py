@@ -0,0 +1,42 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+
+# ============================================
+# POPULARNOST - skor sa vremenskim opadanjem
+# Interakcije vrede upola manje na svakih RANKING_HALF_LIFE_HOURS starosti.
+# Skor se čuva u log obliku: log2(interakcije) + starost_od_epohe / poluživot.
+# Tako redosled ne zavisi od trenutka čitanja - poređenje dve ponude "sada" i
+# za nedelju dana daje isti rezultat, pa indeks nad skorom ne zastareva sam od sebe.
+# Preračun je potreban samo kad se promene brojači (pregledi, lajkovi, premium).
+# ============================================
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+VIEW_WEIGHT = 1.0
+LIKE_WEIGHT = 5.0
+PREMIUM_BOOST = 2.0
+
+
+def _half_life_seconds():
+    return settings.RANKING_HALF_LIFE_HOURS * 3600
+
+
+def popularity_score(views_count, likes_count, is_premium, created_at, half_life=None):
+    """Skor jedne ponude; veći je bolji"""
+    engagement = 1 + VIEW_WEIGHT * views_count + LIKE_WEIGHT * likes_count
+    if is_premium:
+        engagement *= PREMIUM_BOOST
+    created_at = created_at or timezone.now()
+    age = (created_at - EPOCH).total_seconds() / (half_life or _half_life_seconds())
+    return round(math.log2(engagement) + age, 6)
+
+
+def score_rows(rows):
+    """Skorovi za seriju redova (pk, views_count, likes_count, is_premium, created_at) -> {pk: skor}"""
+    half_life = _half_life_seconds()
+    return {pk: popularity_score(views, likes, premium, created_at, half_life)
+            for pk, views, likes, premium, created_at in rows}
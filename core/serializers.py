@@ -0,0 +1,168 @@
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+
+try:
+    import orjson
+except ImportError:  # opciono - brži JSON ako je instaliran
+    orjson = None
+
+
+# ============================================
+# JSON SERIJALIZACIJA ZA API
+# ============================================
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def format_datetime(value):
+    """'%Y-%m-%d %H:%M:%S' preko isoformat() - C implementacija, brža od strftime"""
+    return value.isoformat(sep=' ', timespec='seconds')[:19]
+
+
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dumps(data):
+    """Serijalizuj u bytes - orjson ako postoji, inače standardni json"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_orjson_default)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), content_type=JSON_CONTENT_TYPE, status=status)
+
+
+class FieldSpec:
+    """
+    Opis polja za API: (izlazni_ključ, lookup, formatter).
+    Čita se preko values_list() - bez instanciranja modela.
+    Ključ "offer1.title" pravi ugnježdeni objekat; grupe iz `nullable`
+    postaju None kad im je id NULL.
+    """
+
+    def __init__(self, *fields, nullable=()):
+        self.fields = [field if len(field) == 3 else (*field, None) for field in fields]
+        self.lookups = [lookup for _, lookup, _ in self.fields]
+        self.nullable = nullable
+        self._plan = [
+            (key.split('.', 1) if '.' in key else (None, key), formatter)
+            for key, _, formatter in self.fields
+        ]
+
+    def rows(self, queryset, extra=()):
+        """values_list sa poljima specifikacije (+ dodatne kolone na kraju reda)"""
+        return queryset.values_list(*self.lookups, *extra)
+
+    def serialize_row(self, row):
+        data = {}
+        for ((group, key), formatter), value in zip(self._plan, row):
+            if formatter is not None and value is not None:
+                value = formatter(value)
+            if group is None:
+                data[key] = value
+            else:
+                data.setdefault(group, {})[key] = value
+        for group in self.nullable:
+            if data[group]['id'] is None:
+                data[group] = None
+        return data
+
+    def serialize(self, rows):
+        serialize_row = self.serialize_row
+        return [serialize_row(row) for row in rows]
+
+
+def iter_json_array(key, items, trailer=None):
+    """
+    Streaming JSON objekta {"key": [...], ...} - stavke se šalju jedna po jedna.
+    trailer() se poziva tek na kraju, pa može da koristi broj poslatih stavki.
+    """
+    yield b'{' + dumps(key) + b':['
+    count = 0
+    for item in items:
+        yield (b',' if count else b'') + dumps(item)
+        count += 1
+    extra = trailer(count) if trailer else {}
+    tail = dumps(extra)[1:-1]
+    yield b']' + (b',' + tail if tail else b'') + b'}'
+
+
+def streaming_json_response(key, items, trailer=None):
+    return StreamingHttpResponse(iter_json_array(key, items, trailer), content_type=JSON_CONTENT_TYPE)
+
+
+# ==================== SPECIFIKACIJE ====================
+
+OFFER_CARD = FieldSpec(
+    ('id', 'id'),
+    ('title', 'title'),
+    ('offered', 'offered'),
+    ('wanted', 'wanted'),
+    ('city', 'city'),
+    ('price_min', 'price_min'),
+    ('price_max', 'price_max'),
+    ('owner', 'owner__username'),
+    ('created_at', 'created_at', format_datetime),
+)
+
+MESSAGE = FieldSpec(
+    ('id', 'id'),
+    ('sender', 'sender__username'),
+    ('subject', 'subject'),
+    ('body', 'body'),
+    ('timestamp', 'timestamp', format_datetime),
+    ('is_read', 'is_read'),
+)
+
+TRADE = FieldSpec(
+    ('id', 'id'),
+    ('offer1.id', 'offer1_id'),
+    ('offer1.title', 'offer1__title'),
+    ('offer1.owner', 'offer1__owner__username'),
+    ('offer2.id', 'offer2_id'),
+    ('offer2.title', 'offer2__title'),
+    ('offer2.owner', 'offer2__owner__username'),
+    ('status', 'status'),
+    ('created_at', 'created_at', format_datetime),
+    ('message', 'message'),
+    nullable=('offer1',),
+)
+
+# Delta sync (core/changes.py) - stanje objekta posle promene; klijent ga upisuje preko postojećeg
+
+MESSAGE_CHANGE = FieldSpec(
+    *MESSAGE.fields,
+    ('recipient', 'recipient__username'),
+)
+
+NOTIFICATION = FieldSpec(
+    ('id', 'id'),
+    ('type', 'notification_type'),
+    ('title', 'title'),
+    ('message', 'message'),
+    ('actor', 'actor__username'),
+    ('offer_id', 'offer_id'),
+    ('trade_id', 'trade_id'),
+    ('is_read', 'is_read'),
+    ('created_at', 'created_at', format_datetime),
+)
+
+TRADE_CHANGE = FieldSpec(
+    *TRADE.fields,
+    ('updated_at', 'updated_at', format_datetime),
+    nullable=TRADE.nullable,
+)
+
+OFFER_CHANGE = FieldSpec(
+    *OFFER_CARD.fields,
+    ('is_active', 'is_active'),
+    ('expires_at', 'expires_at', format_datetime),
+    ('updated_at', 'updated_at', format_datetime),
+)
@@ -1,3 +1,838 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode
+
+from . import changes, favorites, partitioning, trade_workflow
+from .bulk import ENCODING_ERROR, clean_image_path, import_offers
+from .lifecycle import archive_offers
+from .models import (
+    ArchivedOffer, Category, ChangeLog, City, LikeDelta, Message, Notification, Offer, OfferStatBucket, Review, Trade,
+    UserProfile,
+)
+from .pricing import MAX_AMOUNT, parse_amount, parse_price_range
+from .trade_workflow import TRANSITIONS, TradeTransitionError, cancel_competing_trades
+from .views import MAX_BATCH_SIZE
+
+
+def make_user(username):
+    return User.objects.create_user(username=username, password='lozinka-123')
+
+
+def make_offer(owner, category, **fields):
+    fields.setdefault('title', f'Ponuda {owner.username}')
+    return Offer.objects.create(
+        owner=owner, category=category, description='-', offered='-', wanted='-', **fields
+    )
+
+
+def make_trade(user1, user2, offer2, offer1=None, **fields):
+    return Trade.objects.create(user1=user1, user2=user2, offer1=offer1, offer2=offer2, **fields)
+
+
+class BarterTestCase(TestCase):
+    """Dva korisnika sa po jednom ponudom u zajedničkoj kategoriji"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Elektronika')
+        cls.alice = make_user('alice')
+        cls.bob = make_user('bob')
+        cls.alice_offer = make_offer(cls.alice, cls.category, title='Bicikl')
+        cls.bob_offer = make_offer(cls.bob, cls.category, title='Gitara')
+
+
+# ==================== RAZMENE ====================
+
+class TradeWorkflowTests(BarterTestCase):
+
+    def setUp(self):
+        self.trade = make_trade(self.alice, self.bob, self.bob_offer, offer1=self.alice_offer)
+
+    def test_final_statuses_have_no_transitions(self):
+        for status in ('rejected', 'cancelled', 'completed'):
+            self.assertEqual(TRANSITIONS[status], set())
+        self.assertEqual({status for status, _ in Trade.STATUS_CHOICES}, set(TRANSITIONS))
+
+    def test_accept_notifies_once(self):
+        trade_workflow.accept(self.trade)
+
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'accepted')
+        self.assertEqual(
+            Notification.objects.filter(trade=self.trade, notification_type='trade_accepted').count(), 1
+        )
+
+    def test_disallowed_transition_is_refused(self):
+        trade_workflow.reject(self.trade)
+        with self.assertRaises(TradeTransitionError):
+            trade_workflow.complete(self.trade, actor=self.bob)
+        self.trade.refresh_from_db()
+        self.assertEqual(self.trade.status, 'rejected')
+
+    def test_stale_copy_cannot_overwrite_concurrent_change(self):
+        stale = Trade.objects.get(pk=self.trade.pk)
+        trade_workflow.accept(self.trade)
+
+        with self.assertRaises(TradeTransitionError):
+            trade_workflow.reject(stale)
+        self.assertEqual(Trade.objects.get(pk=self.trade.pk).status, 'accepted')
+
+    def test_accept_buy_requires_purchase_offer(self):
+        with self.assertRaises(TradeTransitionError):
+            trade_workflow.accept_buy(self.trade)
+
+    def test_completion_side_effects(self):
+        carol = make_user('carol')
+        competing = make_trade(carol, self.bob, self.bob_offer)
+        self.assertEqual(Category.objects.get(pk=self.category.pk).active_offer_count, 2)
+
+        trade_workflow.accept(self.trade)
+        trade_workflow.complete(self.trade, actor=self.bob)
+
+        self.assertEqual(Trade.objects.get(pk=self.trade.pk).status, 'completed')
+        offers = Offer.objects.filter(pk__in=[self.alice_offer.pk, self.bob_offer.pk])
+        self.assertFalse(offers.filter(is_active=True).exists())
+        self.assertEqual(Category.objects.get(pk=self.category.pk).active_offer_count, 0)
+        profiles = UserProfile.objects.filter(user__in=[self.alice, self.bob])
+        self.assertEqual(list(profiles.values_list('trades_completed', flat=True)), [1, 1])
+        self.assertEqual(Trade.objects.get(pk=competing.pk).status, 'cancelled')
+        cancelled = Notification.objects.filter(recipient=carol, trade=competing, title='Razmena otkazana')
+        self.assertTrue(cancelled.exists())
+
+    def test_only_recipient_can_reject(self):
+        self.client.force_login(self.alice)
+        self.client.post(reverse('core:reject_trade', args=[self.trade.pk]))
+        self.assertEqual(Trade.objects.get(pk=self.trade.pk).status, 'pending')
+
+        self.client.force_login(self.bob)
+        self.client.post(reverse('core:reject_trade', args=[self.trade.pk]))
+        self.assertEqual(Trade.objects.get(pk=self.trade.pk).status, 'rejected')
+
+
+class CancelCompetingTradesTests(BarterTestCase):
+
+    def cancellations(self, trade):
+        return Notification.objects.filter(trade=trade, title='Razmena otkazana').count()
+
+    def test_cancels_pending_trades_on_given_offers(self):
+        carol = make_user('carol')
+        carol_offer = make_offer(carol, self.category)
+        trade = make_trade(carol, self.alice, self.alice_offer, offer1=carol_offer)
+        other = make_trade(carol, self.bob, self.bob_offer)
+
+        self.assertEqual(cancel_competing_trades([self.alice_offer.pk]), 1)
+
+        trade.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(trade.status, 'cancelled')
+        self.assertEqual(other.status, 'pending')
+        self.assertEqual(self.cancellations(trade), 2)
+        self.assertTrue(ChangeLog.objects.filter(entity=ChangeLog.TRADE, object_id=trade.pk, user=carol).exists())
+
+    def test_batches_sharing_timestamp_notify_each_trade_once(self):
+        # expire_offers prosleđuje isti `now` svim serijama; razmena dodiruje ponude iz obe serije
+        carol = make_user('carol')
+        both = make_trade(self.bob, self.alice, self.alice_offer, offer1=self.bob_offer)
+        second = make_trade(carol, self.bob, self.bob_offer)
+        now = timezone.now()
+
+        self.assertEqual(cancel_competing_trades([self.alice_offer.pk], now=now), 1)
+        self.assertEqual(cancel_competing_trades([self.bob_offer.pk], now=now), 1)
+
+        self.assertEqual(self.cancellations(both), 2)
+        self.assertEqual(self.cancellations(second), 2)
+        self.assertEqual(
+            ChangeLog.objects.filter(entity=ChangeLog.TRADE, object_id=both.pk, user=self.alice).count(), 2
+        )
+
+
+# ==================== CONDITIONAL GET ====================
+
+class OfferConditionalGetTests(BarterTestCase):
+
+    def test_offer_endpoints_send_etag_without_last_modified(self):
+        for name in ('core:get_offer_stats', 'core:get_offer_detail_api'):
+            response = self.client.get(reverse(name, args=[self.alice_offer.pk]))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header('ETag'))
+            self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_view_count_change_invalidates_etag(self):
+        for name in ('core:get_offer_stats', 'core:get_offer_detail_api'):
+            url = reverse(name, args=[self.alice_offer.pk])
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            Offer.objects.filter(pk=self.alice_offer.pk).update(views_count=F('views_count') + 1)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_aggregate_endpoints_send_etag_without_last_modified(self):
+        self.client.force_login(self.alice)
+        urls = (
+            reverse('core:get_user_stats', args=['bob']),
+            reverse('core:get_user_detail_api', args=['bob']),
+            reverse('core:get_categories'),
+            reverse('core:get_trades_inbox'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_deleting_newest_row_invalidates_etag(self):
+        self.client.force_login(self.alice)
+        make_trade(self.alice, self.bob, self.bob_offer)
+        newest = make_trade(self.alice, self.bob, self.bob_offer)
+        urls = (reverse('core:get_user_stats', args=['bob']), reverse('core:get_trades_inbox'))
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+
+        newest.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etags[url])
+
+
+# ==================== CENE ====================
+
+class PriceParsingTests(TestCase):
+
+    def test_parse_price_range(self):
+        cases = {
+            '1000 RSD': (1000, 1000),
+            '10.000 - 15.000 din': (10000, 15000),
+            'od 5000': (5000, None),
+            'do 20k': (0, 20000),
+            '1,5 mil': (1_500_000, 1_500_000),
+            'poklon': (0, 0),
+            'dogovor': (None, None),
+            '': (None, None),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_price_range(text), expected)
+
+    def test_parse_price_range_clamps_to_column_range(self):
+        self.assertEqual(parse_price_range('9' * 30 + ' mil'), (MAX_AMOUNT, MAX_AMOUNT))
+
+    def test_parse_amount(self):
+        cases = {
+            '1500': 1500, '10.000': 10000, '': None, None: None, '-5': None, 'abc': None,
+            'NaN': None, 'sNaN': None, 'Infinity': None, '-Infinity': None, '1e100': MAX_AMOUNT,
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(parse_amount(raw), expected)
+
+    def test_offer_filters_ignore_invalid_amounts(self):
+        for name in ('core:offer_list', 'core:search_offers'):
+            for raw in ('NaN', 'Infinity', '1e100'):
+                with self.subTest(view=name, price_min=raw):
+                    response = self.client.get(reverse(name), {'price_min': raw, 'q': 'x'})
+                    self.assertEqual(response.status_code, 200)
+
+
+# ==================== GRADOVI ====================
+
+class CityResolutionTests(BarterTestCase):
+
+    def test_resolve_matches_aliases_and_cyrillic(self):
+        belgrade = City.objects.get(name='Beograd')
+        for text in ('Beograd', 'beograd ', 'BG', 'Београд', 'Zemun'):
+            with self.subTest(text=text):
+                self.assertEqual(City.resolve(text), belgrade)
+        self.assertIsNone(City.resolve('Atlantida'))
+        self.assertEqual(City.resolve('', None, 'Niš'), City.objects.get(name='Niš'))
+
+    def test_saved_offer_gets_canonical_city(self):
+        offer = make_offer(self.alice, self.category, city='nis')
+        self.assertEqual(offer.city_ref.name, 'Niš')
+        self.assertEqual(offer.city, 'Niš')
+
+    def test_bulk_import_sets_city_ref(self):
+        stream = io.StringIO(
+            'title,description,category,city,location\n'
+            'Lampa,-,Elektronika,BG,\n'
+            'Sto,-,Elektronika,Nepoznato,Novi Sad\n'
+            'Stolica,-,Elektronika,Nepoznato,\n'
+        )
+        result = import_offers(stream, self.bob)
+        self.assertEqual(result.created, 3)
+
+        imported = {offer.title: offer for offer in Offer.objects.filter(title__in=['Lampa', 'Sto', 'Stolica'])}
+        self.assertEqual((imported['Lampa'].city_ref.name, imported['Lampa'].city), ('Beograd', 'Beograd'))
+        self.assertEqual(imported['Sto'].city_ref.name, 'Novi Sad')
+        self.assertIsNone(imported['Stolica'].city_ref)
+        self.assertEqual(imported['Stolica'].city, 'Nepoznato')
+
+        response = self.client.get(reverse('core:offer_list'), {'city': 'Beograd'})
+        self.assertContains(response, 'Lampa')
+
+
+# ==================== KATEGORIJE ====================
+
+class CategoryTreeTests(BarterTestCase):
+
+    def setUp(self):
+        self.other = Category.objects.create(name='Sport')
+        self.phones = Category.objects.create(name='Telefoni', parent=self.category)
+        self.android = Category.objects.create(name='Android', parent=self.phones)
+
+    def counts(self):
+        return dict(Category.objects.values_list('name', 'active_offer_count'))
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.phones.path, self.category.path + '0001')
+        self.assertEqual(self.android.path, self.phones.path + '0001')
+        self.assertEqual((self.category.depth, self.phones.depth, self.android.depth), (0, 1, 2))
+
+    def test_moving_subtree_rewrites_descendant_paths(self):
+        make_offer(self.alice, self.android)
+        self.phones.parent = self.other
+        self.phones.save()
+
+        self.android.refresh_from_db()
+        self.assertEqual(self.phones.path, self.other.path + '0001')
+        self.assertEqual(self.android.path, self.phones.path + '0001')
+        self.assertEqual(self.android.depth, 2)
+        self.assertEqual(
+            self.counts(), {'Elektronika': 2, 'Sport': 1, 'Telefoni': 1, 'Android': 1},
+        )
+        with self.assertRaises(ValueError):
+            self.phones.parent = self.android
+            self.phones.save()
+
+    def test_offer_changes_adjust_counts_of_ancestors(self):
+        offer = make_offer(self.alice, self.android)
+        self.assertEqual(self.counts(), {'Elektronika': 3, 'Sport': 0, 'Telefoni': 1, 'Android': 1})
+
+        offer.is_active = False
+        offer.save()
+        self.assertEqual(self.counts(), {'Elektronika': 2, 'Sport': 0, 'Telefoni': 0, 'Android': 0})
+
+        offer.is_active = True
+        offer.save()
+        offer.category = self.other
+        offer.save()
+        self.assertEqual(self.counts(), {'Elektronika': 2, 'Sport': 1, 'Telefoni': 0, 'Android': 0})
+
+        offer.delete()
+        self.assertEqual(self.counts(), {'Elektronika': 2, 'Sport': 0, 'Telefoni': 0, 'Android': 0})
+
+    def test_rebuild_repairs_drift(self):
+        make_offer(self.alice, self.android)
+        expected = self.counts()
+        Category.objects.filter(pk__in=[self.category.pk, self.android.pk]).update(active_offer_count=7)
+
+        self.assertEqual(Category.rebuild_active_counts(), 2)
+        self.assertEqual(self.counts(), expected)
+        self.assertEqual(Category.rebuild_active_counts(), 0)
+
+
+# ==================== ARHIVA ====================
+
+class ArchiveOffersTests(BarterTestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.cutoff = self.now - timedelta(days=180)
+        Offer.objects.filter(pk__in=[self.alice_offer.pk, self.bob_offer.pk]).update(
+            is_active=False, updated_at=self.now - timedelta(days=365)
+        )
+
+    def test_archives_stale_offer_with_daily_stats(self):
+        OfferStatBucket.objects.create(
+            offer=self.alice_offer, owner=self.alice, period=OfferStatBucket.DAY,
+            bucket_start=self.now - timedelta(days=300), views=7, contacts=1,
+        )
+
+        self.assertEqual(archive_offers(self.cutoff), 2)
+
+        self.assertFalse(Offer.objects.filter(pk=self.alice_offer.pk).exists())
+        archived = ArchivedOffer.objects.get(original_id=self.alice_offer.pk)
+        self.assertEqual(archived.title, 'Bicikl')
+        self.assertEqual([(day['views'], day['contacts']) for day in archived.data['stats']], [(7, 1)])
+
+    def test_keeps_offers_with_reviews(self):
+        Review.objects.create(reviewer=self.bob, reviewed_user=self.alice, offer=self.alice_offer, rating=5)
+
+        self.assertEqual(archive_offers(self.cutoff), 1)
+        self.assertTrue(Offer.objects.filter(pk=self.alice_offer.pk).exists())
+
+    def test_keeps_traded_offers_in_both_histories(self):
+        carol = make_user('carol')
+        trade = make_trade(carol, self.bob, self.bob_offer, status='completed')
+        Offer.objects.filter(pk=self.bob_offer.pk).update(updated_at=self.now - timedelta(days=365))
+
+        self.assertEqual(archive_offers(self.cutoff, dry_run=True), 1)
+        self.assertEqual(archive_offers(self.cutoff), 1)
+        self.assertTrue(Offer.objects.filter(pk=self.bob_offer.pk).exists())
+        self.assertTrue(Trade.objects.filter(pk=trade.pk, user1=carol).exists())
+
+
+# ==================== DELTA SYNC ====================
+
+class SyncTests(BarterTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.alice)
+
+    def sync(self, cursor):
+        return self.client.get(reverse('core:sync_changes'), {'cursor': cursor})
+
+    def test_cursor_round_trip(self):
+        issued_at = timezone.now()
+        self.assertEqual(changes.decode_cursor(changes.encode_cursor(42, issued_at)), (42, issued_at))
+
+    def test_invalid_cursors_are_rejected(self):
+        naive = urlsafe_base64_encode(f'{changes.CURSOR_VERSION}|5|{datetime(2030, 1, 1).isoformat()}'.encode())
+        other_version = urlsafe_base64_encode(f'v0|5|{timezone.now().isoformat()}'.encode())
+        for cursor in ('nije-kursor', naive, other_version):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(changes.decode_cursor(cursor))
+                self.assertEqual(self.sync(cursor).status_code, 400)
+
+    def test_expired_cursor_asks_for_reset(self):
+        cursor = changes.encode_cursor(0, timezone.now() - timedelta(days=365))
+        response = self.sync(cursor)
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['reset'])
+
+    def test_feed_returns_changes_after_cursor(self):
+        start = ChangeLog.objects.filter(user=self.alice).order_by('-id').values_list('id', flat=True).first() or 0
+        message = Message.objects.create(sender=self.bob, recipient=self.alice, body='Zdravo')
+        later = timezone.now() + timedelta(minutes=1)
+
+        feed = changes.changes_since(self.alice, start, now=later)
+        self.assertEqual([item['id'] for item in feed['messages']], [message.pk])
+        self.assertEqual(feed['offers'], [])
+        self.assertFalse(feed['has_more'])
+
+        last_id, _ = changes.decode_cursor(feed['cursor'])
+        self.assertEqual(changes.changes_since(self.alice, last_id, now=later)['messages'], [])
+
+        message_id = message.pk
+        message.delete()
+        feed = changes.changes_since(self.alice, last_id, now=later)
+        self.assertEqual(feed['deleted']['messages'], [message_id])
+
+    def test_feed_holds_back_unsettled_rows(self):
+        start = ChangeLog.objects.filter(user=self.alice).order_by('-id').values_list('id', flat=True).first() or 0
+        Message.objects.create(sender=self.bob, recipient=self.alice, body='Zdravo')
+
+        feed = changes.changes_since(self.alice, start, now=timezone.now())
+        self.assertEqual(feed['messages'], [])
+        self.assertEqual(changes.decode_cursor(feed['cursor'])[0], start)
+
+
+# ==================== INBOX RAZMENA ====================
+
+class TradesInboxTests(BarterTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.alice)
+
+    def inbox(self, **params):
+        response = self.client.get(reverse('core:get_trades_inbox'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_are_grouped_by_status(self):
+        make_trade(self.alice, self.bob, self.bob_offer)
+        make_trade(self.alice, self.bob, self.bob_offer, status='accepted')
+        make_trade(self.bob, self.alice, self.alice_offer, status='rejected')
+        make_trade(self.bob, self.alice, self.alice_offer, status='rejected')
+
+        data = self.inbox()
+        self.assertEqual(data['counts']['pending'], 1)
+        self.assertEqual(data['counts']['accepted'], 1)
+        self.assertEqual(data['counts']['rejected'], 2)
+        self.assertEqual(data['total_count'], 4)
+        self.assertEqual(self.inbox(status='rejected')['counts'], data['counts'])
+        self.assertEqual(len(self.inbox(status='rejected')['trades']), 2)
+
+    def test_cursor_pages_cover_all_trades_once(self):
+        trades = [make_trade(self.bob, self.alice, self.alice_offer) for _ in range(5)]
+        # Isti created_at - redosled razrešava pk
+        Trade.objects.filter(pk__in=[trade.pk for trade in trades[1:4]]).update(created_at=trades[1].created_at)
+
+        seen, cursor = [], None
+        while True:
+            data = self.inbox(limit=2, **({'cursor': cursor} if cursor else {}))
+            seen += [trade['id'] for trade in data['trades']]
+            cursor = data['next_cursor']
+            self.assertEqual(data['has_more'], cursor is not None)
+            if not cursor:
+                break
+        expected = Trade.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_invalid_cursors_are_rejected(self):
+        naive = urlsafe_base64_encode(f'{datetime(2030, 1, 1).isoformat()}|5'.encode())
+        for cursor in ('nije-kursor', naive):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('core:get_trades_inbox'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+
+
+# ==================== RAZGOVORI ====================
+
+class ConversationWindowTests(BarterTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.alice)
+
+    def send(self, sender, recipient, count, age=timedelta(minutes=5)):
+        ids = [message.pk for message in Message.objects.bulk_create([
+            Message(sender=sender, recipient=recipient, body=f'Poruka {n}') for n in range(count)
+        ])]
+        # Starije od SYNC_SETTLE_SECONDS - polling ih smatra smirenim
+        Message.objects.filter(pk__in=ids).update(timestamp=timezone.now() - age)
+        return ids
+
+    def ids(self, html):
+        return [int(part.split('"')[0]) for part in html.split('data-id="')[1:]]
+
+    def test_window_and_older_pages_cover_whole_conversation(self):
+        expected = self.send(self.bob, self.alice, 45)
+        response = self.client.get(reverse('core:view_conversation', args=['bob']))
+        window = [message.pk for message in response.context['messages']]
+        self.assertEqual(window, expected[-30:])
+        self.assertEqual(response.context['last_id'], expected[-1])
+        self.assertFalse(Message.objects.filter(recipient=self.alice, is_read=False).exists())
+
+        older = self.client.get(
+            reverse('core:conversation_older', args=['bob']), {'cursor': response.context['older_cursor']}
+        ).json()
+        self.assertEqual(self.ids(older['html']), expected[:15])
+        self.assertIsNone(older['older_cursor'])
+
+    def test_newer_returns_messages_after_id_and_marks_them_read(self):
+        first, second = self.send(self.bob, self.alice, 2)
+        data = self.client.get(reverse('core:conversation_newer', args=['bob']), {'after': first}).json()
+        self.assertEqual(self.ids(data['html']), [second])
+        self.assertEqual(data['last_id'], second)
+        self.assertTrue(Message.objects.get(pk=second).is_read)
+
+    def test_newer_does_not_advance_past_fresh_messages(self):
+        old = self.send(self.bob, self.alice, 1)[0]
+        fresh = Message.objects.create(sender=self.bob, recipient=self.alice, body='Sveža')
+        url = reverse('core:conversation_newer', args=['bob'])
+
+        data = self.client.get(url, {'after': 0}).json()
+        self.assertEqual(self.ids(data['html']), [old, fresh.pk])
+        self.assertEqual(data['last_id'], old)
+
+        with override_settings(SYNC_SETTLE_SECONDS=0):
+            self.assertEqual(self.client.get(url, {'after': old}).json()['last_id'], fresh.pk)
+
+    def test_ajax_send_returns_fragment(self):
+        response = self.client.post(
+            reverse('core:view_conversation', args=['bob']), {'body': 'Zdravo'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 201)
+        message = Message.objects.get(sender=self.alice, recipient=self.bob)
+        self.assertEqual(self.ids(response.content.decode()), [message.pk])
+
+
+# ==================== OMILJENE ====================
+
+class FavoritesTests(BarterTestCase):
+
+    def test_like_is_idempotent_and_counted_before_flush(self):
+        self.assertTrue(favorites.like(self.bob, self.alice_offer))
+        self.assertFalse(favorites.like(self.bob, self.alice_offer))
+
+        self.alice_offer.refresh_from_db()
+        self.assertEqual(self.alice_offer.likes_count, 0)
+        self.assertEqual(favorites.current_likes(self.alice_offer), 1)
+
+    def test_flush_applies_and_clears_deltas(self):
+        carol = make_user('carol')
+        favorites.like(self.bob, self.alice_offer)
+        favorites.like(carol, self.alice_offer)
+        favorites.like(carol, self.bob_offer)
+        favorites.unlike(carol, self.bob_offer)
+        self.assertFalse(favorites.unlike(carol, self.bob_offer))
+
+        self.assertEqual(favorites.flush_like_deltas(), 1)
+
+        self.assertFalse(LikeDelta.objects.exists())
+        self.assertEqual(Offer.objects.get(pk=self.alice_offer.pk).likes_count, 2)
+        self.assertEqual(Offer.objects.get(pk=self.bob_offer.pk).likes_count, 0)
+        self.assertEqual(favorites.flush_like_deltas(), 0)
+
+    def test_one_notification_per_offer_and_none_for_own_likes(self):
+        carol = make_user('carol')
+        favorites.like(self.bob, self.alice_offer)
+        favorites.like(carol, self.alice_offer)
+        favorites.like(self.bob, self.bob_offer)
+
+        self.assertEqual(favorites.notify_new_favorites(), 1)
+        self.assertEqual(Notification.objects.filter(notification_type='offer_liked', recipient=self.alice).count(), 1)
+        self.assertFalse(Notification.objects.filter(notification_type='offer_liked', recipient=self.bob).exists())
+        self.assertEqual(favorites.notify_new_favorites(), 0)
+
+
+# ==================== UVOZ / IZVOZ ====================
+
+class OfferImportExportTests(BarterTestCase):
+    HEADER = 'title,description,category,city,image\n'
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        os.makedirs(os.path.join(self.media.name, 'offers'))
+        open(os.path.join(self.media.name, 'offers', 'lampa.jpg'), 'wb').close()
+
+    def run_import(self, rows, **kwargs):
+        return import_offers(io.StringIO(self.HEADER + rows), self.bob, **kwargs)
+
+    def imported_titles(self):
+        return set(Offer.objects.filter(owner=self.bob).exclude(pk=self.bob_offer.pk).values_list('title', flat=True))
+
+    def test_happy_path(self):
+        result = self.run_import('Lampa,-,Elektronika,Beograd,offers/lampa.jpg\nSto,-,elektronika,Niš,\n')
+
+        self.assertEqual((result.processed, result.created, result.error_count), (2, 2, 0))
+        lamp = Offer.objects.get(title='Lampa')
+        self.assertEqual(lamp.image.name, 'offers/lampa.jpg')
+        self.assertEqual(lamp.slug, f'lampa-{lamp.pk}')
+        self.assertEqual(Category.objects.get(pk=self.category.pk).active_offer_count, 4)
+
+    def test_dry_run_inserts_nothing(self):
+        result = self.run_import('Lampa,-,Elektronika,Beograd,\n', dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(self.imported_titles(), set())
+
+    def test_row_errors_are_reported_per_line(self):
+        result = self.run_import(
+            'Lampa,-,Nameštaj,Beograd,\n'
+            'Sto,-,Elektronika,Beograd,offers/nema.jpg\n'
+            ',-,Elektronika,Beograd,\n'
+            'Stolica,-,Elektronika,Beograd,\n'
+        )
+        self.assertEqual(result.created, 1)
+        errors = dict(result.errors)
+        self.assertEqual(sorted(errors), [2, 3, 4])
+        self.assertIn('Nepoznata kategorija', errors[2])
+        self.assertIn('Slika ne postoji', errors[3])
+        self.assertIn('Nedostaju obavezna polja', errors[4])
+        self.assertEqual(self.imported_titles(), {'Stolica'})
+
+    def test_image_paths_outside_offers_are_rejected(self):
+        for raw in ('../x.jpg', 'offers/../../settings.py', '/etc/passwd', 'avatars/a.jpg', 'offers/'):
+            with self.subTest(raw=raw):
+                self.assertIsNone(clean_image_path(raw))
+        self.assertEqual(clean_image_path(' offers\\2024//lampa.jpg '), 'offers/2024/lampa.jpg')
+
+        result = self.run_import('Lampa,-,Elektronika,Beograd,../x.jpg\n')
+        self.assertEqual(result.created, 0)
+        self.assertIn('Neispravna putanja slike', result.errors[0][1])
+
+    def test_image_of_another_users_offer_is_rejected(self):
+        Offer.objects.filter(pk=self.alice_offer.pk).update(image='offers/lampa.jpg')
+        result = self.run_import('Lampa,-,Elektronika,Beograd,offers/lampa.jpg\n')
+        self.assertEqual(result.created, 0)
+        self.assertIn('drugog korisnika', result.errors[0][1])
+
+    def test_failed_chunk_falls_back_to_single_rows(self):
+        with mock.patch.object(Offer.objects, 'bulk_create', side_effect=DatabaseError('chunk')):
+            result = self.run_import('Lampa,-,Elektronika,Beograd,\nSto,-,Elektronika,Beograd,\n', chunk_size=10)
+        self.assertEqual((result.created, result.error_count), (2, 0))
+        self.assertEqual(self.imported_titles(), {'Lampa', 'Sto'})
+
+    def test_non_utf8_upload_imports_nothing(self):
+        # Više chunk-ova ispred loše linije - nijedan ne sme biti sačuvan
+        rows = ''.join(f'Ponuda {n},-,Elektronika,Beograd,\n' for n in range(5))
+        content = (self.HEADER + rows).encode('utf-8') + 'Čaša,-,Elektronika,Niš,\n'.encode('cp1250')
+        self.client.force_login(self.bob)
+
+        response = self.client.post(reverse('core:offer_import'), {
+            'file': SimpleUploadedFile('ponude.csv', content, content_type='text/csv'),
+            'format': 'csv',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.errors, [(7, ENCODING_ERROR)])
+        self.assertEqual(self.imported_titles(), set())
+
+    def test_non_seekable_stream_stops_at_encoding_error(self):
+        raw = io.BytesIO((self.HEADER + 'Lampa,-,Elektronika,Beograd,\n').encode('utf-8') + b'\xc8a\n')
+        raw.seekable = lambda: False
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+
+        result = import_offers(stream, self.bob)
+        self.assertEqual(result.errors[-1][1], ENCODING_ERROR)
+
+    def test_export_round_trips_through_import(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse('core:offer_export'), {'format': 'jsonl'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Bicikl'])
+
+        csv_response = self.client.get(reverse('core:offer_export'))
+        lines = b''.join(csv_response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,title,'))
+        self.assertEqual(len(lines), 2)
+
+
+# ==================== BATCH API ====================
+
+class BatchApiTests(BarterTestCase):
+
+    def batch(self, name, **params):
+        return self.client.get(reverse(name), params)
+
+    def test_offers_batch_keeps_request_order_and_reports_missing(self):
+        ids = f'{self.bob_offer.pk},999999,{self.alice_offer.pk},{self.bob_offer.pk}'
+        for name, key in (('core:get_offers_batch', 'offers'), ('core:get_offer_stats_batch', 'stats')):
+            with self.subTest(name=name):
+                data = self.batch(name, ids=ids).json()
+                self.assertEqual([item['id'] for item in data[key]], [self.bob_offer.pk, self.alice_offer.pk])
+                self.assertEqual(data['missing'], [999999])
+
+    def test_user_stats_batch(self):
+        data = self.batch('core:get_user_stats_batch', usernames='bob,niko,alice').json()
+        self.assertEqual(len(data['stats']), 2)
+        self.assertEqual(data['missing'], ['niko'])
+
+    def test_invalid_ids_are_rejected(self):
+        for ids in ('abc', '0', '-3', str(2 ** 63), '100000000000000000000', ''):
+            for name in ('core:get_offers_batch', 'core:get_offer_stats_batch'):
+                with self.subTest(ids=ids, name=name):
+                    response = self.batch(name, ids=ids)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.json()['success'])
+
+    def test_batch_size_is_limited(self):
+        ids = ','.join(str(pk) for pk in range(1, MAX_BATCH_SIZE + 1))
+        self.assertEqual(self.batch('core:get_offers_batch', ids=ids).status_code, 200)
+        self.assertEqual(self.batch('core:get_offers_batch', ids=f'{ids},{MAX_BATCH_SIZE + 1}').status_code, 400)
+        usernames = ','.join(f'korisnik{n}' for n in range(MAX_BATCH_SIZE + 1))
+        self.assertEqual(self.batch('core:get_user_stats_batch', usernames=usernames).status_code, 400)
+
+
+# ==================== PARTICIONISANJE ====================
+
+class PlanConversionTests(TestCase):
+    """Generisani SQL bez PostgreSQL-a - katalog tabele je zadat"""
+
+    spec = partitioning.PARTITIONED['message']
+    now = timezone.make_aware(datetime(2030, 5, 10, 12, 0))
+    indexes = [
+        ('core_message_pkey', 'CREATE UNIQUE INDEX core_message_pkey ON public.core_message USING btree (id)', True, True),
+        ('core_messag_timesta_idx', 'CREATE INDEX core_messag_timesta_idx ON public.core_message USING btree ("timestamp")',
+         False, False),
+    ]
+    foreign_keys = [('core_message_sender_fk', 'FOREIGN KEY (sender_id) REFERENCES auth_user(id) DEFERRABLE')]
+
+    def plan(self, id_sequence=('public.core_message_id_seq', True), indexes=None, now=None):
+        catalog = (self.indexes if indexes is None else indexes, self.foreign_keys, id_sequence)
+        with mock.patch.object(partitioning, 'is_supported', return_value=True), \
+                mock.patch.object(partitioning, 'is_partitioned', return_value=False), \
+                mock.patch.object(partitioning, '_catalog', return_value=catalog):
+            return partitioning.plan_conversion(self.spec, 2, now=now or self.now)
+
+    def position(self, swap, fragment):
+        return next(n for n, statement in enumerate(swap) if fragment in statement)
+
+    def test_legacy_partition_ends_at_next_month(self):
+        plan = self.plan()
+        self.assertEqual((plan.boundary.year, plan.boundary.month, plan.boundary.day), (2030, 6, 1))
+        self.assertIn('NOT VALID', plan.prepare[2])
+        self.assertIn('CONCURRENTLY', plan.prepare[0])
+        attach = plan.swap[self.position(plan.swap, 'ATTACH PARTITION')]
+        self.assertIn(f'FROM (MINVALUE) TO ({partitioning._literal(plan.boundary)})', attach)
+        self.assertEqual(
+            [statement.split()[2] for statement in plan.swap if 'PARTITION OF' in statement and 'FOR VALUES' in statement],
+            ['"core_message_p203006"', '"core_message_p203007"'],
+        )
+
+    def test_indexes_and_foreign_keys_move_to_parent_before_attach(self):
+        swap = self.plan().swap
+        attach = self.position(swap, 'ATTACH PARTITION')
+        self.assertLess(self.position(swap, 'RENAME TO "core_messag_timesta_idx_legacy"'), attach)
+        self.assertLess(self.position(swap, 'CREATE INDEX "core_messag_timesta_idx" ON "core_message"'), attach)
+        self.assertLess(self.position(swap, 'ADD CONSTRAINT "core_message_sender_fk"'), attach)
+        self.assertFalse(any('core_message_pkey' in statement for statement in swap))
+
+    def test_identity_moves_from_legacy_to_parent_sequence(self):
+        swap = self.plan().swap
+        setval = swap[self.position(swap, 'setval')]
+        self.assertIn("pg_sequence_last_value('public.core_message_id_seq'::regclass)", setval)
+        self.assertLess(
+            self.position(swap, "SET DEFAULT nextval('core_message_part_id_seq'"),
+            self.position(swap, 'ALTER TABLE "core_message_legacy" ALTER COLUMN id DROP IDENTITY'),
+        )
+        self.assertLess(self.position(swap, 'DROP IDENTITY'), self.position(swap, 'ATTACH PARTITION'))
+        self.assertFalse(any('DROP SEQUENCE' in statement for statement in swap))
+
+    def test_serial_sequence_is_dropped_after_parent_default(self):
+        swap = self.plan(id_sequence=('public.core_message_id_seq', False)).swap
+        parent_default = self.position(swap, "SET DEFAULT nextval('core_message_part_id_seq'")
+        self.assertLess(parent_default, self.position(swap, 'ALTER COLUMN id DROP DEFAULT'))
+        self.assertLess(parent_default, self.position(swap, 'DROP SEQUENCE public.core_message_id_seq'))
+        self.assertFalse(any('DROP IDENTITY' in statement for statement in swap))
+
+    def test_refusals(self):
+        unique = [('core_message_body_uniq', 'CREATE UNIQUE INDEX x ON core_message USING btree (body)', False, True)]
+        with self.assertRaises(partitioning.PartitioningError):
+            self.plan(indexes=unique)
+        with self.assertRaises(partitioning.PartitioningError):
+            self.plan(now=timezone.make_aware(datetime(2030, 5, 31, 22, 0)))
+        with self.assertRaises(partitioning.PartitioningError):
+            partitioning.plan_conversion(self.spec, 2, now=self.now)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Particionisanje radi samo na PostgreSQL-u')
+class ConvertPartitionsTests(TransactionTestCase):
+    """Prava konverzija core_message - CREATE INDEX CONCURRENTLY ne sme u transakciju"""
+
+    def test_convert_keeps_rows_and_id_sequence(self):
+        now = timezone.now()
+        if partitioning.add_months(partitioning.month_start(now), 1) - now < partitioning.CONVERT_MARGIN:
+            self.skipTest('Kraj meseca - konverzija se odbija')
+        alice, bob = make_user('alice'), make_user('bob')
+        old = Message.objects.create(sender=alice, recipient=bob, body='Pre konverzije')
+
+        plan = partitioning.convert(partitioning.PARTITIONED['message'], 1)
+
+        self.assertTrue(partitioning.is_partitioned('core_message'))
+        names = [partition.name for partition in partitioning.partitions('core_message')]
+        self.assertIn('core_message_legacy', names)
+        self.assertIn(partitioning.partition_name('core_message', plan.boundary), names)
+        new = Message.objects.create(sender=bob, recipient=alice, body='Posle konverzije')
+        self.assertGreater(new.pk, old.pk)
+        self.assertEqual(set(Message.objects.values_list('pk', flat=True)), {old.pk, new.pk})
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT column_default, is_identity FROM information_schema.columns "
+                "WHERE table_name = 'core_message_legacy' AND column_name = 'id'"
+            )
+            self.assertEqual(cursor.fetchone(), (None, 'NO'))
+            cursor.execute("SELECT pg_get_serial_sequence('core_message', 'id')")
+            self.assertEqual(cursor.fetchone()[0], 'public.core_message_part_id_seq')
@@ -0,0 +1,203 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .changes import record, record_objects
+from .models import Category, ChangeLog, Offer, Trade, UserProfile, Notification
+
+
+# ============================================
+# TRADE WORKFLOW - dozvoljeni prelazi statusa
+# ============================================
+
+TRANSITIONS = {
+    'pending': {'accepted', 'rejected', 'cancelled'},
+    'accepted': {'completed', 'cancelled'},
+    'rejected': set(),
+    'cancelled': set(),
+    'completed': set(),
+}
+
+
+class TradeTransitionError(Exception):
+    """Prelaz nije dozvoljen ili je status razmene u međuvremenu promenjen"""
+
+
+def can_transition(trade, to_status):
+    return to_status in TRANSITIONS.get(trade.status, ())
+
+
+def transition(trade, to_status, notifications=(), **changes):
+    """
+    Promeni status razmene uslovnim UPDATE ... WHERE status=<trenutni>.
+    Ako je neko drugi u međuvremenu promenio status, UPDATE ne pogodi
+    nijedan red i prelaz se odbija - bez zaključavanja reda.
+    Sporedni efekti (ponude, notifikacije) idu u istu transakciju.
+    """
+    from_status = trade.status
+    if not can_transition(trade, to_status):
+        raise TradeTransitionError(
+            f'Razmena je već u statusu "{trade.get_status_display()}"!'
+        )
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Trade.objects.filter(pk=trade.pk, status=from_status).update(
+            status=to_status,
+            updated_at=now,
+            **changes
+        )
+        if not updated:
+            raise TradeTransitionError('Status razmene je u međuvremenu promenjen. Osveži stranicu.')
+
+        trade.status = to_status
+        trade.updated_at = now
+        for field, value in changes.items():
+            setattr(trade, field, value)
+        record_objects([trade])
+
+        if to_status == 'completed':
+            _apply_completion(trade, now)
+
+        if notifications:
+            record_objects(Notification.objects.bulk_create([
+                Notification(trade=trade, **notification) for notification in notifications
+            ]))
+
+    return trade
+
+
+def _apply_completion(trade, now):
+    """Deaktiviraj obe ponude, otkaži konkurentne zahteve i uvećaj broj završenih razmena"""
+    offer_ids = [pk for pk in (trade.offer1_id, trade.offer2_id) if pk]
+    # update() zaobilazi Offer.save() - brojače kategorija umanjujemo za zaključane, zaista deaktivirane ponude
+    deactivated = list(
+        Offer.objects.select_for_update().filter(pk__in=offer_ids, is_active=True)
+        .values_list('pk', 'category_id', 'owner_id')
+    )
+    Offer.objects.filter(pk__in=[row[0] for row in deactivated]).update(is_active=False, updated_at=now)
+    record(ChangeLog.OFFER, [(pk, owner_id) for pk, _, owner_id in deactivated])
+    Category.adjust_active_counts({
+        category_id: -count for category_id, count in Counter(row[1] for row in deactivated).items()
+    })
+    cancel_competing_trades(offer_ids, exclude_trade=trade, now=now)
+    UserProfile.objects.filter(user_id__in=[trade.user1_id, trade.user2_id]).update(
+        trades_completed=F('trades_completed') + 1
+    )
+
+
+def cancel_competing_trades(offer_ids, exclude_trade=None, now=None):
+    """
+    Otkaži sve zahteve na čekanju koji uključuju neaktivne ponude - jednim UPDATE-om.
+    Redovi na čekanju se prvo zaključaju (select_for_update), pa UPDATE i
+    notifikacije idu tačno za te id-jeve - ni ponovljen poziv sa istim `now`
+    ni drugi upis ne mogu da budu pogrešno prepoznati kao otkazani ovde.
+    Vraća broj otkazanih razmena.
+    """
+    if not offer_ids:
+        return 0
+
+    now = now or timezone.now()
+    touches_offers = Q(offer1_id__in=offer_ids) | Q(offer2_id__in=offer_ids)
+    competing = Trade.objects.filter(touches_offers, status='pending')
+    if exclude_trade is not None:
+        competing = competing.exclude(pk=exclude_trade.pk)
+
+    skip_users = set()
+    if exclude_trade is not None:
+        skip_users = {exclude_trade.user1_id, exclude_trade.user2_id}
+
+    with transaction.atomic():
+        affected = list(competing.select_for_update().order_by('pk').values_list('pk', 'user1_id', 'user2_id'))
+        if not affected:
+            return 0
+        cancelled = Trade.objects.filter(pk__in=[row[0] for row in affected]).update(
+            status='cancelled', updated_at=now
+        )
+
+        record(ChangeLog.TRADE, affected)
+        notifications = []
+        for trade_id, user1_id, user2_id in affected:
+            for user_id in (user1_id, user2_id):
+                if user_id in skip_users:
+                    continue
+                notifications.append(Notification(
+                    recipient_id=user_id,
+                    trade_id=trade_id,
+                    notification_type='trade',
+                    title='Razmena otkazana',
+                    message='Ponuda iz ove razmene više nije dostupna - zahtev je automatski otkazan.',
+                ))
+        record_objects(Notification.objects.bulk_create(notifications, batch_size=500))
+    return cancelled
+
+
+# ==================== AKCIJE ====================
+
+def accept(trade, offer1=None):
+    """user2 prihvata razmenu - opciono sa odabranom ponudom od user1"""
+    changes = {}
+    if offer1 is not None:
+        changes['offer1'] = offer1
+        message = f'{trade.user2.username} je prihvatio vašu razmenu sa artiklom "{offer1.title}"!'
+    else:
+        message = f'{trade.user2.username} je prihvatio vašu razmenu!'
+
+    return transition(trade, 'accepted', notifications=[{
+        'recipient': trade.user1,
+        'actor': trade.user2,
+        'title': 'Razmena prihvaćena!',
+        'message': message,
+        'notification_type': 'trade_accepted',
+    }], **changes)
+
+
+def accept_buy(trade):
+    """user2 prihvata otkup - bez zamene za drugu ponudu"""
+    if not trade.wants_to_buy:
+        raise TradeTransitionError('Opcija za otkup nije dostupna!')
+
+    return transition(trade, 'accepted', offer1=None, notifications=[{
+        'recipient': trade.user1,
+        'actor': trade.user2,
+        'title': 'Otkup prihvaćen!',
+        'message': f'{trade.user2.username} je prihvatio vašu ponudu za otkup od {trade.purchase_price} дин.!',
+        'notification_type': 'trade_accepted',
+    }])
+
+
+def reject(trade):
+    """user2 odbija zahtev"""
+    return transition(trade, 'rejected', notifications=[{
+        'recipient': trade.user1,
+        'actor': trade.user2,
+        'title': 'Razmena odbijena',
+        'message': f'{trade.user2.username} je odbio vašu razmenu.',
+        'notification_type': 'trade_rejected',
+    }])
+
+
+def cancel(trade, actor):
+    """Jedna od strana povlači zahtev"""
+    other_user = trade.user2 if actor == trade.user1 else trade.user1
+    return transition(trade, 'cancelled', notifications=[{
+        'recipient': other_user,
+        'actor': actor,
+        'title': 'Razmena otkazana',
+        'message': f'{actor.username} je otkazao razmenu.',
+        'notification_type': 'trade',
+    }])
+
+
+def complete(trade, actor):
+    """Završi razmenu - deaktivira ponude u istoj transakciji"""
+    other_user = trade.user1 if actor == trade.user2 else trade.user2
+    return transition(trade, 'completed', notifications=[{
+        'recipient': other_user,
+        'actor': actor,
+        'title': 'Razmena završena!',
+        'message': f'{actor.username} je završio razmenu.',
+        'notification_type': 'trade',
+    }])
@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'core'
 
+# Pod ASGI serverom read-heavy API ide kroz async verzije (core/async_views.py)
+if settings.ASYNC_API_VIEWS:
+    from . import async_views as api_views
+else:
+    api_views = views
+
 urlpatterns = [
     # Home
     path('', views.home, name='home'),
@@ -13,7 +20,14 @@ urlpatterns = [
     path('offers/create/', views.offer_create, name='offer_create'),
     path('offers/<int:pk>/edit/', views.offer_edit, name='offer_edit'),
     path('offers/<int:pk>/delete/', views.offer_delete, name='offer_delete'),
+    path('offers/<int:pk>/renew/', views.renew_offer, name='renew_offer'),
     path('my-offers/', views.my_offers, name='my_offers'),
+    path('my-offers/stats/', views.offer_dashboard, name='offer_dashboard'),
+    path('offers/import/', views.offer_import, name='offer_import'),
+    path('offers/export/', views.offer_export, name='offer_export'),
+
+    # Favorites
+    path('favorites/', views.favorites_view, name='favorites'),
 
     # Profile
     path('profile/', views.profile_view, name='profile'),
@@ -22,6 +36,8 @@ urlpatterns = [
     # Messages
     path('messages/', views.my_messages, name='my_messages'),
     path('messages/<str:username>/', views.view_conversation, name='view_conversation'),
+    path('messages/<str:username>/older/', views.conversation_older, name='conversation_older'),
+    path('messages/<str:username>/newer/', views.conversation_newer, name='conversation_newer'),
     path('send-message/<str:username>/', views.send_message, name='send_message'),
 
     # Trades
@@ -51,13 +67,20 @@ urlpatterns = [
     path('oauth/google/', views.google_oauth_redirect, name='google_oauth_redirect'),
 
     # API Endpoints
-    path('api/unread-count/', views.get_unread_count, name='get_unread_count'),
+    path('api/unread-count/', api_views.get_unread_count, name='get_unread_count'),
     path('api/offer/<int:pk>/stats/', views.get_offer_stats, name='get_offer_stats'),
     path('api/user/<str:username>/stats/', views.get_user_stats, name='get_user_stats'),
     path('api/categories/', views.get_categories, name='get_categories'),
-    path('api/search-offers/', views.search_offers, name='search_offers'),
-    path('api/messages/', views.get_messages_list, name='get_messages_list'),
+    path('api/search-offers/', api_views.search_offers, name='search_offers'),
+    path('api/messages/', api_views.get_messages_list, name='get_messages_list'),
     path('api/trades/', views.get_trades_list, name='get_trades_list'),
-    path('api/offer/<int:pk>/detail/', views.get_offer_detail_api, name='get_offer_detail_api'),
+    path('api/trades/inbox/', views.get_trades_inbox, name='get_trades_inbox'),
+    path('api/sync/', views.sync_changes, name='sync_changes'),
+    path('api/offer/<int:pk>/detail/', api_views.get_offer_detail_api, name='get_offer_detail_api'),
+    path('api/offer/<int:pk>/like/', views.like_offer, name='like_offer'),
+    path('api/offer/<int:pk>/unlike/', views.unlike_offer, name='unlike_offer'),
     path('api/user/<str:username>/detail/', views.get_user_detail_api, name='get_user_detail_api'),
+    path('api/offers/batch/', views.get_offers_batch, name='get_offers_batch'),
+    path('api/offers/stats/batch/', views.get_offer_stats_batch, name='get_offer_stats_batch'),
+    path('api/users/stats/batch/', views.get_user_stats_batch, name='get_user_stats_batch'),
 ]
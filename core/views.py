@@ -4,46 +4,117 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
-from django.db.models import Q, Avg
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.db.models import Q, Avg, BooleanField, Count, DateTimeField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Concat
 from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from datetime import datetime
 import json
-import logging
 
-from .models import Category, Offer, Message, Trade, UserProfile, Review, Notification
+from .models import (
+    PATH_END, ArchivedOffer, Category, Favorite, Offer, OfferEvent, OfferStatBucket, Message, Trade, UserProfile, Review,
+    Notification,
+)
 from .forms import RegistrationForm
+from .bulk import IMPORT_FORMATS, detect_format, import_offers, open_upload
+from .exports import CONTENT_TYPES, offer_export_rows, streaming_export_response
+from . import analytics, changes, favorites, lifecycle, trade_workflow
+from .lifecycle import OfferLifecycleError
+from .trade_workflow import TradeTransitionError
+from .conditional import conditional_api, make_etag
+from .expressions import SubqueryCount, subquery_latest
+from .serializers import MESSAGE, OFFER_CARD, TRADE, json_response, streaming_json_response
+from .cache import model_namespace, tiered_cache
+from .cities import city_key
+from .pricing import parse_amount
+
+CATEGORIES_CACHE_TIMEOUT = 60 * 60
+
+
+def _all_categories():
+    """Sve kategorije iz keša - poništava se na promenu kategorije (CoreConfig.ready)"""
+    return tiered_cache.get_or_set(
+        tiered_cache.key(model_namespace(Category), 'all'),
+        lambda: list(Category.objects.all()),
+        CATEGORIES_CACHE_TIMEOUT,
+    )
 
-logger = logging.getLogger('allauth')
 
-# ✅ SETUP ALLAUTH LOGGING - ISPRAVNO
-def setup_allauth_logging():
-    """Setup allauth OAuth2 debugging"""
-    from allauth.socialaccount.providers.oauth2 import views as oauth2_views
+def _filter_by_category(offers, category_id):
+    """
+    Ponude iz kategorije i svih njenih potkategorija - range nad indeksom Category.path.
+    Ostaje lazy queryset (putanja je podupit), pa ga koristi i async pretraga.
+    """
+    if not str(category_id).isdigit():
+        return offers.none()
+    path = Category.objects.filter(pk=category_id).order_by().values('path')[:1]
+    return offers.filter(
+        category__path__gte=Subquery(path),
+        category__path__lt=Concat(Subquery(path), Value(PATH_END)),
+    )
 
-    original_dispatch = oauth2_views.OAuth2Adapter.complete_login
 
-    def debug_complete_login(self, request, app, **kwargs):
-        logger.debug(f"🔵 ALLAUTH complete_login START")
-        logger.debug(f"🔵 App: {app}")
-        try:
-            result = original_dispatch(self, request, app, **kwargs)
-            logger.debug(f"🟢 ALLAUTH complete_login SUCCESS")
-            return result
-        except Exception as e:
-            logger.error(f"🔴 ALLAUTH ERROR: {str(e)}", exc_info=True)
-            raise
+def _filter_by_city(offers, city):
+    """Tačno poklapanje preko aliasa (unique indeks) i Offer.city_ref - bez icontains skeniranja"""
+    key = city_key(city)
+    if not key:
+        return offers
+    return offers.filter(city_ref__aliases__alias=key)
+
+
+def _city_facets(offers, limit=10):
+    """Broj ponuda po gradu za trenutne filtere - queryset rečnika (sync i async evaluacija)"""
+    return (
+        offers.filter(city_ref__isnull=False).order_by()
+        .values(city_id=F('city_ref_id'), name=F('city_ref__name'))
+        .annotate(count=Count('id'))
+        .order_by('-count', 'name')[:limit]
+    )
+
+
+OFFER_SORTS = {
+    'newest': ('-created_at',),
+    # Sortiranje po ceni prikazuje samo ponude sa cenom - čita se redom iz offer_active_price_idx
+    'price_asc': ('price_min', 'id'),
+    'price_desc': ('-price_min', '-id'),
+    # Unapred izračunat skor (core/ranking.py) - čita se redom iz offer_active_popular_idx
+    'popular': ('-popularity_score', '-id'),
+}
+PRICE_SORTS = {'price_asc', 'price_desc'}
+TRENDING_SIZE = 6
+
 
-    oauth2_views.OAuth2Adapter.complete_login = debug_complete_login
+def _filter_by_price(offers, params):
+    """price_min/price_max iz GET-a (RSD) nad navedenom (početnom) cenom - jedan opseg nad indeksom"""
+    low, high = parse_amount(params.get('price_min')), parse_amount(params.get('price_max'))
+    if low is not None:
+        offers = offers.filter(price_min__gte=low)
+    if high is not None:
+        offers = offers.filter(price_min__lte=high)
+    return offers
+
+
+def _sort_offers(offers, sort):
+    if sort not in OFFER_SORTS:
+        sort = 'newest'
+    if sort in PRICE_SORTS:
+        offers = offers.filter(price_min__isnull=False)
+    return offers.order_by(*OFFER_SORTS[sort])
 
-# Pozovi na startup
-setup_allauth_logging()
 
 # ==================== HOME ====================
 
 def home(request):
     """Početna stranica"""
-    active_offers = Offer.objects.filter(is_active=True).order_by('-created_at')[:6]
-    categories = Category.objects.all()
+    active_offers = Offer.objects.filter(is_active=True).select_related('category').order_by('-created_at')[:6]
+    trending_offers = (
+        Offer.objects.filter(is_active=True).select_related('category')
+        .order_by(*OFFER_SORTS['popular'])[:TRENDING_SIZE]
+    )
+    categories = [category for category in _all_categories() if category.parent_id is None]
 
     unread_count = 0
 
@@ -55,6 +126,7 @@ def home(request):
 
     context = {
         'active_offers': active_offers,
+        'trending_offers': trending_offers,
         'categories': categories,
         'unread_count': unread_count,
         'show_messages': True,
@@ -67,7 +139,7 @@ def home(request):
 def offer_list(request):
     """Lista svih ponuda sa pretragom i filteriranjem"""
     offers = Offer.objects.filter(is_active=True).order_by('-created_at')
-    categories = Category.objects.all()
+    categories = _all_categories()
 
     query = request.GET.get('q', '')
     if query:
@@ -78,23 +150,38 @@ def offer_list(request):
 
     category_id = request.GET.get('category', '')
     if category_id:
-        offers = offers.filter(category_id=category_id)
+        offers = _filter_by_category(offers, category_id)
+
+    city = request.GET.get('city', '').strip()
+    if city:
+        offers = _filter_by_city(offers, city)
 
     # ✅ NOVI KOD - FILTER PO KORISNIKU
     user = request.GET.get('user', '')
     if user:
         offers = offers.filter(owner__username=user)
 
+    offers = _sort_offers(_filter_by_price(offers, request.GET), request.GET.get('sort', ''))
+
     paginator = Paginator(offers, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    # Filteri za linkove paginacije
+    filter_query = request.GET.copy()
+    filter_query.pop('page', None)
+
     context = {
         'page_obj': page_obj,
         'offers': page_obj.object_list,
         'categories': categories,
         'query': query,
         'selected_category': category_id,
+        'city': city,
+        'price_min': request.GET.get('price_min', ''),
+        'price_max': request.GET.get('price_max', ''),
+        'sort': request.GET.get('sort', 'newest'),
+        'filter_query': filter_query.urlencode(),
         'show_messages': False,
     }
     return render(request, 'core/offer_list.html', context)
@@ -104,15 +191,21 @@ def offer_detail(request, pk):
     """Detalj ponude"""
     offer = get_object_or_404(Offer, pk=pk)
 
+    # Pregled je INSERT u dnevnik; views_count sabira rollup_offer_stats
     if request.user != offer.owner:
-        offer.views_count += 1
-        offer.save()
+        analytics.record_event(offer, OfferEvent.VIEW)
 
     reviews = offer.reviews.all().order_by('-created_at')
+    is_favorite = (
+        request.user.is_authenticated
+        and Favorite.objects.filter(user=request.user, offer=offer).exists()
+    )
 
     context = {
         'offer': offer,
         'reviews': reviews,
+        'is_favorite': is_favorite,
+        'likes_count': favorites.current_likes(offer),
         'show_messages': True,
     }
     return render(request, 'core/offer_detail.html', context)
@@ -121,7 +214,7 @@ def offer_detail(request, pk):
 @login_required(login_url='core:login')
 def offer_create(request):
     """Kreiraj novu ponudu"""
-    categories = Category.objects.all()
+    categories = _all_categories()
 
     if request.method == 'POST':
         title = request.POST.get('title', '').strip()
@@ -173,7 +266,7 @@ def offer_edit(request, pk):
         messages.error(request, 'Nemaš pristup ovoj ponudi!')
         return redirect('core:home')
 
-    categories = Category.objects.all()
+    categories = _all_categories()
 
     if request.method == 'POST':
         title = request.POST.get('title', '').strip()
@@ -236,10 +329,10 @@ def offer_delete(request, pk):
 
 @login_required(login_url='core:login')
 def my_offers(request):
-    """Moje ponude"""
-    offers = Offer.objects.filter(owner=request.user).order_by('-created_at')
+    """Moje ponude - aktivne, istekle i arhivirane u jednoj listi"""
+    history = _owner_offer_history(request.user)
 
-    paginator = Paginator(offers, 12)
+    paginator = Paginator(history, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -251,6 +344,175 @@ def my_offers(request):
     return render(request, 'core/my_offers.html', context)
 
 
+# Kolone istorije vlasnika - iste u obe tabele da bi UNION ALL bio jedan upit sa paginacijom
+OFFER_HISTORY_FIELDS = (
+    'offer_id', 'title', 'category_name', 'city', 'views_count', 'created_at',
+    'active', 'expires', 'expired', 'archived',
+)
+
+
+def _owner_offer_history(user):
+    """Ponude vlasnika iz core_offer i arhive, najnovije prve (svaka strana čita svoj owner/created_at indeks)"""
+    hot = Offer.objects.filter(owner=user).annotate(
+        offer_id=F('id'),
+        category_name=F('category__name'),
+        active=F('is_active'),
+        expires=F('expires_at'),
+        expired=F('expired_at'),
+        archived=Value(False, output_field=BooleanField()),
+    )
+    archived = ArchivedOffer.objects.filter(owner=user).annotate(
+        offer_id=F('original_id'),
+        category_name=F('category__name'),
+        active=Value(False, output_field=BooleanField()),
+        expires=Value(None, output_field=DateTimeField()),
+        expired=F('deactivated_at'),
+        archived=Value(True, output_field=BooleanField()),
+    )
+    return (
+        hot.order_by().values(*OFFER_HISTORY_FIELDS)
+        .union(archived.order_by().values(*OFFER_HISTORY_FIELDS), all=True)
+        .order_by('-created_at', '-offer_id')
+    )
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["POST"])
+def renew_offer(request, pk):
+    """Produži rok ponude ili ponovo objavi isteklu"""
+    offer = get_object_or_404(Offer, pk=pk, owner=request.user)
+    try:
+        lifecycle.renew(offer)
+    except OfferLifecycleError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f'Ponuda je obnovljena do {timezone.localtime(offer.expires_at):%d.%m.%Y.}')
+    return redirect('core:my_offers')
+
+
+@login_required(login_url='core:login')
+def offer_import(request):
+    """Masovni uvoz ponuda iz CSV/JSONL fajla"""
+    result = None
+
+    if request.method == 'POST':
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            messages.error(request, 'Odaberi fajl za uvoz!')
+            return redirect('core:offer_import')
+
+        fmt = request.POST.get('format') or detect_format(uploaded_file.name)
+        if fmt not in IMPORT_FORMATS:
+            messages.error(request, 'Nepodržan format fajla!')
+            return redirect('core:offer_import')
+
+        result = import_offers(
+            open_upload(uploaded_file),
+            owner=request.user,
+            fmt=fmt,
+            dry_run=bool(request.POST.get('dry_run')),
+        )
+
+        if result.created:
+            messages.success(request, f'Uvezeno ponuda: {result.created}')
+        if result.error_count:
+            messages.warning(request, f'Redova sa greškom: {result.error_count}')
+
+    context = {
+        'result': result,
+        'formats': IMPORT_FORMATS,
+        'show_messages': True,
+    }
+    return render(request, 'core/offer_import.html', context)
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+def offer_export(request):
+    """Streaming izvoz mojih ponuda (CSV/JSONL)"""
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in CONTENT_TYPES:
+        fmt = 'csv'
+
+    header, rows = offer_export_rows(Offer.objects.filter(owner=request.user))
+    return streaming_export_response(header, rows, fmt, f'ponude-{request.user.username}.{fmt}')
+
+
+@login_required(login_url='core:login')
+def offer_dashboard(request):
+    """Statistika mojih ponuda - grafikoni čitaju samo satne/dnevne zbirove"""
+    days = analytics.day_starts(30)
+    hours = analytics.hour_starts(48)
+
+    daily = analytics.fill_series(
+        analytics.owner_series(request.user, OfferStatBucket.DAY, days[0]), days
+    )
+    hourly = analytics.fill_series(
+        analytics.owner_series(request.user, OfferStatBucket.HOUR, hours[0]), hours
+    )
+    totals = request.user.offers.order_by().aggregate(
+        offers=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        views=Sum('views_count'),
+        likes=Sum('likes_count'),
+    )
+
+    context = {
+        'daily': daily,
+        'hourly': hourly,
+        'top_offers': analytics.owner_top_offers(request.user, days[0]),
+        'totals': totals,
+        'views_30d': sum(point['views'] for point in daily),
+        'contacts_30d': sum(point['contacts'] for point in daily),
+        'show_messages': True,
+    }
+    return render(request, 'core/offer_dashboard.html', context)
+
+
+# ==================== FAVORITES ====================
+
+@login_required(login_url='core:login')
+def favorites_view(request):
+    """Moje omiljene ponude"""
+    saved = Favorite.objects.filter(user=request.user).select_related('offer__category').order_by('-created_at')
+
+    paginator = Paginator(saved, 12)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+
+    context = {
+        'page_obj': page_obj,
+        'offers': [favorite.offer for favorite in page_obj.object_list],
+        'show_messages': True,
+    }
+    return render(request, 'core/favorites.html', context)
+
+
+def _favorite_response(offer, changed, liked):
+    return json_response({
+        'liked': liked,
+        'changed': changed,
+        'likes_count': favorites.current_likes(offer),
+        'success': True,
+    })
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["POST"])
+def like_offer(request, pk):
+    """API endpoint - sačuvaj ponudu u omiljene (ponovljen zahtev ne menja ništa)"""
+    offer = get_object_or_404(Offer.objects.only('pk', 'likes_count'), pk=pk, is_active=True)
+    return _favorite_response(offer, favorites.like(request.user, offer), liked=True)
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["POST"])
+def unlike_offer(request, pk):
+    """API endpoint - ukloni ponudu iz omiljenih"""
+    offer = get_object_or_404(Offer.objects.only('pk', 'likes_count'), pk=pk)
+    return _favorite_response(offer, favorites.unlike(request.user, offer), liked=False)
+
+
 # ==================== PROFILE ====================
 
 @login_required(login_url='core:login')
@@ -261,9 +523,13 @@ def profile_view(request):
     # ✅ DOBIJ RECENZIJE KOJE JE OVAJ KORISNIK PRIMIO
     reviews = Review.objects.filter(reviewed_user=request.user).order_by('-created_at')
 
-    # Izračunaj statistike
-    active_offers = user_offers.filter(is_active=True).count()
-    total_views = sum(offer.views_count for offer in user_offers)
+    # Izračunaj statistike - jedan agregat u bazi umesto učitavanja svih ponuda
+    totals = user_offers.order_by().aggregate(
+        active=Count('id', filter=Q(is_active=True)),
+        views=Sum('views_count'),
+    )
+    active_offers = totals['active']
+    total_views = totals['views'] or 0
     avg_rating = reviews.aggregate(avg=Avg('rating'))['avg'] if reviews else 0
 
     context = {
@@ -366,6 +632,13 @@ def send_message(request, username):
             body=body,
         )
 
+        # Poruka poslata sa stranice ponude (?offer=<pk>) je kontakt za tu ponudu
+        offer_id = request.GET.get('offer', '')
+        if offer_id.isdigit():
+            offer = Offer.objects.filter(pk=offer_id, owner=recipient).only('pk').first()
+            if offer is not None:
+                analytics.record_event(offer, OfferEvent.CONTACT)
+
         messages.success(request, 'Poruka je poslata!')
         return redirect('core:my_messages')
 
@@ -376,60 +649,160 @@ def send_message(request, username):
     return render(request, 'core/send_message.html', context)
 
 
+CONVERSATION_WINDOW = 30
+CONVERSATION_FIELDS = ('sender_id', 'body', 'timestamp', 'is_read')
+
+
+def _conversation_window(user, other_user, cursor=None, limit=CONVERSATION_WINDOW):
+    """
+    Najnovijih `limit` poruka pre kursora, hronološkim redom, i kursor za
+    starije (None kad ih nema). Keyset po (timestamp, id) - message_pair_time_idx.
+    """
+    window = _conversation_queryset(user, other_user).only(*CONVERSATION_FIELDS)
+    if cursor is not None:
+        timestamp, pk = cursor
+        window = window.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, pk__lt=pk))
+    page = list(window.order_by('-timestamp', '-pk')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    older_cursor = _encode_keyset_cursor(page[-1].timestamp, page[-1].pk) if has_more else None
+    page.reverse()
+    return page, older_cursor
+
+
+def _settled_last_id(messages_list, after):
+    """
+    Id do kog je polling siguran: poslednja poruka pre prve "sveže" (SYNC_SETTLE_SECONDS).
+    Sveže poruke se prikazuju odmah, ali ih sledeći poll vraća ponovo - dok se ne smire,
+    poruka sa manjim id-jem iz transakcije koja još nije potvrđena ne može biti preskočena.
+    """
+    horizon = changes.settle_horizon()
+    for message in sorted(messages_list, key=lambda message: message.pk):
+        if message.timestamp >= horizon:
+            return after, True
+        after = message.pk
+    return after, False
+
+
+def _render_messages(request, messages_list):
+    return ''.join(
+        render_to_string('core/partials/message.html', {'message': message, 'user': request.user})
+        for message in messages_list
+    )
+
+
+def _mark_conversation_read(user, other_user, ids=None):
+    """Primljene poruke su pročitane - pošiljalac to vidi kroz sync"""
+    unread = Message.objects.filter(sender=other_user, recipient=user, is_read=False)
+    if ids is not None:
+        unread = unread.filter(pk__in=ids)
+    changes.update_and_record(unread, is_read=True)
+
+
 @login_required(login_url='core:login')
 def view_conversation(request, username):
-    """Pregled razgovora sa korisnikom"""
+    """Razgovor sa korisnikom - prikazuje se samo najnoviji prozor poruka, starije se učitavaju skrolom"""
     other_user = get_object_or_404(User, username=username)
 
-    # HANDLE POST - Kreiraj novu poruku
+    # HANDLE POST - Kreiraj novu poruku; AJAX slanje dobija samo fragment nove poruke
     if request.method == 'POST':
         body = request.POST.get('body', '').strip()
+        is_fragment = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
         if body:
-            Message.objects.create(
+            message = Message.objects.create(
                 sender=request.user,
                 recipient=other_user,
                 subject='',
                 body=body,
             )
+            if is_fragment:
+                return HttpResponse(_render_messages(request, [message]), status=201)
             messages.success(request, 'Poruka je poslata!')
         else:
+            if is_fragment:
+                return JsonResponse({'success': False, 'error': 'Poruka ne može biti prazna!'}, status=400)
             messages.error(request, 'Poruka ne može biti prazna!')
 
         return redirect('core:view_conversation', username=username)
 
-    # GET - Prikaži sve poruke
-    messages_list = Message.objects.filter(
-        Q(sender=request.user, recipient=other_user) |
-        Q(sender=other_user, recipient=request.user)
-    ).order_by('timestamp')
-
-    # Označi sve primljene poruke kao pročitane
-    Message.objects.filter(
-        sender=other_user,
-        recipient=request.user,
-        is_read=False
-    ).update(is_read=True)
+    # GET - najnoviji prozor
+    messages_list, older_cursor = _conversation_window(request.user, other_user)
+    _mark_conversation_read(request.user, other_user)
+    # Polling kreće od poslednje "smirene" poruke prozora; sveže će vratiti ponovo (prikaz ih preskače)
+    last_id, _ = _settled_last_id(messages_list, min((message.pk for message in messages_list), default=1) - 1)
 
     context = {
         'other_user': other_user,
         'messages': messages_list,
+        'older_cursor': older_cursor,
+        'last_id': last_id,
         'show_messages': True,
     }
     return render(request, 'core/conversation.html', context)
 
 
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+def conversation_older(request, username):
+    """Starije poruke pre ?cursor= (skrol na vrh) - HTML fragment i kursor za sledeći prozor"""
+    other_user = get_object_or_404(User, username=username)
+    cursor = _decode_keyset_cursor(request.GET.get('cursor', ''))
+    if cursor is None:
+        return JsonResponse({'success': False, 'error': 'Neispravan cursor'}, status=400)
+
+    messages_list, older_cursor = _conversation_window(request.user, other_user, cursor)
+    return json_response({
+        'html': _render_messages(request, messages_list),
+        'older_cursor': older_cursor,
+        'success': True,
+    })
+
+
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+def conversation_newer(request, username):
+    """Poruke posle ?after=<id> (polling otvorenog razgovora) - range po pk, bez ponovnog čitanja prozora"""
+    other_user = get_object_or_404(User, username=username)
+    after = request.GET.get('after', '')
+    if not after.isdigit():
+        return JsonResponse({'success': False, 'error': 'Nedostaje after'}, status=400)
+
+    messages_list = list(
+        _conversation_queryset(request.user, other_user).only(*CONVERSATION_FIELDS)
+        .filter(pk__gt=after).order_by('pk')[:CONVERSATION_WINDOW + 1]
+    )
+    has_more = len(messages_list) > CONVERSATION_WINDOW
+    messages_list = messages_list[:CONVERSATION_WINDOW]
+    last_id, unsettled = _settled_last_id(messages_list, int(after))
+
+    received = [message.pk for message in messages_list if message.sender_id == other_user.pk and not message.is_read]
+    if received:
+        _mark_conversation_read(request.user, other_user, received)
+
+    return json_response({
+        'html': _render_messages(request, messages_list),
+        'last_id': last_id,
+        'has_more': has_more and not unsettled,
+        'success': True,
+    })
+
+
 # ==================== TRADES ====================
 
 @login_required(login_url='core:login')
 def my_trades(request):
     """Moje razmene"""
-    sent_trades = Trade.objects.filter(user1=request.user).order_by('-created_at')
-    received_trades = Trade.objects.filter(user2=request.user).order_by('-created_at')
+    trades = Trade.objects.select_related('offer1', 'offer2', 'user1', 'user2').order_by('-created_at')
+
+    sent_page = Paginator(trades.filter(user1=request.user), 12).get_page(request.GET.get('sent_page'))
+    received_page = Paginator(trades.filter(user2=request.user), 12).get_page(request.GET.get('received_page'))
 
     context = {
-        'sent_trades': sent_trades,
-        'received_trades': received_trades,
+        'sent_trades': sent_page.object_list,
+        'received_trades': received_page.object_list,
+        'sent_page_obj': sent_page,
+        'received_page_obj': received_page,
         'show_messages': True,
     }
     return render(request, 'core/trades.html', context)
@@ -458,6 +831,8 @@ def create_trade(request, offer_id):
         else:
             full_message = base_message
 
+        analytics.record_event(offer2, OfferEvent.CONTACT)
+
         # ✅ KREIRAJ TRADE BEZ IZBORA PONUDE
         trade = Trade.objects.create(
             offer1=None,
@@ -524,19 +899,11 @@ def accept_trade_with_offer(request, pk, offer_id):
 
     if request.method == 'POST':
         # ✅ POSTAVI odabranu ponudu kao offer1
-        trade.offer1 = selected_offer
-        trade.status = 'accepted'
-        trade.save()
-
-        # Kreiraj notifikaciju
-        Notification.objects.create(
-            recipient=trade.user1,
-            actor=trade.user2,
-            title='Razmena prihvaćena!',
-            message=f'{trade.user2.username} je prihvatio vašu razmenu sa artiklom "{selected_offer.title}"!',
-            notification_type='trade_accepted',
-            trade=trade,
-        )
+        try:
+            trade_workflow.accept(trade, offer1=selected_offer)
+        except TradeTransitionError as e:
+            messages.error(request, str(e))
+            return redirect('core:trade_detail', pk=pk)
 
         messages.success(request, 'Razmena je prihvaćena!')
         return redirect('core:my_trades')
@@ -563,20 +930,12 @@ def accept_trade_buy(request, pk):
         return redirect('core:trade_detail', pk=pk)
 
     if request.method == 'POST':
-        # ✅ POSTAVI offer1 na None (otkup bez zamjene)
-        trade.offer1 = None
-        trade.status = 'accepted'
-        trade.save()
-
-        # Kreiraj notifikaciju
-        Notification.objects.create(
-            recipient=trade.user1,
-            actor=trade.user2,
-            title='Otkup prihvaćen!',
-            message=f'{trade.user2.username} je prihvatio vašu ponudu za otkup od {trade.purchase_price} дин.!',
-            notification_type='trade_accepted',
-            trade=trade,
-        )
+        # ✅ offer1 ide na None (otkup bez zamjene)
+        try:
+            trade_workflow.accept_buy(trade)
+        except TradeTransitionError as e:
+            messages.error(request, str(e))
+            return redirect('core:trade_detail', pk=pk)
 
         messages.success(request, 'Otkup je prihvaćen!')
         return redirect('core:my_trades')
@@ -599,16 +958,11 @@ def accept_trade(request, pk):
         return redirect('core:my_trades')
 
     if request.method == 'POST':
-        trade.status = 'accepted'
-        trade.save()
-
-        # ✅ KREIRAJ NOTIFIKACIJU ZA RAZMENU
-        Notification.objects.create(
-            recipient=trade.user1,
-            title='Razmena prihvaćena!',
-            message=f'{trade.user2.username} je prihvatio vašu razmenu!',
-            notification_type='trade',
-        )
+        try:
+            trade_workflow.accept(trade)
+        except TradeTransitionError as e:
+            messages.error(request, str(e))
+            return redirect('core:my_trades')
 
         messages.success(request, 'Razmena je prihvaćena!')
         return redirect('core:my_trades')
@@ -630,16 +984,11 @@ def reject_trade(request, pk):
         return redirect('core:my_trades')
 
     if request.method == 'POST':
-        trade.status = 'rejected'
-        trade.save()
-
-        # ✅ KREIRAJ NOTIFIKACIJU ZA RAZMENU
-        Notification.objects.create(
-            recipient=trade.user1,
-            title='Razmena odbijena',
-            message=f'{trade.user2.username} je odbio vašu razmenu.',
-            notification_type='trade',
-        )
+        try:
+            trade_workflow.reject(trade)
+        except TradeTransitionError as e:
+            messages.error(request, str(e))
+            return redirect('core:my_trades')
 
         messages.success(request, 'Razmena je odbijena!')
         return redirect('core:my_trades')
@@ -661,25 +1010,12 @@ def complete_trade(request, pk):
         return redirect('core:my_trades')
 
     if request.method == 'POST':
-        trade.status = 'completed'
-        trade.save()
-
-        if trade.offer1:
-            trade.offer1.is_active = False
-            trade.offer1.save()
-
-        trade.offer2.is_active = False
-        trade.offer2.save()
-
-        other_user = trade.user1 if request.user == trade.user2 else trade.user2
-
-        # ✅ KREIRAJ NOTIFIKACIJU ZA RAZMENU
-        Notification.objects.create(
-            recipient=other_user,
-            title='Razmena završena!',
-            message=f'{request.user.username} je završio razmenu.',
-            notification_type='trade',
-        )
+        # ✅ Status, ponude i notifikacija u jednoj transakciji
+        try:
+            trade_workflow.complete(trade, actor=request.user)
+        except TradeTransitionError as e:
+            messages.error(request, str(e))
+            return redirect('core:my_trades')
 
         messages.success(request, 'Razmena je završena! Sada možeš da napišeš recenziju.')
         return redirect('core:my_trades')
@@ -757,7 +1093,7 @@ def notifications_view(request):
     notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
 
     if request.GET.get('mark_all_read'):
-        notifications.filter(is_read=False).update(is_read=True)
+        changes.update_and_record(notifications.filter(is_read=False), is_read=True)
         messages.success(request, 'Sve notifikacije su označene kao pročitane!')
         return redirect('core:notifications')
 
@@ -848,6 +1184,164 @@ def register(request):
 
 # ==================== API ENDPOINTS ====================
 
+# ---- Validatori za conditional GET: jedan jeftin upit, bez pravljenja payload-a ----
+
+def _latest(*values):
+    values = [value for value in values if value]
+    return max(values) if values else None
+
+
+def _offer_stats_validators(request, pk):
+    offer_trades = Trade.objects.filter(Q(offer1=OuterRef('pk')) | Q(offer2=OuterRef('pk')))
+    row = Offer.objects.filter(pk=pk).annotate(
+        trades_count=SubqueryCount(offer_trades),
+        trades_modified=subquery_latest(offer_trades, 'updated_at'),
+    ).values_list('updated_at', 'views_count', 'trades_count', 'trades_modified').first()
+    if row is None:
+        return None, None
+    # Bez Last-Modified: views_count se menja bez updated_at, samo ETag prati ceo payload
+    updated_at, views_count, trades_count, trades_modified = row
+    return make_etag('offer-stats', pk, views_count, trades_count, updated_at, trades_modified), None
+
+
+def _user_stats_row(username):
+    """Brojači i poslednje izmene korisnika - osnova za ETag statistike i detalja"""
+    user_offers = Offer.objects.filter(owner=OuterRef('pk'))
+    user_trades = Trade.objects.filter(Q(user1=OuterRef('pk')) | Q(user2=OuterRef('pk')))
+    user_reviews = Review.objects.filter(reviewed_user=OuterRef('pk'))
+    return User.objects.filter(username=username).annotate(
+        offers_count=SubqueryCount(user_offers),
+        offers_modified=subquery_latest(user_offers, 'updated_at'),
+        trades_count=SubqueryCount(user_trades),
+        trades_modified=subquery_latest(user_trades, 'updated_at'),
+        reviews_count=SubqueryCount(user_reviews),
+        reviews_modified=subquery_latest(user_reviews, 'updated_at'),
+    ).values(
+        'pk', 'first_name', 'last_name', 'email', 'userprofile__updated_at',
+        'offers_count', 'offers_modified', 'trades_count', 'trades_modified',
+        'reviews_count', 'reviews_modified',
+    ).first()
+
+
+def _user_stats_validators(request, username):
+    row = _user_stats_row(username)
+    if row is None:
+        return None, None
+    # Bez Last-Modified: posle brisanja ponude/razmene Max(updated_at) ide unazad, samo ETag (sa brojevima) to vidi
+    last_modified = _latest(row['offers_modified'], row['trades_modified'], row['reviews_modified'])
+    etag = make_etag(
+        'user-stats', row['pk'], row['offers_count'], row['trades_count'], row['reviews_count'], last_modified,
+    )
+    return etag, None
+
+
+def _user_detail_validators(request, username):
+    row = _user_stats_row(username)
+    if row is None:
+        return None, None
+    last_modified = _latest(
+        row['userprofile__updated_at'], row['offers_modified'], row['trades_modified'], row['reviews_modified'],
+    )
+    # email/telefon se vide samo vlasniku - ETag zavisi i od toga ko gleda; Last-Modified izostaje kao za statistiku
+    etag = make_etag(
+        'user-detail', row['pk'], request.user.pk == row['pk'], row['first_name'], row['last_name'], row['email'],
+        row['offers_count'], row['trades_count'], row['reviews_count'], last_modified,
+    )
+    return etag, None
+
+
+def _categories_validators(request):
+    # Bez Last-Modified: brisanje kategorije ne pomera Max(updated_at) napred
+    stats = Category.objects.aggregate(total=Count('id'), last_modified=Max('updated_at'))
+    return make_etag('categories', stats['total'], stats['last_modified']), None
+
+
+def _offer_detail_validators(request, pk):
+    owner_reviews = Review.objects.filter(reviewed_user=OuterRef('owner'))
+    row = Offer.objects.filter(pk=pk).annotate(
+        reviews_count=SubqueryCount(owner_reviews),
+        reviews_modified=subquery_latest(owner_reviews, 'updated_at'),
+    ).values_list(
+        'updated_at', 'views_count', 'category__updated_at', 'reviews_count', 'reviews_modified',
+    ).first()
+    if row is None:
+        return None, None
+    # Bez Last-Modified: broj pregleda i ocena vlasnika se menjaju bez updated_at ponude
+    updated_at, views_count, category_modified, reviews_count, reviews_modified = row
+    etag = make_etag('offer-detail', pk, views_count, reviews_count, updated_at, category_modified, reviews_modified)
+    return etag, None
+
+
+def _messages_list_validators(request):
+    """
+    Razgovor se menja kad stigne nova poruka ili kad sagovornik pročita moje poruke.
+    Poruke sagovornika su u odgovoru uvek pročitane (view ih označi), pa ne ulaze u ETag.
+    """
+    other_user = User.objects.filter(username=request.GET.get('username') or '').first()
+    if other_user is None:
+        return None, None
+    stats = Message.objects.filter(
+        Q(sender=request.user, recipient=other_user) |
+        Q(sender=other_user, recipient=request.user)
+    ).aggregate(
+        total=Count('id'),
+        last_id=Max('id'),
+        last_modified=Max('timestamp'),
+        read_by_other=Count('id', filter=Q(sender=request.user, is_read=True)),
+    )
+    etag = make_etag(
+        'messages', request.user.pk, other_user.pk, stats['total'], stats['last_id'], stats['read_by_other'],
+        request.GET.get('page', 1),
+    )
+    return etag, None
+
+
+# ---- Statistike - sve vrednosti kao anotacije jednog upita ----
+
+def _offer_stats_queryset():
+    offer_trades = Trade.objects.filter(Q(offer1=OuterRef('pk')) | Q(offer2=OuterRef('pk')))
+    return Offer.objects.annotate(trades_count=SubqueryCount(offer_trades))
+
+
+def _offer_stats_payload(offer):
+    return {
+        'id': offer.id,
+        'title': offer.title,
+        'views': offer.views_count,
+        'trades': offer.trades_count,
+    }
+
+
+def _user_stats_queryset():
+    user_offers = Offer.objects.filter(owner=OuterRef('pk'))
+    completed_trades = Trade.objects.filter(
+        Q(user1=OuterRef('pk')) | Q(user2=OuterRef('pk')),
+        status='completed'
+    )
+    user_reviews = Review.objects.filter(reviewed_user=OuterRef('pk'))
+    return User.objects.annotate(
+        total_offers=SubqueryCount(user_offers),
+        active_offers=SubqueryCount(user_offers.filter(is_active=True)),
+        completed_trades=SubqueryCount(completed_trades),
+        reviews_count=SubqueryCount(user_reviews),
+        avg_rating=Subquery(
+            user_reviews.order_by().values('reviewed_user').annotate(avg=Avg('rating')).values('avg')
+        ),
+    )
+
+
+def _user_stats_payload(user):
+    return {
+        'username': user.username,
+        'total_offers': user.total_offers,
+        'active_offers': user.active_offers,
+        'completed_trades': user.completed_trades,
+        'reviews_count': user.reviews_count,
+        'average_rating': round(user.avg_rating or 0, 1),
+        'joined_date': user.date_joined.strftime('%Y-%m-%d'),
+    }
+
+
 @login_required(login_url='core:login')
 @require_http_methods(["GET"])
 def get_unread_count(request):
@@ -870,54 +1364,37 @@ def get_unread_count(request):
 
 
 @require_http_methods(["GET"])
+@conditional_api(_offer_stats_validators, public=True, max_age=30)
 def get_offer_stats(request, pk):
     """API endpoint - statistika ponude"""
-    offer = get_object_or_404(Offer, pk=pk)
+    offer = get_object_or_404(_offer_stats_queryset(), pk=pk)
 
-    stats = {
-        'id': offer.id,
-        'title': offer.title,
-        'views': offer.views_count,
-        'trades': Trade.objects.filter(
-            Q(offer1=offer) | Q(offer2=offer)
-        ).count(),
-        'success': True,
-    }
+    stats = _offer_stats_payload(offer)
+    stats['success'] = True
 
     return JsonResponse(stats)
 
 
 @require_http_methods(["GET"])
+@conditional_api(_user_stats_validators, public=True, max_age=30)
 def get_user_stats(request, username):
     """API endpoint - statistika korisnika"""
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(_user_stats_queryset(), username=username)
 
-    reviews = Review.objects.filter(reviewed_user=user)
-    avg_rating = reviews.aggregate(Avg('rating'))['rating__avg'] or 0
-
-    stats = {
-        'username': user.username,
-        'total_offers': Offer.objects.filter(owner=user).count(),
-        'active_offers': Offer.objects.filter(owner=user, is_active=True).count(),
-        'completed_trades': Trade.objects.filter(
-            Q(user1=user) | Q(user2=user),
-            status='completed'
-        ).count(),
-        'reviews_count': reviews.count(),
-        'average_rating': round(avg_rating, 1),
-        'joined_date': user.date_joined.strftime('%Y-%m-%d'),
-        'success': True,
-    }
+    stats = _user_stats_payload(user)
+    stats['success'] = True
 
     return JsonResponse(stats)
 
 
 @require_http_methods(["GET"])
+@conditional_api(_categories_validators, public=True, max_age=300)
 def get_categories(request):
     """API endpoint - sve kategorije"""
-    categories = Category.objects.all().values('id', 'name', 'description')
-
-    categories_list = list(categories)
+    # Brojači se menjaju update()-om mimo signala - čitaju se iz baze, ne iz keša kategorija (ETag ih pokriva)
+    categories_list = list(Category.objects.values(
+        'id', 'name', 'description', 'parent_id', 'depth', 'active_offer_count',
+    ))
 
     return JsonResponse({
         'categories': categories_list,
@@ -926,13 +1403,15 @@ def get_categories(request):
     })
 
 
-@require_http_methods(["GET"])
-def search_offers(request):
-    """API endpoint - pretraga ponuda"""
-    query = request.GET.get('q', '').strip()
-    category_id = request.GET.get('category', '')
-    city = request.GET.get('city', '').strip()
-    page = request.GET.get('page', 1)
+SEARCH_PAGE_SIZE = 12
+MESSAGES_PAGE_SIZE = 20
+
+
+def _search_offers_filtered(params, with_city=True):
+    """Filteri za search_offers (deli ih i async verzija); bez grada - osnova za facete gradova"""
+    query = params.get('q', '').strip()
+    category_id = params.get('category', '')
+    city = params.get('city', '').strip()
 
     offers = Offer.objects.filter(is_active=True)
 
@@ -945,38 +1424,56 @@ def search_offers(request):
         )
 
     if category_id:
-        offers = offers.filter(category_id=category_id)
+        offers = _filter_by_category(offers, category_id)
 
-    if city:
-        offers = offers.filter(city__icontains=city)
+    if city and with_city:
+        offers = _filter_by_city(offers, city)
 
-    paginator = Paginator(offers.order_by('-created_at'), 12)
-    page_obj = paginator.get_page(page)
+    return _filter_by_price(offers, params)
 
-    offers_data = [
-        {
-            'id': offer.id,
-            'title': offer.title,
-            'offered': offer.offered,
-            'wanted': offer.wanted,
-            'city': offer.city,
-            'owner': offer.owner.username,
-            'created_at': offer.created_at.strftime('%Y-%m-%d %H:%M'),
-        }
-        for offer in page_obj.object_list
-    ]
 
-    return JsonResponse({
-        'offers': offers_data,
-        'total_count': offers.count(),
+def _search_offers_queryset(params):
+    return OFFER_CARD.rows(_sort_offers(_search_offers_filtered(params), params.get('sort', '')))
+
+
+def _search_facets_queryset(params):
+    """Facete gradova ako su tražene (?facets=1), inače None"""
+    if params.get('facets') not in ('1', 'true'):
+        return None
+    return _search_offers_filtered(params, with_city=False)
+
+
+@require_http_methods(["GET"])
+def search_offers(request):
+    """API endpoint - pretraga ponuda"""
+    page = request.GET.get('page', 1)
+
+    paginator = Paginator(_search_offers_queryset(request.GET), SEARCH_PAGE_SIZE)
+    page_obj = paginator.get_page(page)
+
+    data = {
+        'offers': OFFER_CARD.serialize(page_obj.object_list),
+        'total_count': paginator.count,
         'page': page_obj.number,
         'total_pages': paginator.num_pages,
         'success': True,
-    })
+    }
+    facets = _search_facets_queryset(request.GET)
+    if facets is not None:
+        data['city_facets'] = list(_city_facets(facets))
+    return json_response(data)
+
+
+def _conversation_queryset(user, other_user):
+    return Message.objects.filter(
+        Q(sender=user, recipient=other_user) |
+        Q(sender=other_user, recipient=user)
+    ).order_by('-timestamp')
 
 
 @login_required(login_url='core:login')
 @require_http_methods(["GET"])
+@conditional_api(_messages_list_validators, private=True, no_cache=True)
 def get_messages_list(request):
     """API endpoint - lista poruka kao JSON"""
     username = request.GET.get('username')
@@ -990,34 +1487,18 @@ def get_messages_list(request):
 
     other_user = get_object_or_404(User, username=username)
 
-    messages_list = Message.objects.filter(
-        Q(sender=request.user, recipient=other_user) |
-        Q(sender=other_user, recipient=request.user)
-    ).order_by('-timestamp')
+    messages_list = _conversation_queryset(request.user, other_user)
 
-    Message.objects.filter(
-        sender=other_user,
-        recipient=request.user,
-        is_read=False
-    ).update(is_read=True)
+    changes.update_and_record(
+        Message.objects.filter(sender=other_user, recipient=request.user, is_read=False),
+        is_read=True,
+    )
 
-    paginator = Paginator(messages_list, 20)
+    paginator = Paginator(MESSAGE.rows(messages_list), MESSAGES_PAGE_SIZE)
     page_obj = paginator.get_page(page)
 
-    messages_data = [
-        {
-            'id': msg.id,
-            'sender': msg.sender.username,
-            'subject': msg.subject,
-            'body': msg.body,
-            'timestamp': msg.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'is_read': msg.is_read,
-        }
-        for msg in page_obj.object_list
-    ]
-
-    return JsonResponse({
-        'messages': messages_data,
+    return json_response({
+        'messages': MESSAGE.serialize(page_obj.object_list),
         'other_user': {
             'username': other_user.username,
             'id': other_user.id,
@@ -1028,63 +1509,162 @@ def get_messages_list(request):
     })
 
 
+TRADES_INBOX_PAGE_SIZE = 20
+TRADES_INBOX_MAX_PAGE_SIZE = 100
+
+
+def _user_trades(request):
+    """Razmene korisnika, opciono filtrirane po smeru (sent/received)"""
+    direction = request.GET.get('direction')
+
+    if direction == 'sent':
+        return Trade.objects.filter(user1=request.user)
+    if direction == 'received':
+        return Trade.objects.filter(user2=request.user)
+    return Trade.objects.filter(
+        Q(user1=request.user) | Q(user2=request.user)
+    )
+
+
+def _encode_keyset_cursor(moment, pk):
+    """(vreme, pk) kursor - inbox razmena (created_at) i razgovor (timestamp)"""
+    return urlsafe_base64_encode(f'{moment.isoformat()}|{pk}'.encode())
+
+
+def _decode_keyset_cursor(cursor):
+    try:
+        moment, pk = urlsafe_base64_decode(cursor).decode().split('|')
+        moment = datetime.fromisoformat(moment)
+        if moment.tzinfo is None:
+            # _encode_keyset_cursor uvek upisuje aware vreme - ovakav kursor nije naš
+            return None
+        return moment, int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def _trades_inbox_validators(request):
+    """Jedan agregatni upit - menja se kad se promeni razmena ili ponuda u njoj"""
+    stats = _user_trades(request).aggregate(
+        total=Count('id'),
+        trade_modified=Max('updated_at'),
+        offer1_modified=Max('offer1__updated_at'),
+        offer2_modified=Max('offer2__updated_at'),
+    )
+    timestamps = [stats[key] for key in ('trade_modified', 'offer1_modified', 'offer2_modified') if stats[key]]
+    last_modified = max(timestamps) if timestamps else None
+    # Bez Last-Modified: obrisana razmena ne pomera Max(updated_at) napred, samo total u ETag-u
+    etag = make_etag('trades-inbox', request.user.pk, stats['total'], last_modified, request.get_full_path())
+    return etag, None
+
+
 @login_required(login_url='core:login')
 @require_http_methods(["GET"])
 def get_trades_list(request):
     """API endpoint - lista razmena kao JSON"""
     status_filter = request.GET.get('status')
-    direction = request.GET.get('direction')
 
-    if direction == 'sent':
-        trades = Trade.objects.filter(user1=request.user)
-    elif direction == 'received':
-        trades = Trade.objects.filter(user2=request.user)
-    else:
-        trades = Trade.objects.filter(
-            Q(user1=request.user) | Q(user2=request.user)
-        )
+    trades = _user_trades(request)
 
     if status_filter:
         trades = trades.filter(status=status_filter)
 
-    trades = trades.order_by('-created_at')
-
-    trades_data = [
-        {
-            'id': trade.id,
-            'offer1': {
-                'id': trade.offer1.id,
-                'title': trade.offer1.title,
-                'owner': trade.offer1.owner.username,
-            } if trade.offer1 else None,
-            'offer2': {
-                'id': trade.offer2.id,
-                'title': trade.offer2.title,
-                'owner': trade.offer2.owner.username,
-            },
-            'status': trade.status,
-            'created_at': trade.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            'message': trade.message,
-        }
-        for trade in trades
-    ]
+    # Streaming - lista nije paginirana, pa se redovi ne drže svi u memoriji
+    rows = TRADE.rows(trades.order_by('-created_at')).iterator(chunk_size=500)
+    return streaming_json_response(
+        'trades',
+        map(TRADE.serialize_row, rows),
+        trailer=lambda count: {'total_count': count, 'success': True},
+    )
 
-    return JsonResponse({
-        'trades': trades_data,
-        'total_count': trades.count(),
+
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+@conditional_api(_trades_inbox_validators, private=True, no_cache=True)
+def get_trades_inbox(request):
+    """API endpoint - inbox razmena: brojevi po statusu + cursor paginacija"""
+    trades = _user_trades(request)
+
+    # Brojevi po statusu - jedan GROUP BY upit
+    counts = {status: 0 for status, _ in Trade.STATUS_CHOICES}
+    for row in trades.order_by().values('status').annotate(n=Count('id')):
+        counts[row['status']] = row['n']
+
+    try:
+        limit = min(int(request.GET.get('limit', TRADES_INBOX_PAGE_SIZE)), TRADES_INBOX_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = TRADES_INBOX_PAGE_SIZE
+    limit = max(limit, 1)
+
+    status_filter = request.GET.get('status')
+    if status_filter:
+        trades = trades.filter(status=status_filter)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = _decode_keyset_cursor(cursor)
+        if position is None:
+            return JsonResponse({'success': False, 'error': 'Neispravan cursor'}, status=400)
+        created_at, pk = position
+        trades = trades.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    # Sirovi created_at ide kao dodatna kolona na kraju reda - za cursor
+    page = list(TRADE.rows(trades.order_by('-created_at', '-pk'), extra=('created_at',))[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return json_response({
+        'counts': counts,
+        'total_count': sum(counts.values()),
+        'trades': TRADE.serialize(page),
+        'next_cursor': _encode_keyset_cursor(page[-1][-1], page[-1][0]) if has_more else None,
+        'has_more': has_more,
         'success': True,
     })
 
 
+@login_required(login_url='core:login')
+@require_http_methods(["GET"])
+def sync_changes(request):
+    """
+    API endpoint - delta sync: poruke, notifikacije, razmene i sopstvene ponude
+    promenjene posle kursora. Bez kursora (ili sa isteklim) vraća reset=True i
+    novi kursor - klijent tada jednom učita cele liste.
+    """
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return json_response({'cursor': changes.current_cursor(request.user), 'reset': True, 'success': True})
+
+    position = changes.decode_cursor(cursor)
+    if position is None:
+        return JsonResponse({'success': False, 'error': 'Neispravan cursor'}, status=400)
+    last_id, issued_at = position
+    if changes.cursor_expired(issued_at):
+        return json_response({
+            'cursor': changes.current_cursor(request.user),
+            'reset': True,
+            'success': False,
+            'error': 'Cursor je istekao - osveži liste',
+        }, status=410)
+
+    return json_response({**changes.changes_since(request.user, last_id), 'reset': False, 'success': True})
+
+
 @require_http_methods(["GET"])
+@conditional_api(_offer_detail_validators, public=True, max_age=60)
 def get_offer_detail_api(request, pk):
     """API endpoint - detalj ponude kao JSON"""
-    offer = get_object_or_404(Offer, pk=pk)
+    offer = get_object_or_404(Offer.objects.select_related('owner', 'category'), pk=pk)
 
-    owner_reviews = Review.objects.filter(reviewed_user=offer.owner)
-    avg_rating = owner_reviews.aggregate(Avg('rating'))['rating__avg'] or 0
+    return JsonResponse({
+        'offer': _offer_detail_payloads([offer])[offer.pk],
+        'success': True,
+    })
 
-    offer_data = {
+
+def _offer_detail_payload(offer, owner_rating):
+    avg_rating, reviews_count = owner_rating
+    return {
         'id': offer.id,
         'title': offer.title,
         'description': offer.description,
@@ -1097,11 +1677,13 @@ def get_offer_detail_api(request, pk):
         'owner': {
             'username': offer.owner.username,
             'id': offer.owner.id,
-            'rating': round(avg_rating, 1),
-            'reviews_count': owner_reviews.count(),
+            'rating': round(avg_rating or 0, 1),
+            'reviews_count': reviews_count,
         },
         'image_url': offer.image.url if offer.image else None,
         'price_range': offer.price_range,
+        'price_min': offer.price_min,
+        'price_max': offer.price_max,
         'location': offer.location,
         'city': offer.city,
         'views': offer.views_count,
@@ -1110,13 +1692,23 @@ def get_offer_detail_api(request, pk):
         'updated_at': offer.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
     }
 
-    return JsonResponse({
-        'offer': offer_data,
-        'success': True,
-    })
+
+def _offer_detail_payloads(offers):
+    """Payload-i za više ponuda - ocene vlasnika iz jednog GROUP BY upita"""
+    owner_ids = {offer.owner_id for offer in offers}
+    ratings = {
+        row['reviewed_user']: (row['avg'], row['count'])
+        for row in Review.objects.filter(reviewed_user__in=owner_ids)
+        .values('reviewed_user').annotate(avg=Avg('rating'), count=Count('id')).order_by()
+    }
+    return {
+        offer.pk: _offer_detail_payload(offer, ratings.get(offer.owner_id, (0, 0)))
+        for offer in offers
+    }
 
 
 @require_http_methods(["GET"])
+@conditional_api(_user_detail_validators, private=True, no_cache=True)
 def get_user_detail_api(request, username):
     """API endpoint - detalj korisnika kao JSON"""
     user = get_object_or_404(User, username=username)
@@ -1154,6 +1746,83 @@ def get_user_detail_api(request, username):
         'success': True,
     })
 
+# ==================== BATCH API ====================
+
+MAX_BATCH_SIZE = 100
+MAX_BATCH_ID = 2 ** 63 - 1
+
+
+def _batch_id(raw):
+    """pk iz ?ids= - van opsega BigAutoField baza baca OverflowError umesto praznog rezultata"""
+    value = int(raw)
+    if not 1 <= value <= MAX_BATCH_ID:
+        raise ValueError(raw)
+    return value
+
+
+def _batch_values(request, param, cast=str):
+    """Lista vrednosti iz ?ids=1,2,3 - bez duplikata, u redosledu zahteva"""
+    raw_values = [value.strip() for value in request.GET.get(param, '').split(',') if value.strip()]
+    values = []
+    for raw in raw_values:
+        try:
+            value = cast(raw)
+        except ValueError:
+            raise ValueError(f'Neispravna vrednost: {raw}')
+        if value not in values:
+            values.append(value)
+
+    if not values:
+        raise ValueError(f'Nedostaje parametar {param}')
+    if len(values) > MAX_BATCH_SIZE:
+        raise ValueError(f'Najviše {MAX_BATCH_SIZE} stavki po zahtevu')
+    return values
+
+
+def _batch_response(key, keys, found):
+    return JsonResponse({
+        key: [found[k] for k in keys if k in found],
+        'missing': [k for k in keys if k not in found],
+        'success': True,
+    })
+
+
+@require_http_methods(["GET"])
+def get_offers_batch(request):
+    """API endpoint - detalji više ponuda (?ids=1,2,3) u jednom zahtevu"""
+    try:
+        ids = _batch_values(request, 'ids', _batch_id)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    offers = Offer.objects.select_related('owner', 'category').in_bulk(ids)
+    return _batch_response('offers', ids, _offer_detail_payloads(list(offers.values())))
+
+
+@require_http_methods(["GET"])
+def get_offer_stats_batch(request):
+    """API endpoint - statistika više ponuda (?ids=1,2,3)"""
+    try:
+        ids = _batch_values(request, 'ids', _batch_id)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    offers = _offer_stats_queryset().in_bulk(ids)
+    return _batch_response('stats', ids, {pk: _offer_stats_payload(offer) for pk, offer in offers.items()})
+
+
+@require_http_methods(["GET"])
+def get_user_stats_batch(request):
+    """API endpoint - statistika više korisnika (?usernames=ana,marko)"""
+    try:
+        usernames = _batch_values(request, 'usernames')
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    users = _user_stats_queryset().filter(username__in=usernames)
+    return _batch_response('stats', usernames, {user.username: _user_stats_payload(user) for user in users})
+
+
 def google_oauth_redirect(request):
     """Redirekcija na Google OAuth login - koristi allauth template tag"""
     from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
@@ -1167,33 +1836,3 @@ def google_oauth_redirect(request):
     except:
         return redirect('/login/')
 
-
-# ==================== OAUTH DEBUGGING ====================
-import logging
-
-logger = logging.getLogger('allauth')
-
-
-# ✅ ISPRAVNA patching
-def setup_allauth_logging():
-    """Setup allauth OAuth2 debugging"""
-    from allauth.socialaccount.providers.oauth2 import views as oauth2_views
-
-    original_dispatch = oauth2_views.OAuth2Adapter.complete_login
-
-    def debug_complete_login(self, request, app, **kwargs):
-        logger.debug(f"🔵 ALLAUTH complete_login START")
-        logger.debug(f"🔵 App: {app}")
-        try:
-            result = original_dispatch(self, request, app, **kwargs)
-            logger.debug(f"🟢 ALLAUTH complete_login SUCCESS")
-            return result
-        except Exception as e:
-            logger.error(f"🔴 ALLAUTH ERROR: {str(e)}", exc_info=True)
-            raise
-
-    oauth2_views.OAuth2Adapter.complete_login = debug_complete_login
-
-
-# Pozovi na startup
-setup_allauth_logging()